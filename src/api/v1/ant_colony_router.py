@@ -1,13 +1,147 @@
-from fastapi import APIRouter
+from typing import Union
 
-from src.objects.ant_colony_objects import AntColonyRequest, AntColonyResponse
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from src.objects.ant_colony_objects import (
+    AntColonyParams,
+    AntColonyProgress,
+    AntColonyRequest,
+    AntColonyResponse,
+    ClusteredAntColonyParams,
+    ClusteredAntColonyRequest,
+    ClusteredAntColonyResponse,
+    CompactAntColonyResponse,
+    CompactTrail,
+    MatrixCacheStats,
+)
 from src.services.ant_colony_model.ant_colony_model import AntColonyModel
+from src.services.ant_colony_model.clustered_ant_colony_model import (
+    ClusteredAntColonyModel,
+)
+from src.services.ant_colony_model.matrix_cache import matrix_cache
+from src.utils.array_codec import (
+    ArrayBundle,
+    build_array_response,
+    parse_params,
+    read_points,
+)
+from src.utils.streaming import STREAM_MEDIA_TYPES, StreamFormat, encode_stream
 
 router = APIRouter()
 
 
-@router.post("/ant-colony-model", response_model=AntColonyResponse)
+def get_ant_colony_params(params: str = "{}") -> AntColonyParams:
+    return parse_params(AntColonyParams, params)
+
+
+def get_clustered_ant_colony_params(params: str = "{}") -> ClusteredAntColonyParams:
+    return parse_params(ClusteredAntColonyParams, params)
+
+
+async def read_coordinates(request: Request) -> np.ndarray:
+    coordinates = await read_points(request)
+    if coordinates.shape[1] != 2 or len(coordinates) == 0:
+        raise HTTPException(
+            status_code=400, detail="points must be a non-empty (n, 2) array"
+        )
+    return coordinates
+
+
+def get_trail_arrays(trail: CompactTrail, prefix: str = "") -> ArrayBundle:
+    return {
+        f"{prefix}tour": np.array(trail.tour, dtype=np.int64),
+        f"{prefix}total_distance": np.array(trail.total_distance),
+    }
+
+
+@router.post(
+    "/ant-colony-model",
+    response_model=Union[AntColonyResponse, CompactAntColonyResponse],
+)
 def run_ant_colony_model(request: AntColonyRequest):
     model = AntColonyModel(request)
     response = model.run()
     return response
+
+
+def run_ant_colony_model_on_arrays(
+    params: AntColonyParams, coordinates: np.ndarray
+) -> ArrayBundle:
+    request = AntColonyRequest.model_construct(
+        points=[], response_format="compact", **dict(params)
+    )
+    response = AntColonyModel(request, coordinates=coordinates).run()
+    return {
+        **get_trail_arrays(response.last_trail),
+        **get_trail_arrays(response.first_trail, "first_"),
+        "distances": np.array(response.distances or [], dtype=float),
+        "n_iterations": np.array(response.n_iterations),
+        "n_tours_evaluated": np.array(response.n_tours_evaluated),
+    }
+
+
+@router.post("/ant-colony-model/arrays")
+async def run_ant_colony_model_arrays(
+    request: Request, params: AntColonyParams = Depends(get_ant_colony_params)
+):
+    coordinates = await read_coordinates(request)
+    bundle = await run_in_threadpool(
+        run_ant_colony_model_on_arrays, params, coordinates
+    )
+    return build_array_response(bundle, request.headers.get("accept"))
+
+
+@router.post("/ant-colony-model/stream")
+def stream_ant_colony_model(
+    request: AntColonyRequest,
+    format: StreamFormat = "ndjson",
+    include_trails: bool = False,
+):
+    model = AntColonyModel(request)
+    events = (
+        ("progress" if isinstance(update, AntColonyProgress) else "result", update)
+        for update in model.stream(include_trails=include_trails)
+    )
+    return StreamingResponse(
+        encode_stream(events, format), media_type=STREAM_MEDIA_TYPES[format]
+    )
+
+
+@router.post("/ant-colony-model/clustered", response_model=ClusteredAntColonyResponse)
+def run_clustered_ant_colony_model(request: ClusteredAntColonyRequest):
+    model = ClusteredAntColonyModel(request)
+    response = model.run()
+    return response
+
+
+def run_clustered_ant_colony_model_on_arrays(
+    params: ClusteredAntColonyParams, coordinates: np.ndarray
+) -> ArrayBundle:
+    request = ClusteredAntColonyRequest.model_construct(points=[], **dict(params))
+    response = ClusteredAntColonyModel(request, coordinates).run()
+    return {
+        **get_trail_arrays(response.trail),
+        "cluster_sizes": np.array(response.cluster_sizes, dtype=np.int64),
+        "n_clusters": np.array(response.n_clusters),
+        "n_tours_evaluated": np.array(response.n_tours_evaluated),
+    }
+
+
+@router.post("/ant-colony-model/clustered/arrays")
+async def run_clustered_ant_colony_model_arrays(
+    request: Request,
+    params: ClusteredAntColonyParams = Depends(get_clustered_ant_colony_params),
+):
+    coordinates = await read_coordinates(request)
+    bundle = await run_in_threadpool(
+        run_clustered_ant_colony_model_on_arrays, params, coordinates
+    )
+    return build_array_response(bundle, request.headers.get("accept"))
+
+
+@router.get("/ant-colony-model/cache", response_model=MatrixCacheStats)
+def get_ant_colony_cache_stats():
+    return matrix_cache.get_stats()
@@ -0,0 +1,98 @@
+from fastapi import APIRouter, HTTPException
+
+from src.objects.ant_colony_objects import (
+    AntColonySessionAddPointsRequest,
+    AntColonySessionCreateRequest,
+    AntColonySessionOptimizeRequest,
+    AntColonySessionRemovePointsRequest,
+    AntColonySessionResponse,
+)
+from src.services.ant_colony_model.session_store import (
+    ColonySession,
+    SessionStoreFull,
+    session_store,
+)
+
+router = APIRouter()
+
+
+def get_session(session_id: str) -> ColonySession:
+    session = session_store.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return session
+
+
+@router.post("/ant-colony-sessions", response_model=AntColonySessionResponse)
+def create_ant_colony_session(request: AntColonySessionCreateRequest):
+    try:
+        session = session_store.create(request)
+    except SessionStoreFull as error:
+        raise HTTPException(status_code=503, detail=str(error))
+    with session.lock:
+        if request.max_iterations > 0:
+            session.optimize(
+                AntColonySessionOptimizeRequest(max_iterations=request.max_iterations)
+            )
+        return session.get_response()
+
+
+@router.get(
+    "/ant-colony-sessions/{session_id}", response_model=AntColonySessionResponse
+)
+def get_ant_colony_session(session_id: str):
+    session = get_session(session_id)
+    with session.lock:
+        return session.get_response()
+
+
+@router.delete("/ant-colony-sessions/{session_id}", status_code=204)
+def delete_ant_colony_session(session_id: str):
+    if not session_store.delete(session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+
+
+@router.post(
+    "/ant-colony-sessions/{session_id}/points",
+    response_model=AntColonySessionResponse,
+)
+def add_ant_colony_session_points(
+    session_id: str, request: AntColonySessionAddPointsRequest
+):
+    session = get_session(session_id)
+    with session.lock:
+        try:
+            session_store.reserve_points(session, len(request.points))
+        except SessionStoreFull as error:
+            raise HTTPException(status_code=503, detail=str(error))
+        session.add_points(request.points)
+        return session.get_response()
+
+
+@router.delete(
+    "/ant-colony-sessions/{session_id}/points",
+    response_model=AntColonySessionResponse,
+)
+def remove_ant_colony_session_points(
+    session_id: str, request: AntColonySessionRemovePointsRequest
+):
+    session = get_session(session_id)
+    with session.lock:
+        try:
+            session.remove_points(request.indices)
+        except ValueError as error:
+            raise HTTPException(status_code=400, detail=str(error))
+        return session.get_response()
+
+
+@router.post(
+    "/ant-colony-sessions/{session_id}/optimize",
+    response_model=AntColonySessionResponse,
+)
+def optimize_ant_colony_session(
+    session_id: str, request: AntColonySessionOptimizeRequest
+):
+    session = get_session(session_id)
+    with session.lock:
+        session.optimize(request)
+        return session.get_response()
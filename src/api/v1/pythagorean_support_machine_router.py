@@ -1,12 +1,49 @@
-from fastapi import APIRouter
+from typing import AsyncIterator, Dict, Tuple
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
 
 from src.objects.pythagorean_support_machine_objects import (
+    ClusterModelArtifact,
+    ClusterPredictInput,
+    ClusterPredictOutput,
+    GroupAssignments,
+    GroupsScore,
     PythagoreanSupportMachineInput,
     PythagoreanSupportMachineOutput,
+    PythagoreanSupportMachineParams,
+    PythagoreanSupportMachineStreamError,
+    PythagoreanSupportMachineStreamParams,
+    PythagoreanSupportMachineSweepInput,
+    PythagoreanSupportMachineSweepOutput,
+    PythagoreanSupportMachineSweepParams,
+)
+from src.services.pythagorean_support_machine_model.cluster_predictor import (
+    ClusterPredictor,
+)
+from src.services.pythagorean_support_machine_model.groups_sweep import GroupsSweep
+from src.services.pythagorean_support_machine_model.mini_batch_model import (
+    MiniBatchModel,
 )
+from src.services.pythagorean_support_machine_model.model_store import model_store
 from src.services.pythagorean_support_machine_model.pythagorean_support_machine_model import (
     PythagoreanSupportMachineModel,
 )
+from src.utils.array_codec import (
+    ArrayBundle,
+    build_array_response,
+    parse_params,
+    read_points,
+)
+from src.utils.streaming import (
+    STREAM_MEDIA_TYPES,
+    DuplexStreamingResponse,
+    StreamFormat,
+    encode_async_stream,
+    read_ndjson_lines,
+)
 
 router = APIRouter()
 
@@ -17,4 +54,170 @@ router = APIRouter()
 def run_pythagorean_support_machine(request: PythagoreanSupportMachineInput):
     model = PythagoreanSupportMachineModel(request)
     response = model.run()
+    if request.persist:
+        response.model_id = model_store.save(model.get_artifact())
     return response
+
+
+def get_pythagorean_support_machine_params(
+    params: str = "{}",
+) -> PythagoreanSupportMachineParams:
+    return parse_params(PythagoreanSupportMachineParams, params)
+
+
+def get_pythagorean_support_machine_sweep_params(
+    params: str = "{}",
+) -> PythagoreanSupportMachineSweepParams:
+    return parse_params(PythagoreanSupportMachineSweepParams, params)
+
+
+def run_pythagorean_support_machine_on_arrays(
+    params: PythagoreanSupportMachineParams, points: np.ndarray
+) -> Tuple[ArrayBundle, Dict[str, str]]:
+    input = PythagoreanSupportMachineInput(points=[], **params.model_dump())
+    model = PythagoreanSupportMachineModel(input, points)
+    restarts = model.fit_input()
+    bundle = model.get_arrays()
+    if restarts is not None:
+        bundle["restart_objectives"] = np.array(restarts.objectives)
+    headers = {}
+    if params.persist:
+        headers["X-Model-Id"] = model_store.save(model.get_artifact())
+    return bundle, headers
+
+
+@router.post("/pythagorean-support-machine-model/arrays")
+async def run_pythagorean_support_machine_arrays(
+    request: Request,
+    params: PythagoreanSupportMachineParams = Depends(
+        get_pythagorean_support_machine_params
+    ),
+):
+    points = await read_points(request)
+    if len(points) == 0:
+        raise HTTPException(status_code=400, detail="points must not be empty")
+    bundle, headers = await run_in_threadpool(
+        run_pythagorean_support_machine_on_arrays, params, points
+    )
+    return build_array_response(bundle, request.headers.get("accept"), headers)
+
+
+@router.post(
+    "/pythagorean-support-machine-model/sweep",
+    response_model=PythagoreanSupportMachineSweepOutput,
+)
+def sweep_pythagorean_support_machine(request: PythagoreanSupportMachineSweepInput):
+    sweep = GroupsSweep(request)
+    response = sweep.run()
+    if request.persist:
+        response.model.model_id = model_store.save(sweep.model.get_artifact())
+    return response
+
+
+def sweep_pythagorean_support_machine_on_arrays(
+    params: PythagoreanSupportMachineSweepParams, points: np.ndarray
+) -> Tuple[ArrayBundle, Dict[str, str]]:
+    input = PythagoreanSupportMachineSweepInput(points=[], **params.model_dump())
+    sweep = GroupsSweep(input, points)
+    sweep.fit()
+    bundle = sweep.model.get_arrays()
+    bundle["recommended_n_groups"] = np.array(sweep.model.state.n_groups)
+    for field in GroupsScore.model_fields:
+        values = [getattr(score, field) for score in sweep.scores]
+        bundle[f"sweep_{field}"] = np.array(
+            [np.nan if value is None else value for value in values]
+        )
+    headers = {}
+    if params.persist:
+        headers["X-Model-Id"] = model_store.save(sweep.model.get_artifact())
+    return bundle, headers
+
+
+@router.post("/pythagorean-support-machine-model/sweep/arrays")
+async def sweep_pythagorean_support_machine_arrays(
+    request: Request,
+    params: PythagoreanSupportMachineSweepParams = Depends(
+        get_pythagorean_support_machine_sweep_params
+    ),
+):
+    points = await read_points(request)
+    if len(points) == 0:
+        raise HTTPException(status_code=400, detail="points must not be empty")
+    bundle, headers = await run_in_threadpool(
+        sweep_pythagorean_support_machine_on_arrays, params, points
+    )
+    return build_array_response(bundle, request.headers.get("accept"), headers)
+
+
+def get_artifact(model_id: str) -> ClusterModelArtifact:
+    artifact = model_store.get(model_id)
+    if artifact is None:
+        raise HTTPException(status_code=404, detail="Model not found")
+    return artifact
+
+
+@router.get(
+    "/pythagorean-support-machine-model/models/{model_id}",
+    response_model=ClusterModelArtifact,
+)
+def get_pythagorean_support_machine_artifact(model_id: str):
+    return get_artifact(model_id)
+
+
+@router.post(
+    "/pythagorean-support-machine-model/models/{model_id}/predict",
+    response_model=ClusterPredictOutput,
+)
+def predict_pythagorean_support_machine(model_id: str, request: ClusterPredictInput):
+    predictor = ClusterPredictor(get_artifact(model_id))
+    n_dimensions = predictor.artifact.n_dimensions
+    if any(len(point.coordinates) != n_dimensions for point in request.points):
+        raise HTTPException(
+            status_code=422,
+            detail=f"every point must have {n_dimensions} coordinates",
+        )
+    points = np.array([point.coordinates for point in request.points], dtype=float)
+    try:
+        return predictor.predict(points)
+    except ValueError as error:
+        raise HTTPException(status_code=422, detail=str(error))
+
+
+@router.post("/pythagorean-support-machine-model/models/{model_id}/predict/arrays")
+async def predict_pythagorean_support_machine_arrays(model_id: str, request: Request):
+    predictor = ClusterPredictor(get_artifact(model_id))
+    points = await read_points(request)
+    try:
+        memberships, labels = await run_in_threadpool(predictor.predict_arrays, points)
+    except ValueError as error:
+        raise HTTPException(status_code=422, detail=str(error))
+    return build_array_response(
+        {"memberships": memberships, "labels": labels},
+        request.headers.get("accept"),
+    )
+
+
+async def get_stream_events(
+    model: MiniBatchModel, request: Request
+) -> AsyncIterator[Tuple[str, BaseModel]]:
+    # The status line has already been sent, so a bad line ends the stream
+    # with an error event instead of an HTTP error.
+    try:
+        async for update in model.stream(read_ndjson_lines(request.stream())):
+            event = "assignments" if isinstance(update, GroupAssignments) else "result"
+            yield event, update
+    except ValueError as error:
+        yield "error", PythagoreanSupportMachineStreamError(detail=str(error))
+
+
+@router.post("/pythagorean-support-machine-model/stream")
+async def stream_pythagorean_support_machine(
+    request: Request,
+    params: PythagoreanSupportMachineStreamParams = Depends(),
+    format: StreamFormat = "ndjson",
+):
+    model = MiniBatchModel(params)
+    return DuplexStreamingResponse(
+        encode_async_stream(get_stream_events(model, request), format),
+        media_type=STREAM_MEDIA_TYPES[format],
+    )
@@ -1,14 +1,26 @@
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
 
 from src.api.v1.ant_colony_router import router as ant_colony_router
+from src.api.v1.ant_colony_session_router import router as ant_colony_session_router
 from src.api.v1.pythagorean_support_machine_router import (
     router as pythagorean_support_machine_router,
 )
+from src.utils.process_pool import process_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    process_pool.shutdown()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(ant_colony_router, prefix="/v1")
+app.include_router(ant_colony_session_router, prefix="/v1")
 app.include_router(pythagorean_support_machine_router, prefix="/v1")
 
 
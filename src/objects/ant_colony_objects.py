@@ -1,6 +1,10 @@
-from typing import List, Optional
+import base64
+import binascii
+from typing import List, Literal, Optional, Tuple
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, PositiveFloat, conint, model_validator
+
+from src.params.ant_colony_params import AntColonyModelParams
 
 
 class Point(BaseModel):
@@ -35,11 +39,162 @@ class PointRequest(BaseModel):
     y: float
 
 
-class AntColonyRequest(BaseModel):
+class PheromoneSnapshot(BaseModel):
+    n_points: conint(ge=0)
+    points: str
+    pheromones: str
+
+    @model_validator(mode="after")
+    def check_payloads(self) -> "PheromoneSnapshot":
+        # points holds n_points float64 (x, y) pairs and pheromones the
+        # float32 upper triangle of the pheromone matrix.
+        expected_sizes = {
+            "points": self.n_points * 2 * 8,
+            "pheromones": self.n_points * (self.n_points - 1) // 2 * 4,
+        }
+        for name, expected_size in expected_sizes.items():
+            try:
+                payload = base64.b64decode(getattr(self, name), validate=True)
+            except binascii.Error:
+                raise ValueError(f"pheromone_snapshot {name} is not valid base64")
+            if len(payload) != expected_size:
+                raise ValueError(
+                    f"pheromone_snapshot {name} does not match its n_points"
+                )
+        return self
+
+
+class AntColonyParams(BaseModel):
+    model_params: AntColonyModelParams = Field(default_factory=AntColonyModelParams)
+    max_iterations: conint(ge=1, le=10000) = 10
+    n_ants: Optional[conint(ge=1, le=10000)] = None
+    time_budget_ms: Optional[conint(gt=0)] = None
+    n_colonies: conint(ge=1, le=64) = 1
+
+    @model_validator(mode="after")
+    def check_batched_colonies(self) -> "AntColonyParams":
+        # Batched colonies step every ant through full rows in one process.
+        if self.n_colonies > 1 and self.model_params.n_candidates is not None:
+            raise ValueError("n_candidates is not supported with n_colonies > 1")
+        if self.n_colonies > 1 and self.model_params.n_workers > 1:
+            raise ValueError("n_workers is not supported with n_colonies > 1")
+        return self
+
+
+class AntColonyRequest(AntColonyParams):
     points: List[PointRequest]
+    response_format: Literal["verbose", "compact"] = "verbose"
+    include_history: bool = True
+    initial_tour: Optional[List[int]] = None
+    pheromone_snapshot: Optional[PheromoneSnapshot] = None
+    return_pheromones: bool = False
+
+    @model_validator(mode="after")
+    def check_initial_tour(self) -> "AntColonyRequest":
+        if self.initial_tour is not None and sorted(self.initial_tour) != list(
+            range(len(self.points))
+        ):
+            raise ValueError("initial_tour must visit every point exactly once")
+        return self
+
+
+class CompactTrail(BaseModel):
+    tour: List[int]
+    total_distance: float
+
+
+class AntColonyProgress(BaseModel):
+    iteration: int
+    distance: float
+    best_distance: float
+    n_tours_evaluated: int
+    trail: Optional[Trail] = None
+    compact_trail: Optional[CompactTrail] = None
+
+
+class ColonyStats(BaseModel):
+    colony_idx: int
+    # A sequential run with this seed reproduces the colony.
+    seed: int
+    best_distance: float
+    best_iteration: int
+    last_mean_distance: float
+
+
+class MatrixCacheStats(BaseModel):
+    hits: int
+    misses: int
+    n_entries: int
+    n_bytes: int
+    max_bytes: int
 
 
 class AntColonyResponse(BaseModel):
     first_trail: Trail
     last_trail: Trail
     collection_of_ants_trails: CollectionOfAntsTrails
+    n_iterations: int
+    n_tours_evaluated: int
+    colonies: Optional[List[ColonyStats]] = None
+    pheromone_snapshot: Optional[PheromoneSnapshot] = None
+
+
+class CompactAntColonyResponse(BaseModel):
+    points: List[Tuple[float, float]]
+    first_trail: CompactTrail
+    last_trail: CompactTrail
+    distances: Optional[List[float]] = None
+    n_iterations: int
+    n_tours_evaluated: int
+    colonies: Optional[List[ColonyStats]] = None
+    pheromone_snapshot: Optional[PheromoneSnapshot] = None
+
+
+class AntColonySessionCreateRequest(BaseModel):
+    points: List[PointRequest] = Field(min_length=1)
+    model_params: AntColonyModelParams = Field(default_factory=AntColonyModelParams)
+    ttl_seconds: PositiveFloat = 1800.0
+    max_iterations: conint(ge=0, le=10000) = 10
+
+
+class AntColonySessionOptimizeRequest(BaseModel):
+    max_iterations: conint(ge=1, le=10000) = 10
+    n_ants: Optional[conint(ge=1, le=10000)] = None
+    time_budget_ms: Optional[conint(gt=0)] = None
+
+
+class AntColonySessionAddPointsRequest(BaseModel):
+    points: List[PointRequest] = Field(min_length=1)
+
+
+class AntColonySessionRemovePointsRequest(BaseModel):
+    indices: List[conint(ge=0)] = Field(min_length=1)
+
+
+class AntColonySessionResponse(BaseModel):
+    session_id: str
+    n_points: int
+    best_trail: Optional[CompactTrail] = None
+    n_iterations: int
+    n_tours_evaluated: int
+    expires_in_seconds: float
+
+
+class ClusteredAntColonyParams(BaseModel):
+    model_params: AntColonyModelParams = Field(default_factory=AntColonyModelParams)
+    max_iterations: conint(ge=1, le=10000) = 10
+    n_ants: Optional[conint(ge=1, le=10000)] = None
+    max_cluster_size: conint(ge=2) = 200
+    clustering_iterations: conint(ge=1) = 10
+    boundary_window: conint(ge=1) = 10
+
+
+class ClusteredAntColonyRequest(ClusteredAntColonyParams):
+    points: List[PointRequest] = Field(min_length=1)
+
+
+class ClusteredAntColonyResponse(BaseModel):
+    trail: CompactTrail
+    n_clusters: int
+    cluster_sizes: List[int]
+    n_tours_evaluated: int
@@ -1,26 +1,62 @@
-from typing import List
+from datetime import datetime
+from typing import List, Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import (
+    BaseModel,
+    Field,
+    PositiveFloat,
+    confloat,
+    conint,
+    model_validator,
+)
 
 
 class Point(BaseModel):
     coordinates: List[float]
 
 
-class PythagoreanSupportMachineInput(BaseModel):
-    points: List[Point]
+class PythagoreanSupportMachineSettings(BaseModel):
+    tolerance: PositiveFloat = 1e-4
+    max_iterations: conint(ge=1) = 100
+    initialization: Literal["random", "kmeans++", "kmeans++_sampled"] = "kmeans++"
+    init_sample_size: conint(ge=1) = 10000
+    seed: Optional[int] = None
+    n_restarts: conint(ge=1, le=100) = 1
+    n_workers: conint(ge=1, le=64) = 1
+    tile_size: conint(ge=1) = 4096
+    n_threads: Optional[conint(ge=1, le=64)] = 1
+    persist: bool = False
+
+
+class PythagoreanSupportMachineParams(PythagoreanSupportMachineSettings):
     n_groups: int
 
 
+class PythagoreanSupportMachineInput(PythagoreanSupportMachineParams):
+    points: List[Point]
+
+
 class Group(BaseModel):
     points: List[Point]
     n_points: int
     centroid: Point
 
 
+class RestartsSummary(BaseModel):
+    best_restart: int
+    objectives: List[float]
+    objective_std: float
+    mean_adjusted_rand_index: float
+
+
 class PythagoreanSupportMachineOutput(BaseModel):
     groups: List[Group]
     n_dimensions: int
+    n_iterations: int = 0
+    objective: float = 0.0
+    converged: bool = False
+    restarts: Optional[RestartsSummary] = None
+    model_id: Optional[str] = None
 
 
 class PointStatus(BaseModel):
@@ -36,3 +72,87 @@ class Node(BaseModel):
 
 class MainMatrix(BaseModel):
     nodes: List[Node]
+
+
+class PythagoreanSupportMachineStreamParams(BaseModel):
+    n_groups: conint(ge=1)
+    batch_size: conint(ge=1, le=65536) = 1024
+    learning_rate: Optional[confloat(gt=0, le=1)] = None
+    initialization: Literal["random", "kmeans++", "kmeans++_sampled"] = "kmeans++"
+    seed: Optional[int] = None
+
+
+class GroupAssignments(BaseModel):
+    offset: int
+    labels: List[int]
+
+
+class PythagoreanSupportMachineStreamResult(BaseModel):
+    centroids: List[Point]
+    n_points: int
+    n_batches: int
+    n_dimensions: int
+
+
+class PythagoreanSupportMachineStreamError(BaseModel):
+    detail: str
+
+
+class ClusterModelArtifact(BaseModel):
+    model_id: str
+    centroids: List[List[float]]
+    fuzzifier: float
+    n_groups: int
+    n_dimensions: int
+    objective: float
+    n_iterations: int
+    created_at: datetime
+
+
+class ClusterPredictInput(BaseModel):
+    points: List[Point] = Field(min_length=1)
+
+
+class ClusterPredictOutput(BaseModel):
+    memberships: List[List[float]]
+    labels: List[int]
+
+
+SweepCriterion = Literal[
+    "xie_beni", "partition_coefficient", "partition_entropy", "silhouette"
+]
+
+
+class PythagoreanSupportMachineSweepParams(PythagoreanSupportMachineSettings):
+    min_groups: conint(ge=2) = 2
+    max_groups: conint(ge=2) = 10
+    criterion: SweepCriterion = "xie_beni"
+    silhouette_sample_size: conint(ge=2) = 2000
+
+    @model_validator(mode="after")
+    def check_groups_range(self) -> "PythagoreanSupportMachineSweepParams":
+        if self.max_groups < self.min_groups:
+            raise ValueError("max_groups must not be smaller than min_groups")
+        return self
+
+
+class PythagoreanSupportMachineSweepInput(PythagoreanSupportMachineSweepParams):
+    points: List[Point]
+
+
+class GroupsScore(BaseModel):
+    n_groups: int
+    objective: float
+    n_iterations: int
+    converged: bool
+    xie_beni: Optional[float] = None
+    partition_coefficient: float
+    partition_entropy: float
+    silhouette: float
+
+
+class PythagoreanSupportMachineSweepOutput(BaseModel):
+    recommended_n_groups: int
+    criterion: SweepCriterion
+    scores: List[GroupsScore]
+    model: PythagoreanSupportMachineOutput
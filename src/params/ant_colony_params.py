@@ -1,8 +1,25 @@
-from pydantic import BaseModel, confloat
+from typing import Literal, Optional
+
+from pydantic import BaseModel, PositiveFloat, confloat, conint
 
 
 class AntColonyModelParams(BaseModel):
+    variant: Literal["ant_system", "max_min", "colony_system"] = "ant_system"
     alpha: float = 3.0
     beta: float = 2.0
     evaporation_rate: confloat(gt=0, lt=1) = 0.5
     initial_pheromone: float = 1.0
+    seed: Optional[int] = None
+    n_workers: conint(ge=1) = 1
+    n_candidates: Optional[conint(ge=1)] = None
+    local_search: Optional[Literal["iteration_best", "all_ants"]] = None
+    local_search_neighbours: conint(ge=1) = 10
+    pheromone_max: Optional[PositiveFloat] = None
+    pheromone_min: Optional[PositiveFloat] = None
+    exploitation_rate: confloat(ge=0, le=1) = 0.9
+    local_evaporation_rate: confloat(gt=0, lt=1) = 0.1
+    stagnation_patience: Optional[conint(ge=1)] = None
+    entropy_threshold: Optional[confloat(ge=0, le=1)] = None
+    matrix_dtype: Literal["float64", "float32"] = "float64"
+    condensed_matrices: bool = False
+    memmap_threshold_bytes: Optional[conint(gt=0)] = None
@@ -1,86 +1,261 @@
-from typing import List
+import time
+from typing import Iterator, List, Optional, Union
+
+import numpy as np
 
 from src.objects.ant_colony_objects import (
     AntColonyRequest,
+    AntColonyProgress,
     AntColonyResponse,
     CollectionOfAntsTrails,
-    Point,
-    PointRequest,
-    Segment,
-    Trail,
-    TrailMatrix,
+    ColonyStats,
+    CompactAntColonyResponse,
 )
 from src.params.ant_colony_params import AntColonyModelParams
 
+from .batched_colonies import BatchedColonyRunner
+from .colony_state import AntTours, ColonyState, IterationBest
+from .convergence_detector import ConvergenceDetector
+from .trail_builder import TrailBuilder
 from .trail_manager import TrailMatrixManager
-from .utils import calc_distance, eject_object, random_points
+from .utils import eject_object, random_points
+from .warm_start import WarmStarter, encode_snapshot
 
 
 class AntColonyModel:
-    def __init__(self, request: AntColonyRequest):
-        self.matrix = self._build_trail_matrix(request.points)
-        self.model_params = AntColonyModelParams()
-
-    def _build_trail_matrix(self, points: List[PointRequest]) -> TrailMatrix:
-        point_objs = [
-            Point(idx=i + 1, x=point.x, y=point.y) for i, point in enumerate(points)
-        ]
-        trails = []
-        for i, from_p in enumerate(point_objs):
-            segments = []
-            for j, to_p in enumerate(point_objs):
-                if i != j:
-                    distance = calc_distance(from_p, to_p)
-                    segment = Segment(
-                        from_p=from_p, to_p=to_p, distance=distance, pheromone=1
-                    )
-                    segments.append(segment)
-            trail = Trail(segments=segments)
-            trails.append(trail)
-
-        return TrailMatrix(matrix=trails)
-
-    def _get_min_trail(self, trails: TrailMatrix) -> Trail:
-        min_trail = None
-        min_distance = float("inf")
-        for trail in trails.matrix:
-            if trail.total_distance < min_distance:
-                min_distance = trail.total_distance
-                min_trail = trail
-        return min_trail
-
-    def run(self, max_iterations: int = 10) -> AntColonyResponse:
-
-        n_iterations = max_iterations
-        first_trail = None
-        minimum_trail = None
+    def __init__(
+        self,
+        request: AntColonyRequest,
+        state: Optional[ColonyState] = None,
+        coordinates: Optional[np.ndarray] = None,
+        use_cache: bool = True,
+    ):
+        self.started_at = time.monotonic()
+        self.request = request
+        self.model_params: AntColonyModelParams = request.model_params
+        self.state = (
+            state
+            if state is not None
+            else ColonyState(request.points, self.model_params, coordinates, use_cache)
+        )
+        self.colony_runner: Optional[BatchedColonyRunner] = None
+        self.initial_best = self._warm_start()
 
-        collection_of_ants_trails = []
+    def _warm_start(self) -> Optional[IterationBest]:
+        warm_starter = WarmStarter(self.state)
+        if self.request.pheromone_snapshot is not None:
+            warm_starter.apply_snapshot(self.request.pheromone_snapshot)
+        if self.request.initial_tour is None:
+            return self._get_state_best()
+        return warm_starter.apply_initial_tour(
+            np.array(self.request.initial_tour, dtype=np.intp),
+            self.request.n_ants or self.state.n_points,
+        )
 
-        manager = TrailMatrixManager(self.matrix)
+    def _get_state_best(self) -> Optional[IterationBest]:
+        if self.state.best_tour is None:
+            return None
+        return IterationBest(
+            tour=self.state.best_tour,
+            length=self.state.best_length,
+            pheromones=self.state.tour_pheromones(self.state.best_tour),
+        )
 
-        for i in range(n_iterations):
-            manager.update_probabilities()
+    def _get_best(self, iteration_best: IterationBest) -> IterationBest:
+        if self.initial_best is not None and (
+            self.initial_best.length <= iteration_best.length
+        ):
+            return self.initial_best
+        return iteration_best
 
-            chosen_trails = manager.choose_trails()
+    def _get_final_pheromones(self) -> np.ndarray:
+        if self.colony_runner is not None:
+            return self.colony_runner.get_best_pheromones()
+        return self.state.pheromones
 
-            shortest_trail = self._get_min_trail(chosen_trails)
-            collection_of_ants_trails.append(shortest_trail)
-            if i == 0:
-                first_trail = shortest_trail
-                minimum_trail = shortest_trail
+    def _get_deadline(self) -> Optional[float]:
+        if self.request.time_budget_ms is None:
+            return None
+        return self.started_at + self.request.time_budget_ms / 1000
 
-            if shortest_trail.total_distance < minimum_trail.total_distance:
-                minimum_trail = shortest_trail
+    def _get_min_trail(self, chosen_tours: AntTours) -> IterationBest:
+        min_idx = int(np.argmin(chosen_tours.lengths))
+        tour = chosen_tours.tours[min_idx]
+        return IterationBest(
+            tour=tour,
+            length=float(chosen_tours.lengths[min_idx]),
+            pheromones=self.state.tour_pheromones(tour),
+            n_tours=len(chosen_tours.tours),
+        )
 
-            manager.update_pheromones(chosen_trails)
+    def _get_colony_stats(self) -> Optional[List[ColonyStats]]:
+        if self.colony_runner is None:
+            return None
+        return self.colony_runner.get_colony_stats()
 
+    def _build_compact_response(
+        self,
+        iteration_bests: List[IterationBest],
+        first: IterationBest,
+        minimum: IterationBest,
+        n_iterations: int,
+        n_tours_evaluated: int,
+    ) -> CompactAntColonyResponse:
+        builder = TrailBuilder(self.state)
+        distances = (
+            [best.length for best in iteration_bests]
+            if self.request.include_history and iteration_bests
+            else None
+        )
+        return CompactAntColonyResponse(
+            points=self.state.coordinates.tolist(),
+            first_trail=builder.build_compact_trail(first.tour, first.length),
+            last_trail=builder.build_compact_trail(minimum.tour, minimum.length),
+            distances=distances,
+            n_iterations=n_iterations,
+            n_tours_evaluated=n_tours_evaluated,
+            colonies=self._get_colony_stats(),
+        )
+
+    def _build_response(
+        self,
+        iteration_bests: List[IterationBest],
+        first: IterationBest,
+        minimum: IterationBest,
+        n_iterations: int,
+        n_tours_evaluated: int,
+    ) -> Union[AntColonyResponse, CompactAntColonyResponse]:
+        minimum = self._get_best(minimum)
+        if self.request.response_format == "compact":
+            response = self._build_compact_response(
+                iteration_bests, first, minimum, n_iterations, n_tours_evaluated
+            )
+        else:
+            response = self._build_verbose_response(
+                iteration_bests, first, minimum, n_iterations, n_tours_evaluated
+            )
+        if self.request.return_pheromones:
+            response.pheromone_snapshot = encode_snapshot(
+                self.state.coordinates, self._get_final_pheromones()
+            )
+        return response
+
+    def _build_verbose_response(
+        self,
+        iteration_bests: List[IterationBest],
+        first: IterationBest,
+        minimum: IterationBest,
+        n_iterations: int,
+        n_tours_evaluated: int,
+    ) -> AntColonyResponse:
+        builder = TrailBuilder(self.state)
+        collection_of_ants_trails = (
+            [
+                builder.build_trail(best.tour, best.pheromones)
+                for best in iteration_bests
+            ]
+            if self.request.include_history
+            else []
+        )
         return AntColonyResponse(
-            first_trail=first_trail,
-            last_trail=minimum_trail,
+            first_trail=builder.build_trail(first.tour, first.pheromones),
+            last_trail=builder.build_trail(minimum.tour, minimum.pheromones),
             collection_of_ants_trails=CollectionOfAntsTrails(
                 trails=collection_of_ants_trails
             ),
+            n_iterations=n_iterations,
+            n_tours_evaluated=n_tours_evaluated,
+            colonies=self._get_colony_stats(),
+        )
+
+    def _iterate_batched(self, n_iterations: int) -> Iterator[IterationBest]:
+        self.colony_runner = BatchedColonyRunner(
+            self.state, self.request.n_colonies, self.request.n_ants
+        )
+        yield from self.colony_runner.iterate(n_iterations, self._get_deadline())
+
+    def iterate(self, max_iterations: Optional[int] = None) -> Iterator[IterationBest]:
+
+        n_iterations = max_iterations or self.request.max_iterations
+        if self.request.n_colonies > 1:
+            yield from self._iterate_batched(n_iterations)
+            return
+
+        deadline = self._get_deadline()
+        convergence_detector = ConvergenceDetector(self.state)
+
+        with TrailMatrixManager(self.state, self.request.n_ants) as manager:
+            for i in range(n_iterations):
+                manager.update_probabilities()
+
+                chosen_tours = manager.choose_trails(i, deadline)
+                chosen_tours = manager.improve_trails(chosen_tours)
+
+                shortest_trail = self._get_min_trail(chosen_tours)
+                manager.update_pheromones(chosen_tours)
+                yield shortest_trail
+
+                if convergence_detector.should_stop(shortest_trail.length):
+                    break
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+
+    def run(
+        self, max_iterations: Optional[int] = None
+    ) -> Union[AntColonyResponse, CompactAntColonyResponse]:
+        iteration_bests = list(self.iterate(max_iterations))
+        minimum_trail = min(iteration_bests, key=lambda best: best.length)
+        return self._build_response(
+            iteration_bests,
+            iteration_bests[0],
+            minimum_trail,
+            n_iterations=len(iteration_bests),
+            n_tours_evaluated=sum(best.n_tours for best in iteration_bests),
+        )
+
+    def stream(
+        self, max_iterations: Optional[int] = None, include_trails: bool = False
+    ) -> Iterator[
+        Union[AntColonyProgress, AntColonyResponse, CompactAntColonyResponse]
+    ]:
+        builder = TrailBuilder(self.state)
+        compact = self.request.response_format == "compact"
+        first_trail = None
+        minimum_trail = None
+        n_iterations = 0
+        n_tours_evaluated = 0
+
+        for iteration_best in self.iterate(max_iterations):
+            n_iterations += 1
+            n_tours_evaluated += iteration_best.n_tours
+            if first_trail is None:
+                first_trail = iteration_best
+            if minimum_trail is None or iteration_best.length < minimum_trail.length:
+                minimum_trail = iteration_best
+            progress = AntColonyProgress(
+                iteration=n_iterations - 1,
+                distance=iteration_best.length,
+                best_distance=self._get_best(minimum_trail).length,
+                n_tours_evaluated=n_tours_evaluated,
+            )
+            if include_trails and compact:
+                progress.compact_trail = builder.build_compact_trail(
+                    iteration_best.tour, iteration_best.length
+                )
+            elif include_trails:
+                progress.trail = builder.build_trail(
+                    iteration_best.tour, iteration_best.pheromones
+                )
+            yield progress
+
+        # The per-iteration history has already been streamed, so the final
+        # payload leaves it out instead of keeping every trail around.
+        yield self._build_response(
+            [],
+            first_trail,
+            minimum_trail,
+            n_iterations=n_iterations,
+            n_tours_evaluated=n_tours_evaluated,
         )
 
 
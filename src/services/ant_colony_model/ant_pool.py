@@ -0,0 +1,159 @@
+import os
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from src.params.ant_colony_params import AntColonyModelParams
+from src.services.ant_colony_model.colony_state import AntTours, ColonyState
+from src.services.ant_colony_model.matrix_storage import CondensedMatrix, Matrix
+from src.services.ant_colony_model.trail_choser import TrailChooser
+from src.services.ant_colony_model.utils import calc_tour_lengths, get_ant_rng
+from src.utils.process_pool import (
+    attach_shared_array,
+    process_pool,
+    release_shared,
+    share_array,
+)
+
+
+@dataclass
+class SharedColonyView:
+    n_points: int
+    distances: Matrix
+    weights: np.ndarray
+    candidates: Optional[np.ndarray]
+    pheromones: Optional[np.ndarray]
+    model_params: AntColonyModelParams
+    entropy: int
+
+
+@dataclass
+class SharedColonySpec:
+    distances_name: str
+    weights_name: str
+    weights_shape: Tuple[int, int]
+    pheromones_name: Optional[str]
+    candidates_name: Optional[str]
+    n_points: int
+    model_params: AntColonyModelParams
+    entropy: int
+
+
+def _get_worker_view(spec: SharedColonySpec) -> SharedColonyView:
+    n_points = spec.n_points
+    dtype = spec.model_params.matrix_dtype
+    if spec.model_params.condensed_matrices:
+        values = attach_shared_array(
+            spec.distances_name, (n_points * (n_points - 1) // 2,), dtype
+        )
+        distances = CondensedMatrix(values, n_points)
+    else:
+        distances = attach_shared_array(
+            spec.distances_name, (n_points, n_points), dtype
+        )
+    pheromones = None
+    if spec.pheromones_name is not None:
+        pheromones = attach_shared_array(
+            spec.pheromones_name, (n_points, n_points), dtype
+        )
+    candidates = None
+    if spec.candidates_name is not None:
+        candidates = attach_shared_array(
+            spec.candidates_name, spec.weights_shape, np.dtype(np.intp).str
+        )
+    return SharedColonyView(
+        n_points=n_points,
+        distances=distances,
+        weights=attach_shared_array(spec.weights_name, spec.weights_shape, dtype),
+        candidates=candidates,
+        pheromones=pheromones,
+        model_params=spec.model_params,
+        entropy=spec.entropy,
+    )
+
+
+def _choose_trails_chunk(
+    spec: SharedColonySpec,
+    iteration: int,
+    ant_indices: List[int],
+    start_indices: List[int],
+) -> Tuple[np.ndarray, np.ndarray]:
+    view = _get_worker_view(spec)
+    trail_chooser = TrailChooser(view)
+    tours = np.empty((len(start_indices), view.n_points), dtype=np.intp)
+    for row, (ant_idx, start_idx) in enumerate(zip(ant_indices, start_indices)):
+        rng = get_ant_rng(view.entropy, iteration, ant_idx)
+        tours[row] = trail_chooser.choose_trail(start_idx, rng)
+    return tours, calc_tour_lengths(view.distances, tours)
+
+
+class AntPool:
+    """
+    Builds ant tours on the shared process pool.
+
+    Distances and choice weights live in shared memory, and every task names
+    the segments it reads. A worker maps a segment the first time it sees it
+    and keeps the mapping for the rest of the run, so each iteration only
+    copies the fresh weights into the shared buffer instead of pickling the
+    matrices. With candidate lists the weights only cover candidate edges, so
+    the pheromones and the candidates are shared as well, for the rows ants
+    compute once they run out of candidates. Every ant draws from its own
+    (seed, iteration, ant) RNG stream, which keeps seeded runs identical
+    whatever the worker count. Workers only read, so in ACS the local
+    pheromone update is applied to every pooled tour once the iteration's
+    ants are built rather than after each step.
+    """
+
+    def __init__(self, state: ColonyState):
+        self.state: ColonyState = state
+        self.n_workers = min(state.model_params.n_workers, os.cpu_count() or 1)
+        distances = state.distances
+        if isinstance(distances, CondensedMatrix):
+            distances = distances.values
+        self._memories = [share_array(distances), share_array(state.weights)]
+        self._shared_weights = self._view(self._memories[1], state.weights)
+        self._shared_pheromones: Optional[np.ndarray] = None
+        pheromones_name = candidates_name = None
+        if state.candidates is not None:
+            pheromones_memory = share_array(state.pheromones)
+            candidates_memory = share_array(state.candidates.astype(np.intp))
+            self._memories += [pheromones_memory, candidates_memory]
+            self._shared_pheromones = self._view(pheromones_memory, state.pheromones)
+            pheromones_name = pheromones_memory.name
+            candidates_name = candidates_memory.name
+        self.spec = SharedColonySpec(
+            distances_name=self._memories[0].name,
+            weights_name=self._memories[1].name,
+            weights_shape=state.weights.shape,
+            pheromones_name=pheromones_name,
+            candidates_name=candidates_name,
+            n_points=state.n_points,
+            model_params=state.model_params,
+            entropy=state.entropy,
+        )
+
+    def _view(self, memory: SharedMemory, like: np.ndarray) -> np.ndarray:
+        return np.ndarray(like.shape, dtype=like.dtype, buffer=memory.buf)
+
+    def choose_trails(self, iteration: int, start_indices: np.ndarray) -> AntTours:
+        self._shared_weights[:] = self.state.weights
+        if self._shared_pheromones is not None:
+            self._shared_pheromones[:] = self.state.pheromones
+        chunks = np.array_split(np.arange(len(start_indices)), self.n_workers)
+        results = process_pool.map(
+            _choose_trails_chunk,
+            [self.spec] * len(chunks),
+            [iteration] * len(chunks),
+            [chunk.tolist() for chunk in chunks],
+            [start_indices[chunk].tolist() for chunk in chunks],
+        )
+        tours, lengths = zip(*results)
+        return AntTours(tours=np.concatenate(tours), lengths=np.concatenate(lengths))
+
+    def close(self):
+        self._shared_weights = self._shared_pheromones = None
+        for memory in self._memories:
+            release_shared(memory)
+        self._memories = []
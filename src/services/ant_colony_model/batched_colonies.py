@@ -0,0 +1,358 @@
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.objects.ant_colony_objects import ColonyStats
+from src.params.ant_colony_params import AntColonyModelParams
+from src.services.ant_colony_model.colony_state import ColonyState, IterationBest
+from src.services.ant_colony_model.convergence_detector import calc_pheromone_entropy
+from src.services.ant_colony_model.local_search import LocalSearch
+from src.services.ant_colony_model.matrix_storage import Matrix, as_square
+from src.services.ant_colony_model.pheromone_updater import (
+    clamp_pheromones,
+    deposit,
+    evaporate_edges,
+    get_pheromone_bounds,
+)
+from src.services.ant_colony_model.trail_choser import TrailChooser
+from src.services.ant_colony_model.utils import (
+    choose_start_indices,
+    draw_step_values,
+    get_ant_rng,
+    get_iteration_rng,
+)
+
+# Upper bound on the (colonies, ants, cities) arrays of one construction pass.
+# Ants are built in blocks under it, and a time budget can cut an iteration
+# between blocks.
+MAX_BLOCK_ELEMENTS = 2**20
+
+
+@dataclass
+class ColonyView:
+    # What TrailChooser reads from a ColonyState, for one colony of the stack.
+    n_points: int
+    model_params: AntColonyModelParams
+    distances: Matrix
+    heuristic: Matrix
+    pheromones: np.ndarray
+    weights: np.ndarray
+    initial_pheromone: float
+    candidates: Optional[np.ndarray] = None
+
+
+class BatchedColonyRunner:
+    """
+    Runs independent colonies over one instance with their pheromones stacked
+    along a leading colony axis.
+
+    Ants of every colony take their steps at the same time, so choice weights,
+    sampling and deposit are single NumPy operations over (colonies, ants,
+    cities) arrays. Distances and the heuristic matrix are shared by all
+    colonies. Each colony gets a seed spawned from the request's seed and
+    draws exactly the numbers a sequential run with that seed would, so a
+    seeded batch returns the same tours as one run per colony. Colony system
+    ants see the local updates of the ants before them, so their tours are
+    built one after another with the sequential chooser on each colony's
+    slice of the stack; only the pheromone updates are batched there. A colony
+    that converges stops while the others carry on.
+    """
+
+    def __init__(
+        self, state: ColonyState, n_colonies: int, n_ants: Optional[int] = None
+    ):
+        self.state: ColonyState = state
+        self.model_params = state.model_params
+        self.n_colonies = n_colonies
+        self.n_ants = n_ants
+        self.colony_seeds = [
+            int(child.generate_state(1)[0])
+            for child in np.random.SeedSequence(state.entropy).spawn(n_colonies)
+        ]
+        n_points = state.n_points
+        # Colonies still running, in the order of the stacked pheromones.
+        self.colonies = np.arange(n_colonies)
+        self.pheromones = np.repeat(state.pheromones[np.newaxis], n_colonies, axis=0)
+        self._stopped_pheromones: Dict[int, np.ndarray] = {}
+        self.heuristic = as_square(state.heuristic)
+        self.best_tours = np.zeros((n_colonies, n_points), dtype=np.intp)
+        self.best_lengths = np.full(n_colonies, state.best_length)
+        if state.best_tour is not None:
+            self.best_tours[:] = state.best_tour
+        self.best_iterations = np.zeros(n_colonies, dtype=int)
+        self.last_mean_lengths = np.zeros(n_colonies)
+        self.stagnation_lengths = np.full(n_colonies, np.inf)
+        self.stagnant_iterations = np.zeros(n_colonies, dtype=int)
+        self.local_search = (
+            LocalSearch(state) if self.model_params.local_search is not None else None
+        )
+
+    def _get_weights(self) -> np.ndarray:
+        return np.power(self.pheromones, self.model_params.alpha) * self.heuristic
+
+    def _get_start_indices(self, iteration: int) -> np.ndarray:
+        n_points = self.state.n_points
+        if self.n_ants is None:
+            return np.tile(np.arange(n_points), (len(self.colonies), 1))
+        return np.stack(
+            [
+                choose_start_indices(
+                    get_iteration_rng(self.colony_seeds[colony], iteration),
+                    n_points,
+                    self.n_ants,
+                )
+                for colony in self.colonies
+            ]
+        )
+
+    def _get_step_draws(self, iteration: int, ants: range) -> np.ndarray:
+        return np.array(
+            [
+                [
+                    draw_step_values(
+                        get_ant_rng(self.colony_seeds[colony], iteration, ant),
+                        self.state.n_points,
+                    )
+                    for ant in ants
+                ]
+                for colony in self.colonies
+            ]
+        )
+
+    def _choose_next(
+        self, rows: np.ndarray, unvisited: np.ndarray, draws: np.ndarray
+    ) -> np.ndarray:
+        n_points = self.state.n_points
+        cumulative = np.cumsum(rows, axis=-1)
+        totals = cumulative[..., -1]
+        rnd = draws[..., 1] * totals
+        chosen = (cumulative <= rnd[..., np.newaxis]).sum(axis=-1)
+        empty = totals <= 0
+        # Rounding can put rnd on the very top of the running sum; those ants
+        # take their last city with a positive weight.
+        on_top = (chosen == n_points) & ~empty
+        if on_top.any():
+            last_positive = np.argmax(rows[on_top][:, ::-1] > 0, axis=-1)
+            chosen[on_top] = n_points - 1 - last_positive
+        # Ants with no positive weight left pick any unvisited city.
+        if empty.any():
+            remaining = np.cumsum(unvisited[empty], axis=-1)
+            picks = (draws[..., 1][empty] * remaining[:, -1]).astype(int)
+            chosen[empty] = np.argmax(remaining > picks[:, np.newaxis], axis=-1)
+        if self.model_params.variant == "colony_system":
+            exploit = (draws[..., 0] < self.model_params.exploitation_rate) & (
+                rows.max(axis=-1) > 0
+            )
+            chosen = np.where(exploit, np.argmax(rows, axis=-1), chosen)
+        return chosen
+
+    def _construct_block(
+        self, weights: np.ndarray, start_indices: np.ndarray, draws: np.ndarray
+    ) -> np.ndarray:
+        n_colonies, n_ants = start_indices.shape
+        colony_idx = np.arange(n_colonies)[:, np.newaxis]
+        ant_idx = np.arange(n_ants)[np.newaxis, :]
+        tours = np.empty((n_colonies, n_ants, self.state.n_points), dtype=np.intp)
+        unvisited = np.ones((n_colonies, n_ants, self.state.n_points), dtype=bool)
+
+        tours[..., 0] = start_indices
+        unvisited[colony_idx, ant_idx, start_indices] = False
+        current_idx = start_indices
+
+        for step in range(1, self.state.n_points):
+            rows = weights[colony_idx, current_idx] * unvisited
+            current_idx = self._choose_next(rows, unvisited, draws[..., step - 1, :])
+            tours[..., step] = current_idx
+            unvisited[colony_idx, ant_idx, current_idx] = False
+
+        return tours
+
+    def _get_colony_view(self, row: int, weights: np.ndarray) -> "ColonyView":
+        return ColonyView(
+            n_points=self.state.n_points,
+            model_params=self.model_params,
+            distances=self.state.distances,
+            heuristic=self.state.heuristic,
+            pheromones=self.pheromones[row],
+            weights=weights[row],
+            initial_pheromone=self.state.initial_pheromone,
+        )
+
+    def _construct_colony_system_tours(
+        self,
+        iteration: int,
+        weights: np.ndarray,
+        start_indices: np.ndarray,
+        deadline: Optional[float],
+    ) -> np.ndarray:
+        n_ants = start_indices.shape[1]
+        tours = np.empty((len(self.colonies), n_ants, self.state.n_points), np.intp)
+        trail_choosers = [
+            TrailChooser(self._get_colony_view(row, weights), local_update=True)
+            for row in range(len(self.colonies))
+        ]
+        for ant in range(n_ants):
+            if ant > 0 and deadline is not None and time.monotonic() >= deadline:
+                return tours[:, :ant]
+            for row, colony in enumerate(self.colonies):
+                rng = get_ant_rng(self.colony_seeds[colony], iteration, ant)
+                tours[row, ant] = trail_choosers[row].choose_trail(
+                    start_indices[row, ant], rng
+                )
+        return tours
+
+    def _construct_tours(
+        self, iteration: int, weights: np.ndarray, deadline: Optional[float] = None
+    ) -> np.ndarray:
+        start_indices = self._get_start_indices(iteration)
+        if self.model_params.variant == "colony_system":
+            return self._construct_colony_system_tours(
+                iteration, weights, start_indices, deadline
+            )
+        n_ants = start_indices.shape[1]
+        block_size = max(
+            1, MAX_BLOCK_ELEMENTS // (len(self.colonies) * self.state.n_points)
+        )
+        blocks = []
+        for first in range(0, n_ants, block_size):
+            if first > 0 and deadline is not None and time.monotonic() >= deadline:
+                break
+            ants = range(first, min(first + block_size, n_ants))
+            blocks.append(
+                self._construct_block(
+                    weights,
+                    start_indices[:, ants.start : ants.stop],
+                    self._get_step_draws(iteration, ants),
+                )
+            )
+        return np.concatenate(blocks, axis=1)
+
+    def _get_tour_lengths(self, tours: np.ndarray) -> np.ndarray:
+        return self.state.distances[tours[..., :-1], tours[..., 1:]].sum(axis=-1)
+
+    def _improve_tours(
+        self, tours: np.ndarray, lengths: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        if self.local_search is None:
+            return tours, lengths
+        if self.model_params.local_search == "iteration_best":
+            ants = np.argmin(lengths, axis=1)
+            pairs = zip(range(len(tours)), ants)
+        else:
+            pairs = np.ndindex(*lengths.shape)
+        for colony, ant in pairs:
+            tours[colony, ant] = self.local_search.improve(tours[colony, ant])
+        return tours, self._get_tour_lengths(tours)
+
+    def _update_pheromones(self, tours: np.ndarray, lengths: np.ndarray):
+        evaporation_rate = self.model_params.evaporation_rate
+        best_lengths = self.best_lengths[self.colonies]
+        if self.model_params.variant == "colony_system":
+            best_tours = self.best_tours[self.colonies][:, np.newaxis]
+            evaporate_edges(self.pheromones, best_tours, evaporation_rate)
+            deposit(
+                self.pheromones,
+                best_tours,
+                best_lengths[:, np.newaxis],
+                scale=evaporation_rate,
+            )
+            return
+        self.pheromones *= 1 - evaporation_rate
+        if self.model_params.variant == "max_min":
+            best_ants = np.argmin(lengths, axis=1)[:, np.newaxis]
+            deposit(
+                self.pheromones,
+                np.take_along_axis(tours, best_ants[..., np.newaxis], axis=1),
+                np.take_along_axis(lengths, best_ants, axis=1),
+            )
+            clamp_pheromones(
+                self.pheromones,
+                *get_pheromone_bounds(
+                    self.model_params, best_lengths, self.state.n_points
+                ),
+            )
+        else:
+            deposit(self.pheromones, tours, lengths)
+
+    def _record_iteration(
+        self, iteration: int, tours: np.ndarray, lengths: np.ndarray
+    ) -> IterationBest:
+        rows = np.arange(len(tours))
+        best_ants = np.argmin(lengths, axis=1)
+        iteration_lengths = lengths[rows, best_ants]
+        improved = iteration_lengths < self.best_lengths[self.colonies]
+        improved_colonies = self.colonies[improved]
+        self.best_lengths[improved_colonies] = iteration_lengths[improved]
+        self.best_tours[improved_colonies] = tours[rows, best_ants][improved]
+        self.best_iterations[improved_colonies] = iteration
+        self.last_mean_lengths[self.colonies] = lengths.mean(axis=1)
+
+        row = int(np.argmin(iteration_lengths))
+        tour = tours[row, best_ants[row]].copy()
+        return IterationBest(
+            tour=tour,
+            length=float(iteration_lengths[row]),
+            pheromones=self.pheromones[row][tour[:-1], tour[1:]].copy(),
+            n_tours=lengths.size,
+        )
+
+    def _stop_converged(self, iteration_lengths: np.ndarray):
+        # Each colony applies the stop rules of a sequential run on its own.
+        colonies = self.colonies
+        improved = iteration_lengths < self.stagnation_lengths[colonies]
+        self.stagnation_lengths[colonies[improved]] = iteration_lengths[improved]
+        self.stagnant_iterations[colonies] = np.where(
+            improved, 0, self.stagnant_iterations[colonies] + 1
+        )
+        stop = np.zeros(len(colonies), dtype=bool)
+        patience = self.model_params.stagnation_patience
+        if patience is not None:
+            stop |= self.stagnant_iterations[colonies] >= patience
+        threshold = self.model_params.entropy_threshold
+        if threshold is not None:
+            stop |= calc_pheromone_entropy(self.pheromones) < threshold
+        if not stop.any():
+            return
+        for row in np.flatnonzero(stop):
+            self._stopped_pheromones[int(colonies[row])] = self.pheromones[row].copy()
+        self.colonies = colonies[~stop]
+        self.pheromones = self.pheromones[~stop]
+
+    def get_colony_pheromones(self, colony: int) -> np.ndarray:
+        if colony in self._stopped_pheromones:
+            return self._stopped_pheromones[colony]
+        return self.pheromones[int(np.flatnonzero(self.colonies == colony)[0])]
+
+    def get_best_pheromones(self) -> np.ndarray:
+        return self.get_colony_pheromones(int(np.argmin(self.best_lengths)))
+
+    def get_colony_stats(self) -> List[ColonyStats]:
+        return [
+            ColonyStats(
+                colony_idx=colony,
+                seed=self.colony_seeds[colony],
+                best_distance=float(self.best_lengths[colony]),
+                best_iteration=int(self.best_iterations[colony]),
+                last_mean_distance=float(self.last_mean_lengths[colony]),
+            )
+            for colony in range(self.n_colonies)
+        ]
+
+    def iterate(
+        self, max_iterations: int, deadline: Optional[float] = None
+    ) -> Iterator[IterationBest]:
+        for i in range(max_iterations):
+            tours = self._construct_tours(i, self._get_weights(), deadline)
+            tours, lengths = self._improve_tours(tours, self._get_tour_lengths(tours))
+
+            iteration_best = self._record_iteration(i, tours, lengths)
+            self._update_pheromones(tours, lengths)
+            yield iteration_best
+
+            self._stop_converged(lengths.min(axis=1))
+            if len(self.colonies) == 0:
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                break
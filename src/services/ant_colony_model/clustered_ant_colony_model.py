@@ -0,0 +1,183 @@
+import math
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from src.objects.ant_colony_objects import (
+    AntColonyRequest,
+    ClusteredAntColonyRequest,
+    ClusteredAntColonyResponse,
+    CompactTrail,
+)
+from src.objects.pythagorean_support_machine_objects import (
+    PythagoreanSupportMachineInput,
+)
+from src.params.ant_colony_params import AntColonyModelParams
+from src.services.ant_colony_model.ant_colony_model import AntColonyModel
+from src.services.ant_colony_model.tour_stitcher import TourStitcher
+from src.services.pythagorean_support_machine_model.pythagorean_support_machine_model import (
+    PythagoreanSupportMachineModel,
+)
+from src.utils.process_pool import process_pool
+
+MAX_SPLIT_GROUPS = 8
+
+
+def _solve_tour(
+    coordinates: np.ndarray,
+    model_params: AntColonyModelParams,
+    max_iterations: int,
+    n_ants: int,
+) -> Tuple[np.ndarray, int]:
+    if len(coordinates) <= 2:
+        return np.arange(len(coordinates), dtype=np.intp), 0
+    request = AntColonyRequest(
+        points=[],
+        model_params=model_params,
+        max_iterations=max_iterations,
+        n_ants=n_ants,
+    )
+    model = AntColonyModel(request, coordinates=coordinates, use_cache=False)
+    n_tours = sum(best.n_tours for best in model.iterate())
+    return model.state.best_tour, n_tours
+
+
+def _solve_tours(
+    arguments: List[Tuple[np.ndarray, AntColonyModelParams, int, int]],
+) -> List[Tuple[np.ndarray, int]]:
+    return [_solve_tour(*argument) for argument in arguments]
+
+
+class ClusteredAntColonyModel:
+    """
+    Cluster-first, route-second solver for point sets too large for one colony.
+
+    Points are split with the Pythagorean support machine clustering until no
+    cluster is larger than max_cluster_size, every cluster's open tour is
+    solved by its own colony on the shared process pool, and the clusters are
+    visited in the order of a colony tour over their centroids. Only
+    per-cluster matrices are ever built, so memory is bounded by the largest
+    cluster instead of the full point set.
+    """
+
+    def __init__(
+        self,
+        request: ClusteredAntColonyRequest,
+        coordinates: Optional[np.ndarray] = None,
+    ):
+        self.request = request
+        self.model_params = request.model_params
+        if coordinates is None:
+            coordinates = np.array(
+                [[point.x, point.y] for point in request.points], dtype=float
+            ).reshape(-1, 2)
+        self.coordinates = coordinates
+        self.seed_sequence = np.random.SeedSequence(self.model_params.seed)
+        self.rng = np.random.default_rng(self.seed_sequence.spawn(1)[0])
+        self.clusters: List[np.ndarray] = []
+
+    def _split_by_median(self, indices: np.ndarray) -> List[np.ndarray]:
+        coordinates = self.coordinates[indices]
+        axis = int(np.argmax(np.ptp(coordinates, axis=0)))
+        order = np.argsort(coordinates[:, axis], kind="stable")
+        return [indices[half] for half in np.array_split(order, 2)]
+
+    def _split(self, indices: np.ndarray) -> List[np.ndarray]:
+        n_groups = min(
+            math.ceil(len(indices) / self.request.max_cluster_size), MAX_SPLIT_GROUPS
+        )
+        input = PythagoreanSupportMachineInput(
+            points=[],
+            n_groups=n_groups,
+            seed=int(self.rng.integers(2**63)),
+        )
+        model = PythagoreanSupportMachineModel(input, self.coordinates[indices])
+        model.fit(self.request.clustering_iterations)
+        labels = model.get_labels()
+        groups = [indices[labels == label] for label in np.unique(labels)]
+        if len(groups) < 2:
+            # The clustering collapsed onto one group, so fall back to a
+            # median cut to guarantee progress.
+            return self._split_by_median(indices)
+        return groups
+
+    def _partition(self) -> List[np.ndarray]:
+        pending = [np.arange(len(self.coordinates))]
+        clusters: List[np.ndarray] = []
+        while pending:
+            indices = pending.pop()
+            if len(indices) <= self.request.max_cluster_size:
+                clusters.append(indices)
+            else:
+                pending.extend(self._split(indices))
+        return clusters
+
+    def _get_cluster_params(self) -> List[AntColonyModelParams]:
+        seeds = [
+            int(child.generate_state(1)[0])
+            for child in self.seed_sequence.spawn(len(self.clusters) + 1)
+        ]
+        return [
+            self.model_params.model_copy(update={"seed": seed, "n_workers": 1})
+            for seed in seeds
+        ]
+
+    def _solve_clusters(
+        self, params: List[AntColonyModelParams]
+    ) -> Tuple[List[np.ndarray], int]:
+        arguments = [
+            (
+                self.coordinates[cluster],
+                cluster_params,
+                self.request.max_iterations,
+                self.request.n_ants,
+            )
+            for cluster, cluster_params in zip(self.clusters, params)
+        ]
+        n_workers = min(
+            self.model_params.n_workers, os.cpu_count() or 1, len(arguments)
+        )
+        if n_workers > 1:
+            # One task per worker keeps this request to n_workers processes
+            # of the shared pool.
+            chunks = [arguments[offset::n_workers] for offset in range(n_workers)]
+            results = [None] * len(arguments)
+            for offset, chunk_results in enumerate(
+                process_pool.map(_solve_tours, chunks)
+            ):
+                results[offset::n_workers] = chunk_results
+        else:
+            results = _solve_tours(arguments)
+        sub_tours = [
+            cluster[tour] for cluster, (tour, _) in zip(self.clusters, results)
+        ]
+        return sub_tours, sum(n_tours for _, n_tours in results)
+
+    def _order_clusters(self, params: AntColonyModelParams) -> Tuple[np.ndarray, int]:
+        centroids = np.array(
+            [self.coordinates[cluster].mean(axis=0) for cluster in self.clusters]
+        )
+        return _solve_tour(
+            centroids, params, self.request.max_iterations, self.request.n_ants
+        )
+
+    def _get_tour_length(self, tour: np.ndarray) -> float:
+        steps = np.diff(self.coordinates[tour], axis=0)
+        return float(np.sqrt((steps**2).sum(axis=1)).sum())
+
+    def run(self) -> ClusteredAntColonyResponse:
+        self.clusters = self._partition()
+        params = self._get_cluster_params()
+        sub_tours, n_tours_evaluated = self._solve_clusters(params[:-1])
+        cluster_order, n_order_tours = self._order_clusters(params[-1])
+        stitcher = TourStitcher(self.coordinates, self.request.boundary_window)
+        tour = stitcher.stitch([sub_tours[idx] for idx in cluster_order])
+        return ClusteredAntColonyResponse(
+            trail=CompactTrail(
+                tour=tour.tolist(), total_distance=self._get_tour_length(tour)
+            ),
+            n_clusters=len(self.clusters),
+            cluster_sizes=[len(self.clusters[idx]) for idx in cluster_order],
+            n_tours_evaluated=n_tours_evaluated + n_order_tours,
+        )
@@ -0,0 +1,188 @@
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from src.objects.ant_colony_objects import Point, PointRequest
+from src.params.ant_colony_params import AntColonyModelParams
+from src.services.ant_colony_model.matrix_cache import hash_coordinates, matrix_cache
+from src.services.ant_colony_model.matrix_storage import Matrix, MatrixStorage
+from src.services.ant_colony_model.neighbour_index import NeighbourIndex
+from src.services.ant_colony_model.utils import (
+    calc_distances_to,
+    calc_heuristic_values,
+    calc_tour_lengths,
+    get_ant_rng,
+    get_iteration_rng,
+)
+
+
+@dataclass
+class AntTours:
+    tours: np.ndarray
+    lengths: np.ndarray
+
+
+@dataclass
+class IterationBest:
+    tour: np.ndarray
+    length: float
+    pheromones: np.ndarray
+    n_tours: int = 0
+
+
+class ColonyState:
+    def __init__(
+        self,
+        points: List[PointRequest],
+        model_params: AntColonyModelParams,
+        coordinates: Optional[np.ndarray] = None,
+        use_cache: bool = True,
+    ):
+        self.model_params = model_params
+        self.use_cache = use_cache
+        if coordinates is None:
+            coordinates = np.array(
+                [[point.x, point.y] for point in points], dtype=float
+            ).reshape(-1, 2)
+        self.coordinates = coordinates
+        self.n_points = len(coordinates)
+        self._points: Optional[List[Point]] = None
+        self.points_key = hash_coordinates(self.coordinates)
+        self.storage = MatrixStorage(model_params)
+        storage_key = (self.storage.dtype.str, self.storage.condensed)
+        self.distances: Matrix = self._get_matrix(
+            ("distances", self.points_key) + storage_key,
+            lambda: self.storage.calc_distances(self.coordinates),
+        )
+        self.heuristic: Matrix = self._get_matrix(
+            ("heuristic", self.points_key, model_params.beta) + storage_key,
+            lambda: self.storage.calc_heuristic(self.distances),
+        )
+        self.initial_pheromone = self._get_initial_pheromone()
+        self.pheromones = self.storage.allocate((self.n_points, self.n_points))
+        self.pheromones.fill(self.initial_pheromone)
+        np.fill_diagonal(self.pheromones, 0.0)
+        self.candidates = self._build_candidates()
+        self.weights = self._allocate_weights()
+        self.entropy = np.random.SeedSequence(model_params.seed).entropy
+        self.best_tour: Optional[np.ndarray] = None
+        self.best_length = float("inf")
+
+    def _get_matrix(self, key: Tuple, compute: Callable[[], Matrix]) -> Matrix:
+        # One-off sub-problems skip the shared cache so they do not evict the
+        # matrices of the instances clients keep coming back to.
+        if not self.use_cache:
+            return compute()
+        return matrix_cache.get_or_compute(key, compute)
+
+    @property
+    def points(self) -> List[Point]:
+        # Only verbose trails need one object per city, so they are built on
+        # first use instead of for every request.
+        if self._points is None:
+            self._points = [
+                Point(idx=i + 1, x=x, y=y)
+                for i, (x, y) in enumerate(self.coordinates.tolist())
+            ]
+        return self._points
+
+    def _get_nearest_neighbour_length(self) -> float:
+        unvisited = np.ones(self.n_points, dtype=bool)
+        current_idx = 0
+        unvisited[current_idx] = False
+        length = 0.0
+        for _ in range(1, self.n_points):
+            row = np.where(unvisited, self.distances[current_idx], np.inf)
+            next_idx = int(np.argmin(row))
+            length += row[next_idx]
+            unvisited[next_idx] = False
+            current_idx = next_idx
+        return max(length, 1e-12)
+
+    def _get_initial_pheromone(self) -> float:
+        # MMAS starts at its upper bound and ACS at tau0 = 1 / (n * L_nn), both
+        # estimated from a greedy nearest-neighbour tour.
+        if self.model_params.variant == "max_min":
+            nearest_neighbour_length = self._get_nearest_neighbour_length()
+            return 1 / (self.model_params.evaporation_rate * nearest_neighbour_length)
+        if self.model_params.variant == "colony_system":
+            nearest_neighbour_length = self._get_nearest_neighbour_length()
+            return 1 / (self.n_points * nearest_neighbour_length)
+        return self.model_params.initial_pheromone
+
+    def _build_candidates(self) -> Optional[np.ndarray]:
+        n_candidates = self.model_params.n_candidates
+        if n_candidates is None or n_candidates >= self.n_points - 1:
+            return None
+        return NeighbourIndex(self.coordinates, n_candidates).query()
+
+    def _allocate_weights(self) -> np.ndarray:
+        # With candidate lists only the (n, k) candidate edges get a choice
+        # weight; the rest of a row is computed when an ant falls back to it.
+        if self.candidates is None:
+            return self.storage.allocate((self.n_points, self.n_points))
+        return self.storage.allocate(self.candidates.shape)
+
+    def _get_mean_pheromone(self) -> float:
+        if self.n_points < 2:
+            return self.initial_pheromone
+        # The diagonal is always zero, so the plain sum only covers edges.
+        n_edges = self.n_points * (self.n_points - 1)
+        return float(self.pheromones.sum(dtype=np.float64)) / n_edges
+
+    def add_points(self, points: List[PointRequest]):
+        new_coordinates = np.array(
+            [[point.x, point.y] for point in points], dtype=float
+        ).reshape(-1, 2)
+        coordinates = np.vstack([self.coordinates, new_coordinates])
+        # Only the rows and columns of the new cities are computed.
+        new_distances = calc_distances_to(coordinates, new_coordinates)
+        new_heuristic = calc_heuristic_values(new_distances, self.model_params.beta)
+        new_pheromones = np.full(new_distances.shape, self._get_mean_pheromone())
+
+        self.distances = self.storage.grow(self.distances, new_distances)
+        self.heuristic = self.storage.grow(self.heuristic, new_heuristic)
+        self.pheromones = self.storage.grow(self.pheromones, new_pheromones)
+        self._reset_shape(coordinates)
+
+    def remove_points(self, indices: List[int]) -> np.ndarray:
+        keep = np.ones(self.n_points, dtype=bool)
+        keep[indices] = False
+        kept = np.flatnonzero(keep)
+        self.distances = self.storage.select(self.distances, kept)
+        self.heuristic = self.storage.select(self.heuristic, kept)
+        self.pheromones = self.storage.select(self.pheromones, kept)
+        self._reset_shape(self.coordinates[kept])
+        new_index = np.cumsum(keep) - 1
+        new_index[~keep] = -1
+        return new_index
+
+    def _reset_shape(self, coordinates: np.ndarray):
+        self.coordinates = coordinates
+        self.n_points = len(coordinates)
+        self._points = None
+        self.points_key = hash_coordinates(coordinates)
+        self.candidates = self._build_candidates()
+        self.weights = self._allocate_weights()
+
+    def record_best(self, chosen_tours: AntTours):
+        min_idx = int(np.argmin(chosen_tours.lengths))
+        if chosen_tours.lengths[min_idx] < self.best_length:
+            self.best_length = float(chosen_tours.lengths[min_idx])
+            self.best_tour = chosen_tours.tours[min_idx].copy()
+
+    def iteration_rng(self, iteration: int) -> np.random.Generator:
+        return get_iteration_rng(self.entropy, iteration)
+
+    def ant_rng(self, iteration: int, ant_idx: int) -> np.random.Generator:
+        return get_ant_rng(self.entropy, iteration, ant_idx)
+
+    def tour_length(self, tour: np.ndarray) -> float:
+        return float(self.distances[tour[:-1], tour[1:]].sum())
+
+    def tour_lengths(self, tours: np.ndarray) -> np.ndarray:
+        return calc_tour_lengths(self.distances, tours)
+
+    def tour_pheromones(self, tour: np.ndarray) -> np.ndarray:
+        return self.pheromones[tour[:-1], tour[1:]].copy()
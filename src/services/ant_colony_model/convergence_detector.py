@@ -0,0 +1,48 @@
+import numpy as np
+
+from src.services.ant_colony_model.colony_state import ColonyState
+
+
+def calc_pheromone_entropy(pheromones: np.ndarray) -> np.ndarray:
+    # Mean row entropy normalised to [0, 1], for one (n, n) matrix or for each
+    # matrix of a stack along leading axes.
+    n_choices = pheromones.shape[-1] - 1
+    if n_choices < 2:
+        return np.zeros(pheromones.shape[:-2])
+    row_totals = pheromones.sum(axis=-1, keepdims=True)
+    probabilities = np.divide(
+        pheromones, row_totals, out=np.zeros_like(pheromones), where=row_totals > 0
+    )
+    log_probabilities = np.log(
+        probabilities, out=np.zeros_like(probabilities), where=probabilities > 0
+    )
+    row_entropy = -(probabilities * log_probabilities).sum(axis=-1)
+    return row_entropy.mean(axis=-1) / np.log(n_choices)
+
+
+class ConvergenceDetector:
+    def __init__(self, state: ColonyState):
+        self.state: ColonyState = state
+        self.model_params = state.model_params
+        self.best_length = float("inf")
+        self.stagnant_iterations = 0
+
+    def get_pheromone_entropy(self) -> float:
+        return float(calc_pheromone_entropy(self.state.pheromones))
+
+    def _is_stagnant(self, iteration_best_length: float) -> bool:
+        if iteration_best_length < self.best_length:
+            self.best_length = iteration_best_length
+            self.stagnant_iterations = 0
+        else:
+            self.stagnant_iterations += 1
+        patience = self.model_params.stagnation_patience
+        return patience is not None and self.stagnant_iterations >= patience
+
+    def _is_collapsed(self) -> bool:
+        threshold = self.model_params.entropy_threshold
+        return threshold is not None and self.get_pheromone_entropy() < threshold
+
+    def should_stop(self, iteration_best_length: float) -> bool:
+        stagnant = self._is_stagnant(iteration_best_length)
+        return stagnant or self._is_collapsed()
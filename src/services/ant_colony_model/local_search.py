@@ -0,0 +1,172 @@
+from collections import deque
+from typing import List, Optional
+
+import numpy as np
+
+from src.services.ant_colony_model.colony_state import ColonyState
+from src.services.ant_colony_model.neighbour_index import NeighbourIndex
+
+MIN_GAIN = 1e-10
+
+
+class LocalSearch:
+    """
+    2-opt and Or-opt improvement of open ant tours.
+
+    The open tour is closed into a cycle through a dummy city that is at zero
+    distance from every other city, so moves that touch the tour's endpoints
+    are ordinary cycle moves. Moves are only tried towards a city's nearest
+    neighbours, and don't-look bits keep a city out of the queue until one of
+    its edges changes.
+    """
+
+    def __init__(self, state: ColonyState):
+        self.state: ColonyState = state
+        self.model_params = state.model_params
+        self.dummy = state.n_points
+        self.neighbours: List[List[int]] = self._get_neighbours().tolist()
+
+    def _get_neighbours(self) -> np.ndarray:
+        if self.state.candidates is not None:
+            return self.state.candidates
+        return NeighbourIndex(
+            self.state.coordinates, self.model_params.local_search_neighbours
+        ).query()
+
+    def _distance(self, a: int, b: int) -> float:
+        if a == self.dummy or b == self.dummy:
+            return 0.0
+        return self.state.distances[a, b]
+
+    def _reverse(self, cycle: List[int], position: List[int], start: int, end: int):
+        size = len(cycle)
+        length = (end - start) % size + 1
+        if length * 2 > size:
+            # Reversing the complement gives the same cycle and moves fewer cities.
+            start, end = (end + 1) % size, (start - 1) % size
+            length = size - length
+        for _ in range(length // 2):
+            a, b = cycle[start], cycle[end]
+            cycle[start], cycle[end] = b, a
+            position[a], position[b] = end, start
+            start = (start + 1) % size
+            end = (end - 1) % size
+
+    def _try_two_opt(
+        self, cycle: List[int], position: List[int], a: int
+    ) -> Optional[List[int]]:
+        size = len(cycle)
+        for direction in (1, -1):
+            a_pos = position[a]
+            b = cycle[(a_pos + direction) % size]
+            d_ab = self._distance(a, b)
+            for c in self.neighbours[a]:
+                d_ac = self._distance(a, c)
+                if d_ac >= d_ab:
+                    break
+                c_pos = position[c]
+                d = cycle[(c_pos + direction) % size]
+                if c == b or d == a:
+                    continue
+                gain = d_ab + self._distance(c, d) - d_ac - self._distance(b, d)
+                if gain > MIN_GAIN:
+                    if direction == 1:
+                        self._reverse(cycle, position, (a_pos + 1) % size, c_pos)
+                    else:
+                        self._reverse(cycle, position, a_pos, (c_pos - 1) % size)
+                    return [a, b, c, d]
+        return None
+
+    def _try_or_opt(
+        self, cycle: List[int], position: List[int], a: int
+    ) -> Optional[List[int]]:
+        size = len(cycle)
+        for segment_length in (1, 2, 3):
+            if size - segment_length < 3:
+                break
+            a_pos = position[a]
+            segment = [cycle[(a_pos + k) % size] for k in range(segment_length)]
+            if self.dummy in segment:
+                break
+            last = segment[-1]
+            prev = cycle[(a_pos - 1) % size]
+            nxt = cycle[(a_pos + segment_length) % size]
+            removal_gain = (
+                self._distance(prev, a)
+                + self._distance(last, nxt)
+                - self._distance(prev, nxt)
+            )
+            if removal_gain <= MIN_GAIN:
+                continue
+            for end, other_end in ((a, last), (last, a)):
+                for c in self.neighbours[end]:
+                    d_end_c = self._distance(end, c)
+                    if d_end_c >= removal_gain:
+                        break
+                    if c in segment:
+                        continue
+                    c_pos = position[c]
+                    for direction in (1, -1):
+                        e = cycle[(c_pos + direction) % size]
+                        if e in segment:
+                            continue
+                        added = (
+                            d_end_c
+                            + self._distance(other_end, e)
+                            - self._distance(c, e)
+                        )
+                        if removal_gain - added > MIN_GAIN:
+                            self._move_segment(
+                                cycle, position, segment, end, c, direction
+                            )
+                            return [prev, nxt, a, last, c, e]
+        return None
+
+    def _move_segment(
+        self,
+        cycle: List[int],
+        position: List[int],
+        segment: List[int],
+        end: int,
+        c: int,
+        direction: int,
+    ):
+        size = len(cycle)
+        after_segment = (position[segment[-1]] + 1) % size
+        rest = [cycle[(after_segment + k) % size] for k in range(size - len(segment))]
+        c_idx = rest.index(c)
+        # The segment goes on c's `direction` side, with `end` touching c.
+        oriented = segment if end == segment[0] else segment[::-1]
+        if direction == 1:
+            new_cycle = rest[: c_idx + 1] + oriented + rest[c_idx + 1 :]
+        else:
+            new_cycle = rest[:c_idx] + oriented[::-1] + rest[c_idx:]
+        cycle[:] = new_cycle
+        for idx, city in enumerate(cycle):
+            position[city] = idx
+
+    def improve(self, tour: np.ndarray) -> np.ndarray:
+        if self.state.n_points < 4:
+            return tour
+        cycle = [self.dummy] + tour.tolist()
+        position = [0] * len(cycle)
+        for idx, city in enumerate(cycle):
+            position[city] = idx
+
+        queue = deque(tour.tolist())
+        active = [True] * len(cycle)
+        while queue:
+            a = queue.popleft()
+            active[a] = False
+            touched = self._try_two_opt(cycle, position, a) or self._try_or_opt(
+                cycle, position, a
+            )
+            if touched is None:
+                continue
+            for city in [a] + touched:
+                if city != self.dummy and not active[city]:
+                    active[city] = True
+                    queue.append(city)
+
+        dummy_pos = position[self.dummy]
+        return np.array(cycle[dummy_pos + 1 :] + cycle[:dummy_pos], dtype=np.intp)
@@ -0,0 +1,81 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+import numpy as np
+
+from src.objects.ant_colony_objects import MatrixCacheStats
+
+MAX_CACHE_BYTES = 512 * 1024**2
+
+
+class MatrixCache:
+    """
+    Process-wide LRU of per-instance matrices, bounded by total bytes.
+
+    Entries are stored read-only because the same array is handed to every
+    request that hits it.
+    """
+
+    def __init__(self, max_bytes: int = MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[Hashable, np.ndarray]" = OrderedDict()
+        self.n_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _evict(self):
+        while self.n_bytes > self.max_bytes and self.entries:
+            _, evicted = self.entries.popitem(last=False)
+            self.n_bytes -= evicted.nbytes
+
+    def get_or_compute(
+        self, key: Hashable, compute: Callable[[], np.ndarray]
+    ) -> np.ndarray:
+        with self._lock:
+            if key in self.entries:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return self.entries[key]
+            self.misses += 1
+
+        matrix = compute()
+        matrix.flags.writeable = False
+        if matrix.nbytes > self.max_bytes:
+            return matrix
+
+        with self._lock:
+            if key not in self.entries:
+                self.entries[key] = matrix
+                self.n_bytes += matrix.nbytes
+                self._evict()
+        return matrix
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.n_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> MatrixCacheStats:
+        with self._lock:
+            return MatrixCacheStats(
+                hits=self.hits,
+                misses=self.misses,
+                n_entries=len(self.entries),
+                n_bytes=self.n_bytes,
+                max_bytes=self.max_bytes,
+            )
+
+
+def hash_coordinates(coordinates: np.ndarray) -> str:
+    contiguous = np.ascontiguousarray(coordinates, dtype=np.float64)
+    digest = hashlib.blake2b(contiguous.tobytes(), digest_size=16)
+    digest.update(str(contiguous.shape).encode())
+    return digest.hexdigest()
+
+
+matrix_cache = MatrixCache()
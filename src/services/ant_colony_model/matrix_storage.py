@@ -0,0 +1,186 @@
+import tempfile
+from typing import Tuple, Union
+
+import numpy as np
+
+from src.params.ant_colony_params import AntColonyModelParams
+from src.services.ant_colony_model.utils import MIN_DISTANCE, calc_distances_to
+
+ROW_BLOCK_SIZE = 256
+
+
+class CondensedMatrix:
+    """
+    Symmetric matrix with a zero diagonal, stored as its upper triangle.
+
+    Entry (i, j) with i < j lives at row_starts[i] + j - i - 1 of a flat
+    array of n * (n - 1) / 2 values. Indexing supports the two access patterns
+    the colony needs from its static matrices: m[i, j] lookups (scalars or
+    index arrays of any shape) and m[i] row reads.
+    """
+
+    def __init__(self, values: np.ndarray, n_points: int):
+        self.values = values
+        self.n_points = n_points
+        rows = np.arange(n_points, dtype=np.intp)
+        self.row_starts = rows * (2 * n_points - rows - 1) // 2
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return (self.n_points, self.n_points)
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.values.dtype
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes
+
+    @property
+    def flags(self):
+        return self.values.flags
+
+    def row_slice(self, i: int) -> slice:
+        start = self.row_starts[i]
+        return slice(start, start + self.n_points - i - 1)
+
+    def row(self, i: int) -> np.ndarray:
+        i = int(i)
+        row = np.zeros(self.n_points, dtype=self.dtype)
+        lower = np.arange(i, dtype=np.intp)
+        row[:i] = self.values[self.row_starts[lower] + i - lower - 1]
+        row[i + 1 :] = self.values[self.row_slice(i)]
+        return row
+
+    def __getitem__(self, key) -> np.ndarray:
+        if not isinstance(key, tuple):
+            return self.row(key)
+        i, j = key
+        if isinstance(i, (int, np.integer)) and isinstance(j, (int, np.integer)):
+            if i == j:
+                return self.dtype.type(0)
+            lo, hi = (i, j) if i < j else (j, i)
+            return self.values[self.row_starts[lo] + hi - lo - 1]
+        lo = np.minimum(i, j)
+        hi = np.maximum(i, j)
+        diagonal = lo == hi
+        index = np.where(diagonal, 0, self.row_starts[lo] + hi - lo - 1)
+        if self.values.size == 0:
+            return np.zeros(index.shape, dtype=self.dtype)
+        return np.where(diagonal, 0, self.values[index])
+
+    def multiply_square(self, square: np.ndarray):
+        for i in range(self.n_points - 1):
+            row = self.values[self.row_slice(i)]
+            square[i, i + 1 :] *= row
+            square[i + 1 :, i] *= row
+        np.fill_diagonal(square, 0.0)
+
+    def to_square(self) -> np.ndarray:
+        square = np.zeros(self.shape, dtype=self.dtype)
+        for i in range(self.n_points - 1):
+            row = self.values[self.row_slice(i)]
+            square[i, i + 1 :] = row
+            square[i + 1 :, i] = row
+        return square
+
+
+Matrix = Union[np.ndarray, CondensedMatrix]
+
+
+def as_square(matrix: Matrix) -> np.ndarray:
+    if isinstance(matrix, CondensedMatrix):
+        return matrix.to_square()
+    return matrix
+
+
+class MatrixStorage:
+    """
+    Allocates the colony's n x n matrices with the configured dtype, in
+    condensed form for the static symmetric ones when requested, and backed
+    by an unlinked temporary file once an array outgrows the memmap
+    threshold.
+    """
+
+    def __init__(self, model_params: AntColonyModelParams):
+        self.model_params = model_params
+        self.dtype = np.dtype(model_params.matrix_dtype)
+        self.condensed = model_params.condensed_matrices
+        self.memmap_threshold_bytes = model_params.memmap_threshold_bytes
+
+    def allocate(self, shape: Tuple[int, ...]) -> np.ndarray:
+        n_bytes = int(np.prod(shape)) * self.dtype.itemsize
+        threshold = self.memmap_threshold_bytes
+        if threshold is None or n_bytes <= threshold or n_bytes == 0:
+            return np.zeros(shape, dtype=self.dtype)
+        # The file is unlinked on creation, so the mapping is its only
+        # reference and the disk space is released with the array.
+        return np.memmap(tempfile.TemporaryFile(), dtype=self.dtype, shape=shape)
+
+    def _allocate_condensed(self, n_points: int) -> CondensedMatrix:
+        values = self.allocate((n_points * (n_points - 1) // 2,))
+        return CondensedMatrix(values, n_points)
+
+    def calc_distances(self, coordinates: np.ndarray) -> Matrix:
+        n_points = len(coordinates)
+        if self.condensed:
+            distances = self._allocate_condensed(n_points)
+            for i in range(n_points - 1):
+                distances.values[distances.row_slice(i)] = calc_distances_to(
+                    coordinates[i + 1 :], coordinates[i : i + 1]
+                )[:, 0]
+            return distances
+        distances = self.allocate((n_points, n_points))
+        for start in range(0, n_points, ROW_BLOCK_SIZE):
+            end = min(start + ROW_BLOCK_SIZE, n_points)
+            distances[start:end] = calc_distances_to(
+                coordinates[start:end], coordinates
+            )
+        return distances
+
+    def calc_heuristic(self, distances: Matrix) -> Matrix:
+        beta = self.model_params.beta
+        if isinstance(distances, CondensedMatrix):
+            heuristic = self._allocate_condensed(distances.n_points)
+            np.maximum(distances.values, MIN_DISTANCE, out=heuristic.values)
+            np.power(heuristic.values, -beta, out=heuristic.values)
+            return heuristic
+        heuristic = self.allocate(distances.shape)
+        np.maximum(distances, MIN_DISTANCE, out=heuristic)
+        np.power(heuristic, -beta, out=heuristic)
+        np.fill_diagonal(heuristic, 0.0)
+        return heuristic
+
+    def grow(self, matrix: Matrix, new_columns: np.ndarray) -> Matrix:
+        # new_columns holds every city's entries against the added cities,
+        # which sit at the end of the new index range.
+        n_old = matrix.shape[0]
+        n_points = new_columns.shape[0]
+        if isinstance(matrix, CondensedMatrix):
+            grown = self._allocate_condensed(n_points)
+            for i in range(n_points - 1):
+                row = grown.values[grown.row_slice(i)]
+                if i < n_old:
+                    row[: n_old - i - 1] = matrix.values[matrix.row_slice(i)]
+                    row[n_old - i - 1 :] = new_columns[i]
+                else:
+                    row[:] = new_columns[i, i - n_old + 1 :]
+            return grown
+        grown = self.allocate((n_points, n_points))
+        grown[:n_old, :n_old] = matrix
+        grown[:, n_old:] = new_columns
+        grown[n_old:, :] = new_columns.T
+        np.fill_diagonal(grown, 0.0)
+        return grown
+
+    def select(self, matrix: Matrix, kept: np.ndarray) -> Matrix:
+        if isinstance(matrix, CondensedMatrix):
+            selected = self._allocate_condensed(len(kept))
+            for new_i, old_i in enumerate(kept[:-1]):
+                row = matrix.row(old_i)
+                selected.values[selected.row_slice(new_i)] = row[kept[new_i + 1 :]]
+            return selected
+        selected = self.allocate((len(kept), len(kept)))
+        selected[:] = matrix[np.ix_(kept, kept)]
+        return selected
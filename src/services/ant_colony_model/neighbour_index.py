@@ -0,0 +1,68 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+class NeighbourIndex:
+    """
+    Uniform grid over the request points for exact k-nearest-neighbour queries.
+
+    Points are bucketed into square cells holding about k points each. The
+    neighbours of a cell's points are searched in rings of cells around it,
+    and a ring is widened until the k-th distance of every point in the cell
+    is covered by the searched radius.
+    """
+
+    def __init__(self, coordinates: np.ndarray, n_neighbours: int):
+        self.coordinates = coordinates
+        self.n_points = len(coordinates)
+        self.n_neighbours = min(n_neighbours, self.n_points - 1)
+        self.origin = coordinates.min(axis=0)
+        extent = float(np.max(coordinates.max(axis=0) - self.origin))
+        n_cells = max(1, int(np.sqrt(self.n_points / max(self.n_neighbours, 1))))
+        self.cell_size = extent / n_cells if extent > 0 else 1.0
+        self.n_cells = n_cells
+        self.cells = self._build_cells()
+
+    def _build_cells(self) -> Dict[Tuple[int, int], np.ndarray]:
+        cell_coords = np.floor((self.coordinates - self.origin) / self.cell_size)
+        cell_coords = np.clip(cell_coords, 0, self.n_cells - 1).astype(int)
+        cells: Dict[Tuple[int, int], List[int]] = {}
+        for idx, (cx, cy) in enumerate(cell_coords):
+            cells.setdefault((cx, cy), []).append(idx)
+        return {cell: np.array(idx, dtype=np.intp) for cell, idx in cells.items()}
+
+    def _ring_members(self, cell: Tuple[int, int], radius: int) -> np.ndarray:
+        cx, cy = cell
+        members = [
+            self.cells[(x, y)]
+            for x in range(cx - radius, cx + radius + 1)
+            for y in range(cy - radius, cy + radius + 1)
+            if (x, y) in self.cells
+        ]
+        return np.concatenate(members)
+
+    def _query_cell(self, cell: Tuple[int, int], members: np.ndarray) -> np.ndarray:
+        radius = 1
+        while True:
+            candidates = self._ring_members(cell, radius)
+            covers_all = radius >= self.n_cells
+            if len(candidates) > self.n_neighbours or covers_all:
+                deltas = (
+                    self.coordinates[members, np.newaxis, :]
+                    - self.coordinates[np.newaxis, candidates, :]
+                )
+                distances = np.sqrt((deltas**2).sum(axis=-1))
+                distances[members[:, np.newaxis] == candidates[np.newaxis, :]] = np.inf
+                nearest = np.argsort(distances, axis=1)[:, : self.n_neighbours]
+                kth_distance = np.take_along_axis(distances, nearest, axis=1)[:, -1]
+                # Anything outside the searched rings is at least this far away.
+                if covers_all or np.all(kth_distance <= radius * self.cell_size):
+                    return candidates[nearest]
+            radius += 1
+
+    def query(self) -> np.ndarray:
+        neighbours = np.empty((self.n_points, self.n_neighbours), dtype=np.intp)
+        for cell, members in self.cells.items():
+            neighbours[members] = self._query_cell(cell, members)
+        return neighbours
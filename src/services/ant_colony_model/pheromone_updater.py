@@ -1,38 +1,141 @@
-from src.objects.ant_colony_objects import Segment, Trail, TrailMatrix
+from typing import Tuple, Union
+
+import numpy as np
+
 from src.params.ant_colony_params import AntColonyModelParams
+from src.services.ant_colony_model.colony_state import AntTours, ColonyState
+
+# The update rules below work on one (n, n) pheromone matrix or on a stack of
+# them with leading axes, in which case tours are (..., n_ants, n_steps) and
+# lengths (..., n_ants) with the same leading axes.
+
+
+def get_edge_indices(tours: np.ndarray, n_points: int) -> np.ndarray:
+    leading_shape = tours.shape[:-2]
+    offsets = np.arange(int(np.prod(leading_shape)), dtype=np.intp).reshape(
+        leading_shape + (1, 1)
+    ) * (n_points * n_points)
+    from_idx, to_idx = tours[..., :-1], tours[..., 1:]
+    forward = offsets + from_idx * n_points + to_idx
+    backward = offsets + to_idx * n_points + from_idx
+    return np.concatenate([forward, backward], axis=-1)
+
+
+def zero_diagonal(pheromones: np.ndarray):
+    diagonal = np.arange(pheromones.shape[-1])
+    pheromones[..., diagonal, diagonal] = 0.0
+
+
+def deposit(
+    pheromones: np.ndarray, tours: np.ndarray, lengths: np.ndarray, scale: float = 1.0
+):
+    edge_indices = get_edge_indices(tours, pheromones.shape[-1])
+    deposits = np.divide(scale, lengths, out=np.zeros(lengths.shape), where=lengths > 0)
+    deposits = np.broadcast_to(deposits[..., np.newaxis], edge_indices.shape)
+    np.add.at(pheromones.reshape(-1), edge_indices, deposits)
+
+
+def evaporate_edges(pheromones: np.ndarray, tours: np.ndarray, evaporation_rate: float):
+    edge_indices = np.unique(get_edge_indices(tours, pheromones.shape[-1]))
+    pheromones.reshape(-1)[edge_indices] *= 1 - evaporation_rate
+
+
+def apply_local_update(
+    pheromones: np.ndarray,
+    tours: np.ndarray,
+    local_evaporation_rate: float,
+    initial_pheromone: float,
+):
+    # Deferred ACS local update for ants built in parallel, where no ant can
+    # see another's steps; k visits of an edge decay it by (1 - rate)^k.
+    edge_indices = get_edge_indices(tours, pheromones.shape[-1]).reshape(-1)
+    visits = np.bincount(edge_indices, minlength=pheromones.size)
+    decay = np.power(1 - local_evaporation_rate, visits).reshape(pheromones.shape)
+    pheromones *= decay
+    pheromones += (1 - decay) * initial_pheromone
+    zero_diagonal(pheromones)
+
+
+def get_pheromone_bounds(
+    model_params: AntColonyModelParams,
+    best_lengths: Union[float, np.ndarray],
+    n_points: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    pheromone_max = model_params.pheromone_max
+    if pheromone_max is None:
+        pheromone_max = 1 / (
+            model_params.evaporation_rate * np.maximum(best_lengths, 1e-12)
+        )
+    pheromone_min = model_params.pheromone_min
+    if pheromone_min is None:
+        pheromone_min = pheromone_max / (2 * n_points)
+    return np.asarray(pheromone_min), np.maximum(pheromone_min, pheromone_max)
+
+
+def clamp_pheromones(
+    pheromones: np.ndarray, pheromone_min: np.ndarray, pheromone_max: np.ndarray
+):
+    np.clip(
+        pheromones,
+        pheromone_min[..., np.newaxis, np.newaxis],
+        pheromone_max[..., np.newaxis, np.newaxis],
+        out=pheromones,
+    )
+    zero_diagonal(pheromones)
 
 
 class PheromoneUpdater:
-    def __init__(self, matrix: TrailMatrix):
-        self.matrix: TrailMatrix = matrix
-        self.model_params = AntColonyModelParams()
-
-    def _is_segment_in_trail(self, segment: Segment, trail: Trail) -> bool:
-        for seg in trail.segments:
-            if (
-                seg.from_p.idx == segment.from_p.idx
-                and seg.to_p.idx == segment.to_p.idx
-            ) or (
-                seg.from_p.idx == segment.to_p.idx
-                and seg.to_p.idx == segment.from_p.idx
-            ):
-                return True
-        return False
-
-    def _update_pheromone(self, segment: Segment, chosen_trails: TrailMatrix) -> float:
-        current_pheromone = segment.pheromone
-        scattered_factor_sum = 0
-        for chosen_trail in chosen_trails.matrix:
-            if self._is_segment_in_trail(segment, chosen_trail):
-                scattered_factor_sum += 1 / chosen_trail.total_distance
-
-        new_pheromone = (
-            current_pheromone * (1 - self.model_params.evaporation_rate)
-            + scattered_factor_sum
+    def __init__(self, state: ColonyState):
+        self.state: ColonyState = state
+        self.model_params = state.model_params
+
+    def _get_best_tours(self, chosen_tours: AntTours) -> AntTours:
+        min_idx = int(np.argmin(chosen_tours.lengths))
+        return AntTours(
+            tours=chosen_tours.tours[min_idx : min_idx + 1],
+            lengths=chosen_tours.lengths[min_idx : min_idx + 1],
+        )
+
+    def _update_ant_system(self, chosen_tours: AntTours):
+        self.state.pheromones *= 1 - self.model_params.evaporation_rate
+        deposit(self.state.pheromones, chosen_tours.tours, chosen_tours.lengths)
+
+    def _update_max_min(self, chosen_tours: AntTours):
+        self.state.pheromones *= 1 - self.model_params.evaporation_rate
+        best_tours = self._get_best_tours(chosen_tours)
+        deposit(self.state.pheromones, best_tours.tours, best_tours.lengths)
+        clamp_pheromones(
+            self.state.pheromones,
+            *get_pheromone_bounds(
+                self.model_params, self.state.best_length, self.state.n_points
+            ),
+        )
+
+    def _update_colony_system(self):
+        evaporation_rate = self.model_params.evaporation_rate
+        best_tours = self.state.best_tour[np.newaxis, :]
+        evaporate_edges(self.state.pheromones, best_tours, evaporation_rate)
+        deposit(
+            self.state.pheromones,
+            best_tours,
+            np.array([self.state.best_length]),
+            scale=evaporation_rate,
+        )
+
+    def apply_local_update(self, chosen_tours: AntTours) -> np.ndarray:
+        apply_local_update(
+            self.state.pheromones,
+            chosen_tours.tours,
+            self.model_params.local_evaporation_rate,
+            self.state.initial_pheromone,
         )
-        return new_pheromone
+        return self.state.pheromones
 
-    def update_pheromones(self, chosen_trails: TrailMatrix) -> TrailMatrix:
-        for trail in self.matrix.matrix:
-            for segment in trail.segments:
-                segment.pheromone = self._update_pheromone(segment, chosen_trails)
+    def update_pheromones(self, chosen_tours: AntTours) -> np.ndarray:
+        if self.model_params.variant == "max_min":
+            self._update_max_min(chosen_tours)
+        elif self.model_params.variant == "colony_system":
+            self._update_colony_system()
+        else:
+            self._update_ant_system(chosen_tours)
+        return self.state.pheromones
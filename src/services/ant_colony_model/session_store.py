@@ -0,0 +1,172 @@
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from src.objects.ant_colony_objects import (
+    AntColonyRequest,
+    AntColonySessionCreateRequest,
+    AntColonySessionOptimizeRequest,
+    AntColonySessionResponse,
+    PointRequest,
+)
+from src.services.ant_colony_model.ant_colony_model import AntColonyModel
+from src.services.ant_colony_model.colony_state import ColonyState
+from src.services.ant_colony_model.tour_repairer import TourRepairer
+from src.services.ant_colony_model.trail_builder import TrailBuilder
+
+MAX_SESSIONS = 256
+MAX_SESSION_BYTES = 2 * 1024**3
+
+
+class SessionStoreFull(Exception):
+    pass
+
+
+class ColonySession:
+    def __init__(self, session_id: str, request: AntColonySessionCreateRequest):
+        self.session_id = session_id
+        self.ttl_seconds = request.ttl_seconds
+        self.model_params = request.model_params
+        self.state = ColonyState(request.points, request.model_params)
+        self.lock = threading.Lock()
+        self.n_iterations = 0
+        self.n_tours_evaluated = 0
+        self.touch()
+
+    def touch(self):
+        self.expires_at = time.monotonic() + self.ttl_seconds
+
+    def get_n_bytes(self, n_points: Optional[int] = None) -> int:
+        # The matrices grow with the square of the point count, so the size
+        # after an insert is projected from the current one.
+        state = self.state
+        matrices = (state.distances, state.heuristic, state.pheromones, state.weights)
+        n_bytes = sum(matrix.nbytes for matrix in matrices)
+        if n_points is None or state.n_points == 0:
+            return n_bytes
+        return int(n_bytes * (n_points / state.n_points) ** 2)
+
+    def _update_best_length(self):
+        self.state.best_length = self.state.tour_length(self.state.best_tour)
+
+    def optimize(self, request: AntColonySessionOptimizeRequest):
+        if self.state.n_points < 2:
+            return
+        model_request = AntColonyRequest(
+            points=[],
+            model_params=self.model_params,
+            max_iterations=request.max_iterations,
+            n_ants=request.n_ants,
+            time_budget_ms=request.time_budget_ms,
+        )
+        model = AntColonyModel(model_request, state=self.state)
+        for iteration_best in model.iterate():
+            self.n_iterations += 1
+            self.n_tours_evaluated += iteration_best.n_tours
+
+    def add_points(self, points: List[PointRequest]):
+        n_old = self.state.n_points
+        self.state.add_points(points)
+        if self.state.best_tour is None:
+            return
+        repairer = TourRepairer(self.state)
+        for city in range(n_old, self.state.n_points):
+            self.state.best_tour = repairer.insert_cheapest(self.state.best_tour, city)
+        self._update_best_length()
+
+    def remove_points(self, indices: List[int]):
+        if max(indices) >= self.state.n_points:
+            raise ValueError("point index out of range")
+        if len(set(indices)) >= self.state.n_points:
+            raise ValueError("a session must keep at least one point")
+        new_index = self.state.remove_points(indices)
+        if self.state.best_tour is None:
+            return
+        repairer = TourRepairer(self.state)
+        self.state.best_tour = repairer.remove_cities(self.state.best_tour, new_index)
+        self._update_best_length()
+
+    def get_response(self) -> AntColonySessionResponse:
+        best_trail = None
+        if self.state.best_tour is not None:
+            best_trail = TrailBuilder(self.state).build_compact_trail(
+                self.state.best_tour, self.state.best_length
+            )
+        return AntColonySessionResponse(
+            session_id=self.session_id,
+            n_points=self.state.n_points,
+            best_trail=best_trail,
+            n_iterations=self.n_iterations,
+            n_tours_evaluated=self.n_tours_evaluated,
+            expires_in_seconds=max(0.0, self.expires_at - time.monotonic()),
+        )
+
+
+class SessionStore:
+    """
+    Live colony sessions, bounded by count and by the bytes of their
+    matrices.
+
+    Expired sessions are dropped whenever the store is used. Live sessions
+    are never evicted to make room: when the store is full, new sessions and
+    inserts are refused with SessionStoreFull until some expire or are
+    deleted.
+    """
+
+    def __init__(
+        self, max_sessions: int = MAX_SESSIONS, max_bytes: int = MAX_SESSION_BYTES
+    ):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.sessions: Dict[str, ColonySession] = {}
+        self._lock = threading.Lock()
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        expired = [
+            session_id
+            for session_id, session in self.sessions.items()
+            if session.expires_at <= now
+        ]
+        for session_id in expired:
+            del self.sessions[session_id]
+
+    def _check_capacity(self, n_new_sessions: int, n_new_bytes: int):
+        self._evict_expired()
+        if len(self.sessions) + n_new_sessions > self.max_sessions:
+            raise SessionStoreFull(f"at most {self.max_sessions} sessions can be open")
+        n_bytes = sum(session.get_n_bytes() for session in self.sessions.values())
+        if n_bytes + n_new_bytes > self.max_bytes:
+            raise SessionStoreFull("sessions are using all of their memory budget")
+
+    def create(self, request: AntColonySessionCreateRequest) -> ColonySession:
+        session = ColonySession(uuid.uuid4().hex, request)
+        with self._lock:
+            self._check_capacity(1, session.get_n_bytes())
+            self.sessions[session.session_id] = session
+        return session
+
+    def reserve_points(self, session: ColonySession, n_points: int):
+        n_new_bytes = (
+            session.get_n_bytes(session.state.n_points + n_points)
+            - session.get_n_bytes()
+        )
+        with self._lock:
+            self._check_capacity(0, n_new_bytes)
+
+    def get(self, session_id: str) -> Optional[ColonySession]:
+        with self._lock:
+            self._evict_expired()
+            session = self.sessions.get(session_id)
+            if session is not None:
+                session.touch()
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            self._evict_expired()
+            return self.sessions.pop(session_id, None) is not None
+
+
+session_store = SessionStore()
@@ -0,0 +1,27 @@
+import numpy as np
+
+from src.services.ant_colony_model.colony_state import ColonyState
+
+
+class TourRepairer:
+    def __init__(self, state: ColonyState):
+        self.state: ColonyState = state
+
+    def insert_cheapest(self, tour: np.ndarray, city: int) -> np.ndarray:
+        if len(tour) == 0:
+            return np.array([city], dtype=np.intp)
+        to_city = self.state.distances[city]
+        # Position k puts the city before tour[k]; 0 and len(tour) are the ends.
+        costs = np.empty(len(tour) + 1)
+        costs[0] = to_city[tour[0]]
+        costs[-1] = to_city[tour[-1]]
+        costs[1:-1] = (
+            to_city[tour[:-1]]
+            + to_city[tour[1:]]
+            - self.state.distances[tour[:-1], tour[1:]]
+        )
+        return np.insert(tour, int(np.argmin(costs)), city)
+
+    def remove_cities(self, tour: np.ndarray, new_index: np.ndarray) -> np.ndarray:
+        remapped = new_index[tour]
+        return remapped[remapped >= 0]
@@ -0,0 +1,91 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from src.services.ant_colony_model.utils import calc_distance_matrix
+
+MIN_GAIN = 1e-10
+
+
+class TourStitcher:
+    """
+    Joins per-cluster open tours, given in cluster order, into one open tour.
+
+    Each sub-tour may be walked forwards or backwards; the orientations that
+    minimise the connecting edges are found by dynamic programming over the
+    two ends of every cluster. A 2-opt pass with fixed endpoints then repairs
+    a window of cities on both sides of every junction, where the clusters'
+    independent solutions meet.
+    """
+
+    def __init__(self, coordinates: np.ndarray, window: int):
+        self.coordinates = coordinates
+        self.window = window
+
+    def _distance(self, a: int, b: int) -> float:
+        return float(np.linalg.norm(self.coordinates[a] - self.coordinates[b]))
+
+    def _orient(self, sub_tours: List[np.ndarray]) -> List[np.ndarray]:
+        # costs[o] is the cheapest chain so far with the last cluster in
+        # orientation o (0 forwards, 1 reversed).
+        ends = [(tour[0], tour[-1]) for tour in sub_tours]
+        costs = np.zeros(2)
+        choices: List[Tuple[int, int]] = []
+        for (prev_first, prev_last), (first, last) in zip(ends[:-1], ends[1:]):
+            exits = (prev_last, prev_first)
+            entries = (first, last)
+            step = np.array(
+                [
+                    [costs[o] + self._distance(exits[o], entries[n]) for o in (0, 1)]
+                    for n in (0, 1)
+                ]
+            )
+            choices.append(tuple(np.argmin(step, axis=1)))
+            costs = step.min(axis=1)
+
+        orientation = int(np.argmin(costs))
+        oriented = [sub_tours[-1] if orientation == 0 else sub_tours[-1][::-1]]
+        for idx in range(len(sub_tours) - 2, -1, -1):
+            orientation = int(choices[idx][orientation])
+            tour = sub_tours[idx]
+            oriented.append(tour if orientation == 0 else tour[::-1])
+        return oriented[::-1]
+
+    def _two_opt(self, path: np.ndarray) -> np.ndarray:
+        distances = calc_distance_matrix(self.coordinates[path])
+        order = np.arange(len(path))
+        size = len(order)
+        while True:
+            # gains[i, k] for reversing order[i..k], with both path ends fixed.
+            i_idx, k_idx = np.triu_indices(size - 1, k=1)
+            keep = i_idx >= 1
+            i_idx, k_idx = i_idx[keep], k_idx[keep]
+            if len(i_idx) == 0:
+                return path
+            before, first = order[i_idx - 1], order[i_idx]
+            last, after = order[k_idx], order[k_idx + 1]
+            gains = (
+                distances[before, first]
+                + distances[last, after]
+                - distances[before, last]
+                - distances[first, after]
+            )
+            best = int(np.argmax(gains))
+            if gains[best] <= MIN_GAIN:
+                return path[order]
+            i, k = i_idx[best], k_idx[best]
+            order[i : k + 1] = order[i : k + 1][::-1]
+
+    def _repair_junction(self, tour: np.ndarray, junction: int):
+        start = max(0, junction - self.window - 1)
+        end = min(len(tour), junction + self.window + 1)
+        if end - start >= 4:
+            tour[start:end] = self._two_opt(tour[start:end])
+
+    def stitch(self, sub_tours: List[np.ndarray]) -> np.ndarray:
+        oriented = self._orient(sub_tours)
+        tour = np.concatenate(oriented)
+        junctions = np.cumsum([len(sub_tour) for sub_tour in oriented])[:-1]
+        for junction in junctions:
+            self._repair_junction(tour, int(junction))
+        return tour
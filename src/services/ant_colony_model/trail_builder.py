@@ -0,0 +1,25 @@
+import numpy as np
+
+from src.objects.ant_colony_objects import CompactTrail, Segment, Trail
+from src.services.ant_colony_model.colony_state import ColonyState
+
+
+class TrailBuilder:
+    def __init__(self, state: ColonyState):
+        self.state: ColonyState = state
+
+    def build_trail(self, tour: np.ndarray, pheromones: np.ndarray) -> Trail:
+        segments = [
+            Segment(
+                from_p=self.state.points[from_idx],
+                to_p=self.state.points[to_idx],
+                distance=self.state.distances[from_idx, to_idx],
+                pheromone=pheromone,
+            )
+            for from_idx, to_idx, pheromone in zip(tour[:-1], tour[1:], pheromones)
+        ]
+        total_distance = sum(seg.distance for seg in segments)
+        return Trail(segments=segments, total_distance=total_distance)
+
+    def build_compact_trail(self, tour: np.ndarray, length: float) -> CompactTrail:
+        return CompactTrail(tour=tour.tolist(), total_distance=length)
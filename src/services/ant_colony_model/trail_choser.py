@@ -1,104 +1,154 @@
-import random
-from copy import deepcopy
-from typing import List
+from typing import List, Optional
 
-from src.objects.ant_colony_objects import Segment, Trail, TrailMatrix
-from src.params.ant_colony_params import AntColonyModelParams
+import numpy as np
+
+from src.services.ant_colony_model.colony_state import ColonyState
 from src.services.ant_colony_model.utils import (
-    calc_distance,
-    get_segment_pheromone_density,
+    calc_heuristic_values,
+    draw_step_values,
 )
 
 
 class TrailChooser:
 
-    def __init__(self, matrix: TrailMatrix):
-        self.matrix: TrailMatrix = matrix
-        self.model_params = AntColonyModelParams()
-
-    def _get_pheromone_from_matrix(self, segment: Segment) -> float:
-        a_idx, b_idx = segment.from_p.idx, segment.to_p.idx
-
-        for trail in self.matrix.matrix:
-            for seg in trail.segments:
-                seg_a, seg_b = seg.from_p.idx, seg.to_p.idx
-                if {a_idx, b_idx} == {seg_a, seg_b}:
-                    return seg.pheromone
-
-        return 1.0
-
-    def _compute_total_density(self, segments: List[Segment]) -> float:
-        return sum(
-            get_segment_pheromone_density(seg, self.model_params) for seg in segments
-        )
-
-    def _update_segment_probabilities(
-        self, segments: List[Segment], total_density: float
-    ):
-        for seg in segments:
-            seg_density = get_segment_pheromone_density(seg, self.model_params)
-            seg.probability = (
-                seg_density / total_density if total_density > 0 else 1 / len(segments)
+    def __init__(self, state: ColonyState, local_update: bool = False):
+        self.state: ColonyState = state
+        self.model_params = state.model_params
+        # ACS local update: every step pulls the edge just walked back toward
+        # the initial pheromone, so the ants built after it in the same
+        # iteration are less likely to repeat it.
+        self.local_update = local_update
+        self._unvisited = np.empty(state.n_points, dtype=bool)
+        self._masked_weights = np.empty(state.n_points)
+        self._cumulative = np.empty(state.n_points)
+        self._candidate_rows: Optional[List[List[int]]] = None
+        self._candidate_weights: Optional[List[List[float]]] = None
+        self._open: List[bool] = []
+        if state.candidates is not None:
+            # A candidate step only looks at k entries, where plain lists cost
+            # less per step than the NumPy calls they replace.
+            self._candidate_rows = state.candidates.tolist()
+            self._candidate_weights = state.weights.tolist()
+
+    def _should_exploit(self, exploit_draw: float) -> bool:
+        if self.model_params.variant != "colony_system":
+            return False
+        return exploit_draw < self.model_params.exploitation_rate
+
+    def _choose_candidate(
+        self, current_idx: int, choice_draw: float, exploit: bool
+    ) -> Optional[int]:
+        candidates = self._candidate_rows[current_idx]
+        is_open = self._open
+        weights = [
+            weight if is_open[candidate] else 0.0
+            for candidate, weight in zip(
+                candidates, self._candidate_weights[current_idx]
             )
-
-    def _choose_segment(self, segments: List[Segment]) -> Segment:
-        rnd = random.random()
-        cumulative = 0.0
-        for seg in segments:
-            cumulative += seg.probability
-            if rnd <= cumulative:
-                return seg
-        return segments[-1]  # fallback
-
-    def _update_remaining_segments(
-        self, chosen_seg: Segment, remaining_segments: List[Segment]
-    ):
-        new_from_point = chosen_seg.to_p
-
-        for seg in remaining_segments:
-            seg.from_p = deepcopy(new_from_point)
-            seg.distance = calc_distance(seg.from_p, seg.to_p)
-            seg.pheromone = self._get_pheromone_from_matrix(seg)
-            seg.probability = None
-
-    def choose_trail(self, probable_trail: Trail) -> Trail:
-        available_segments = deepcopy(probable_trail.segments)
-        factual_segments = []
-
-        while available_segments:
-            # Step 1: Compute total pheromone density
-            total_density = self._compute_total_density(available_segments)
-
-            # Step 2: Update probabilities
-            self._update_segment_probabilities(available_segments, total_density)
-
-            # Step 3: Choose a segment probabilistically
-            chosen_seg = self._choose_segment(available_segments)
-
-            # Step 4: Add chosen segment to factual trail
-            factual_seg = deepcopy(chosen_seg)
-            factual_seg.probability = None
-            factual_segments.append(factual_seg)
-
-            # Step 5: Remove chosen segment
-            available_segments.remove(chosen_seg)
-
-            # Step 6: Stop if no segments left
-            if not available_segments:
-                break
-
-            # Step 7: Update remaining segments (geometry + pheromone)
-            self._update_remaining_segments(chosen_seg, available_segments)
-
-            # Step 8: If only one segment remains, add it and stop
-            if len(available_segments) == 1:
-                last_seg = deepcopy(available_segments[0])
-                last_seg.probability = None
-                factual_segments.append(last_seg)
-                break
-
-        total_distance = sum(seg.distance for seg in factual_segments)
-        factual_trail = Trail(segments=factual_segments, total_distance=total_distance)
-
-        # Step 9: Return the new factual trail
-        return factual_trail
+        ]
+        if exploit:
+            best = max(range(len(weights)), key=weights.__getitem__)
+            if weights[best] > 0:
+                return candidates[best]
+        total = sum(weights)
+        if total > 0:
+            rnd = choice_draw * total
+            cumulative = 0.0
+            for candidate, weight in zip(candidates, weights):
+                cumulative += weight
+                if cumulative > rnd:
+                    return candidate
+            # Rounding can put rnd on the very top of the running sum.
+            return next(
+                candidate
+                for candidate, weight in zip(candidates[::-1], weights[::-1])
+                if weight > 0
+            )
+        remaining = [candidate for candidate in candidates if is_open[candidate]]
+        if not remaining:
+            return None
+        return remaining[int(choice_draw * len(remaining))]
+
+    def _get_row_weights(self, current_idx: int) -> np.ndarray:
+        if self._candidate_rows is None:
+            return self.state.weights[current_idx]
+        # Every candidate is visited, which is rare enough that the full row
+        # is computed here instead of being kept for every city.
+        row = calc_heuristic_values(
+            self.state.distances[current_idx], self.model_params.beta
+        )
+        row *= np.power(self.state.pheromones[current_idx], self.model_params.alpha)
+        row[current_idx] = 0.0
+        return row
+
+    def _choose_next(self, current_idx: int, draws: List[float]) -> int:
+        exploit_draw, choice_draw = draws
+        exploit = self._should_exploit(exploit_draw)
+        if self._candidate_rows is not None:
+            chosen = self._choose_candidate(current_idx, choice_draw, exploit)
+            if chosen is not None:
+                return chosen
+        np.multiply(
+            self._get_row_weights(current_idx),
+            self._unvisited,
+            out=self._masked_weights,
+        )
+        if exploit and self._masked_weights.max() > 0:
+            return int(np.argmax(self._masked_weights))
+        np.cumsum(self._masked_weights, out=self._cumulative)
+        total_density = self._cumulative[-1]
+        if total_density > 0:
+            rnd = choice_draw * total_density
+            # Visited cities add nothing to the running sum, so the first
+            # entry strictly above rnd is always an unvisited city.
+            chosen = int(np.searchsorted(self._cumulative, rnd, side="right"))
+            if chosen < self.state.n_points:
+                return chosen
+            # Rounding can put rnd on the very top of the running sum.
+            return int(np.flatnonzero(self._masked_weights)[-1])
+        remaining = np.flatnonzero(self._unvisited)
+        return int(remaining[int(choice_draw * len(remaining))])
+
+    def _set_weight(self, from_idx: int, to_idx: int, weight: float):
+        if self._candidate_rows is None:
+            self.state.weights[from_idx, to_idx] = weight
+            return
+        candidates = self._candidate_rows[from_idx]
+        if to_idx in candidates:
+            self._candidate_weights[from_idx][candidates.index(to_idx)] = weight
+
+    def _apply_local_update(self, from_idx: int, to_idx: int):
+        rate = self.model_params.local_evaporation_rate
+        pheromones = self.state.pheromones
+        pheromone = (1 - rate) * pheromones[from_idx, to_idx] + (
+            rate * self.state.initial_pheromone
+        )
+        pheromones[from_idx, to_idx] = pheromones[to_idx, from_idx] = pheromone
+        # np.power rather than ** keeps the result bit-identical to the
+        # full weight matrix computed at the start of the next iteration.
+        weight = (
+            np.power(pheromone, self.model_params.alpha)
+            * self.state.heuristic[from_idx, to_idx]
+        )
+        self._set_weight(from_idx, to_idx, weight)
+        self._set_weight(to_idx, from_idx, weight)
+
+    def choose_trail(self, start_idx: int, rng: np.random.Generator) -> np.ndarray:
+        tour = np.empty(self.state.n_points, dtype=np.intp)
+        self._unvisited.fill(True)
+        self._open = [True] * self.state.n_points
+
+        tour[0] = start_idx
+        current_idx = int(start_idx)
+        self._unvisited[current_idx] = self._open[current_idx] = False
+
+        draws = draw_step_values(rng, self.state.n_points).tolist()
+        for step in range(1, self.state.n_points):
+            next_idx = self._choose_next(current_idx, draws[step - 1])
+            if self.local_update:
+                self._apply_local_update(current_idx, next_idx)
+            current_idx = next_idx
+            tour[step] = current_idx
+            self._unvisited[current_idx] = self._open[current_idx] = False
+
+        return tour
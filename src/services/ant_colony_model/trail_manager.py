@@ -1,30 +1,87 @@
-from src.objects.ant_colony_objects import TrailMatrix
-from src.params.ant_colony_params import AntColonyModelParams
+import time
+from typing import Optional
+
+import numpy as np
+
+from src.services.ant_colony_model.ant_pool import AntPool
+from src.services.ant_colony_model.colony_state import AntTours, ColonyState
+from src.services.ant_colony_model.local_search import LocalSearch
 from src.services.ant_colony_model.pheromone_updater import PheromoneUpdater
 from src.services.ant_colony_model.probability_updater import ProbabilityUpdater
 from src.services.ant_colony_model.trail_choser import TrailChooser
+from src.services.ant_colony_model.utils import choose_start_indices
 
 
 class TrailMatrixManager:
-    def __init__(self, matrix: TrailMatrix):
-        self.matrix: TrailMatrix = matrix
-        self.model_params = AntColonyModelParams()
+    def __init__(self, state: ColonyState, n_ants: Optional[int] = None):
+        self.state: ColonyState = state
+        self.model_params = state.model_params
+        self.n_ants = n_ants
+        self.ant_pool = AntPool(state) if self.model_params.n_workers > 1 else None
+        self.local_search = (
+            LocalSearch(state) if self.model_params.local_search is not None else None
+        )
+
+    def __enter__(self) -> "TrailMatrixManager":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
-    def get_trail_matrix(self) -> TrailMatrix:
-        return self.matrix
+    def close(self):
+        if self.ant_pool is not None:
+            self.ant_pool.close()
+            self.ant_pool = None
 
-    def update_probabilities(self):
-        updater = ProbabilityUpdater(self.matrix)
+    def update_probabilities(self) -> np.ndarray:
+        updater = ProbabilityUpdater(self.state)
         return updater.update_probabilities()
 
-    def choose_trails(self) -> TrailMatrix:
-        trail_chooser = TrailChooser(self.matrix)
-        new_trails = []
-        for probable_trail in self.matrix.matrix:
-            new_trail = trail_chooser.choose_trail(probable_trail)
-            new_trails.append(new_trail)
-        return TrailMatrix(matrix=new_trails)
-
-    def update_pheromones(self, chosen_trails: TrailMatrix) -> TrailMatrix:
-        updater = PheromoneUpdater(self.matrix)
-        return updater.update_pheromones(chosen_trails)
+    def get_start_indices(self, iteration: int) -> np.ndarray:
+        if self.n_ants is None:
+            return np.arange(self.state.n_points)
+        rng = self.state.iteration_rng(iteration)
+        return choose_start_indices(rng, self.state.n_points, self.n_ants)
+
+    def choose_trails(
+        self, iteration: int = 0, deadline: Optional[float] = None
+    ) -> AntTours:
+        chosen_tours = self._construct_trails(iteration, deadline)
+        if self.model_params.variant == "colony_system" and self.ant_pool is not None:
+            # Pooled ants are built against a shared copy of the weights, so
+            # their local updates can only be applied once they are done.
+            PheromoneUpdater(self.state).apply_local_update(chosen_tours)
+        return chosen_tours
+
+    def _construct_trails(self, iteration: int, deadline: Optional[float]) -> AntTours:
+        start_indices = self.get_start_indices(iteration)
+        if self.ant_pool is not None:
+            return self.ant_pool.choose_trails(iteration, start_indices)
+        trail_chooser = TrailChooser(
+            self.state, local_update=self.model_params.variant == "colony_system"
+        )
+        tours = np.empty((len(start_indices), self.state.n_points), dtype=np.intp)
+        for ant_idx, start_idx in enumerate(start_indices):
+            if ant_idx > 0 and deadline is not None and time.monotonic() >= deadline:
+                tours = tours[:ant_idx]
+                break
+            rng = self.state.ant_rng(iteration, ant_idx)
+            tours[ant_idx] = trail_chooser.choose_trail(start_idx, rng)
+        return AntTours(tours=tours, lengths=self.state.tour_lengths(tours))
+
+    def improve_trails(self, chosen_tours: AntTours) -> AntTours:
+        if self.local_search is None:
+            return chosen_tours
+        if self.model_params.local_search == "iteration_best":
+            ants = [int(np.argmin(chosen_tours.lengths))]
+        else:
+            ants = range(len(chosen_tours.tours))
+        for ant in ants:
+            chosen_tours.tours[ant] = self.local_search.improve(chosen_tours.tours[ant])
+        chosen_tours.lengths = self.state.tour_lengths(chosen_tours.tours)
+        return chosen_tours
+
+    def update_pheromones(self, chosen_tours: AntTours) -> np.ndarray:
+        self.state.record_best(chosen_tours)
+        updater = PheromoneUpdater(self.state)
+        return updater.update_pheromones(chosen_tours)
@@ -1,25 +1,78 @@
 import random
-from typing import Any, List, Tuple
+from typing import Any, List, Optional, Tuple
 
 import numpy as np
 
-from src.objects.ant_colony_objects import Point, Segment
 from src.params.ant_colony_params import AntColonyModelParams
 
+MIN_DISTANCE = 1e-12
 
-def calc_distance(a: Point, b: Point) -> float:
-    dx = a.x - b.x
-    dy = a.y - b.y
-    return (dx**2 + dy**2) ** 0.5
 
+def calc_distance_matrix(coordinates: np.ndarray) -> np.ndarray:
+    return calc_distances_to(coordinates, coordinates)
 
-def get_segment_pheromone_density(
-    segment: Segment, model_params: AntColonyModelParams
-) -> float:
-    pheromone_density = np.power(segment.pheromone, model_params.alpha) / np.power(
-        segment.distance, model_params.beta
-    )
-    return pheromone_density
+
+def calc_tour_lengths(distances: np.ndarray, tours: np.ndarray) -> np.ndarray:
+    return distances[tours[:, :-1], tours[:, 1:]].sum(axis=1)
+
+
+def get_iteration_rng(entropy: int, iteration: int) -> np.random.Generator:
+    seed_sequence = np.random.SeedSequence(entropy, spawn_key=(iteration,))
+    return np.random.default_rng(seed_sequence)
+
+
+def get_ant_rng(entropy: int, iteration: int, ant_idx: int) -> np.random.Generator:
+    seed_sequence = np.random.SeedSequence(entropy, spawn_key=(iteration, ant_idx))
+    return np.random.default_rng(seed_sequence)
+
+
+def draw_step_values(rng: np.random.Generator, n_points: int) -> np.ndarray:
+    # One (exploitation, choice) pair per step, drawn up front so a tour uses
+    # the same numbers whether it is built alone or with other ants at once.
+    return rng.random((max(n_points - 1, 0), 2))
+
+
+def choose_start_indices(
+    rng: np.random.Generator, n_points: int, n_ants: int
+) -> np.ndarray:
+    # Distinct start cities unless there are more ants than cities.
+    return rng.choice(n_points, size=n_ants, replace=n_ants > n_points)
+
+
+def calc_distances_to(coordinates: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    deltas = coordinates[:, np.newaxis, :] - targets[np.newaxis, :, :]
+    return np.sqrt((deltas**2).sum(axis=-1))
+
+
+def calc_heuristic_values(distances: np.ndarray, beta: float) -> np.ndarray:
+    return np.power(np.maximum(distances, MIN_DISTANCE), -beta)
+
+
+def get_candidate_weights(
+    pheromones: np.ndarray,
+    heuristic: np.ndarray,
+    candidates: np.ndarray,
+    model_params: AntColonyModelParams,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    rows = np.arange(len(candidates))[:, np.newaxis]
+    weights = np.power(pheromones[rows, candidates], model_params.alpha, out=out)
+    weights *= heuristic[rows, candidates]
+    return weights
+
+
+def get_pheromone_density_matrix(
+    pheromones: np.ndarray,
+    heuristic: np.ndarray,
+    model_params: AntColonyModelParams,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    weights = np.power(pheromones, model_params.alpha, out=out)
+    if isinstance(heuristic, np.ndarray):
+        weights *= heuristic
+    else:
+        heuristic.multiply_square(weights)
+    return weights
 
 
 def random_points(n_points: int, max_val: int) -> List[Tuple[int, int]]:
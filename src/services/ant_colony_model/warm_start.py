@@ -0,0 +1,83 @@
+import base64
+from typing import Dict, Tuple
+
+import numpy as np
+
+from src.objects.ant_colony_objects import PheromoneSnapshot
+from src.services.ant_colony_model.colony_state import ColonyState, IterationBest
+
+
+def encode_array(array: np.ndarray, dtype: type) -> str:
+    return base64.b64encode(np.ascontiguousarray(array, dtype=dtype).tobytes()).decode()
+
+
+def decode_array(data: str, dtype: type) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(data), dtype=dtype)
+
+
+def encode_snapshot(
+    coordinates: np.ndarray, pheromones: np.ndarray
+) -> PheromoneSnapshot:
+    upper = np.triu_indices(len(coordinates), k=1)
+    return PheromoneSnapshot(
+        n_points=len(coordinates),
+        points=encode_array(coordinates, np.float64),
+        pheromones=encode_array(pheromones[upper], np.float32),
+    )
+
+
+def decode_snapshot(snapshot: PheromoneSnapshot) -> Tuple[np.ndarray, np.ndarray]:
+    n_points = snapshot.n_points
+    coordinates = decode_array(snapshot.points, np.float64).reshape(n_points, 2)
+    condensed = decode_array(snapshot.pheromones, np.float32).astype(np.float64)
+    pheromones = np.zeros((n_points, n_points))
+    upper = np.triu_indices(n_points, k=1)
+    pheromones[upper] = condensed
+    pheromones.T[upper] = condensed
+    return coordinates, pheromones
+
+
+class WarmStarter:
+    def __init__(self, state: ColonyState):
+        self.state: ColonyState = state
+        self.model_params = state.model_params
+
+    def _match_points(self, coordinates: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        snapshot_idx: Dict[Tuple[float, float], int] = {
+            (x, y): idx for idx, (x, y) in enumerate(coordinates.tolist())
+        }
+        current_idx, matched_idx = [], []
+        for idx, (x, y) in enumerate(self.state.coordinates.tolist()):
+            if (x, y) in snapshot_idx:
+                current_idx.append(idx)
+                matched_idx.append(snapshot_idx[(x, y)])
+        return np.array(current_idx, dtype=np.intp), np.array(
+            matched_idx, dtype=np.intp
+        )
+
+    def apply_snapshot(self, snapshot: PheromoneSnapshot):
+        coordinates, pheromones = decode_snapshot(snapshot)
+        current_idx, matched_idx = self._match_points(coordinates)
+        off_diagonal = ~np.eye(len(coordinates), dtype=bool)
+        if not off_diagonal.any() or len(current_idx) == 0:
+            return
+        # Edges touching new cities start at the snapshot's mean level, so
+        # they are neither favoured nor starved next to the learned edges.
+        self.state.pheromones[:] = pheromones[off_diagonal].mean()
+        self.state.pheromones[np.ix_(current_idx, current_idx)] = pheromones[
+            np.ix_(matched_idx, matched_idx)
+        ]
+        np.fill_diagonal(self.state.pheromones, 0.0)
+
+    def apply_initial_tour(self, tour: np.ndarray, n_ants: int) -> IterationBest:
+        length = self.state.tour_length(tour)
+        if length > 0:
+            # Reinforce the tour as if every ant of one iteration had walked it.
+            deposit = n_ants / length
+            self.state.pheromones[tour[:-1], tour[1:]] += deposit
+            self.state.pheromones[tour[1:], tour[:-1]] += deposit
+        self.state.best_tour = tour.copy()
+        self.state.best_length = length
+        return IterationBest(
+            tour=tour, length=length, pheromones=self.state.tour_pheromones(tour)
+        )
@@ -1,19 +1,34 @@
-from src.objects.pythagorean_support_machine_objects import (
-    MainMatrix,
-    Node,
-    Point,
-    PointStatus,
+from typing import Optional
+
+import numpy as np
+
+from src.services.pythagorean_support_machine_model.clustering_state import (
+    ClusteringState,
+)
+from src.services.pythagorean_support_machine_model.tile_runner import TileRunner
+from src.services.pythagorean_support_machine_model.utils import (
+    calculate_centroid_sums,
+    divide_centroid_sums,
 )
-from src.services.pythagorean_support_machine_model.utils import calculate_centroid
 
 
 class CentroidUpdater:
-    def __init__(self, matrix: MainMatrix):
-        self.matrix = matrix
+    def __init__(
+        self, state: ClusteringState, tile_runner: Optional[TileRunner] = None
+    ):
+        self.state = state
+        self.tile_runner = tile_runner or TileRunner()
 
-    def update_centroids(self) -> MainMatrix:
-        for node in self.matrix.nodes:
-            node.centroid = calculate_centroid(
-                node.points_status, len(node.points_status[0].point.coordinates)
-            )
-        return self.matrix
+    def update_centroids(self) -> np.ndarray:
+        points = self.state.points
+        memberships = self.state.memberships
+        partial_sums = self.tile_runner.map(
+            lambda tile: calculate_centroid_sums(points[tile], memberships[tile]),
+            len(points),
+        )
+        weighted_sums = sum(weighted_sums for weighted_sums, _ in partial_sums)
+        totals = sum(totals for _, totals in partial_sums)
+        self.state.centroids = divide_centroid_sums(
+            weighted_sums, totals, self.state.centroids
+        )
+        return self.state.centroids
@@ -0,0 +1,33 @@
+from typing import Tuple
+
+import numpy as np
+
+from src.objects.pythagorean_support_machine_objects import (
+    ClusterModelArtifact,
+    ClusterPredictOutput,
+)
+from src.services.pythagorean_support_machine_model.utils import (
+    calculate_distances,
+    calculate_memberships,
+)
+
+
+class ClusterPredictor:
+    def __init__(self, artifact: ClusterModelArtifact):
+        self.artifact = artifact
+        self.centroids = np.array(artifact.centroids, dtype=float)
+
+    def predict_arrays(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if points.ndim != 2 or points.shape[1] != self.artifact.n_dimensions:
+            raise ValueError(
+                f"every point must have {self.artifact.n_dimensions} coordinates"
+            )
+        distances = calculate_distances(points, self.centroids)
+        memberships = calculate_memberships(distances, self.artifact.fuzzifier)
+        return memberships, np.argmax(memberships, axis=1)
+
+    def predict(self, points: np.ndarray) -> ClusterPredictOutput:
+        memberships, labels = self.predict_arrays(points)
+        return ClusterPredictOutput(
+            memberships=memberships.tolist(), labels=labels.tolist()
+        )
@@ -0,0 +1,28 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class ClusteringState:
+    """
+    Array form of the fuzzy clustering: points is (n, d), memberships and
+    distances are (n, k) and centroids is (k, d).
+    """
+
+    points: np.ndarray
+    memberships: np.ndarray
+    centroids: np.ndarray
+    distances: np.ndarray
+
+    @property
+    def n_points(self) -> int:
+        return self.points.shape[0]
+
+    @property
+    def n_groups(self) -> int:
+        return self.centroids.shape[0]
+
+    @property
+    def n_dimensions(self) -> int:
+        return self.points.shape[1]
@@ -0,0 +1,29 @@
+import numpy as np
+
+from src.services.pythagorean_support_machine_model.clustering_state import (
+    ClusteringState,
+)
+
+
+class ConvergenceDetector:
+    def __init__(self, state: ClusteringState, tolerance: float):
+        self.state = state
+        self.tolerance = tolerance
+        # The updaters replace the state's arrays rather than writing into
+        # them, so keeping the previous ones needs no copy.
+        self.memberships = state.memberships
+        self.centroids = state.centroids
+
+    def _get_max_change(self, previous: np.ndarray, current: np.ndarray) -> float:
+        if previous.size == 0:
+            return 0.0
+        return float(np.abs(current - previous).max())
+
+    def should_stop(self) -> bool:
+        membership_change = self._get_max_change(
+            self.memberships, self.state.memberships
+        )
+        centroid_change = self._get_max_change(self.centroids, self.state.centroids)
+        self.memberships = self.state.memberships
+        self.centroids = self.state.centroids
+        return max(membership_change, centroid_change) < self.tolerance
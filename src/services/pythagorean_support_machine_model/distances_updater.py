@@ -1,22 +1,30 @@
-from src.objects.pythagorean_support_machine_objects import MainMatrix, Node, Point
+from typing import Optional
 
+import numpy as np
 
-class DistancesUpdater:
-    def __init__(self, matrix: MainMatrix):
-        self.matrix = matrix
+from src.services.pythagorean_support_machine_model.clustering_state import (
+    ClusteringState,
+)
+from src.services.pythagorean_support_machine_model.tile_runner import TileRunner
+from src.services.pythagorean_support_machine_model.utils import calculate_distances
 
-    def calculate_distance(self, point: Point, centroid: Point) -> float:
-        distance = (
-            sum((p - c) ** 2 for p, c in zip(point.coordinates, centroid.coordinates))
-            ** 0.5
-        )
-        return distance
 
-    def update_distances_for_node(self, node: Node) -> MainMatrix:
-        for point in node.points_status:
-            point.distance = self.calculate_distance(point.point, node.centroid)
-        return node
+class DistancesUpdater:
+    def __init__(
+        self, state: ClusteringState, tile_runner: Optional[TileRunner] = None
+    ):
+        self.state = state
+        self.tile_runner = tile_runner or TileRunner()
 
-    def update_distances(self):
-        for node in self.matrix.nodes:
-            self.update_distances_for_node(node)
+    def update_distances(self) -> np.ndarray:
+        points = self.state.points
+        centroids = self.state.centroids
+        distances = np.empty((self.state.n_points, self.state.n_groups))
+        self.tile_runner.map(
+            lambda tile: calculate_distances(
+                points[tile], centroids, out=distances[tile]
+            ),
+            self.state.n_points,
+        )
+        self.state.distances = distances
+        return self.state.distances
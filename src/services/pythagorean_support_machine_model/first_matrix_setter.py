@@ -1,13 +1,24 @@
-import random
-from typing import List
+from typing import Optional
+
+import numpy as np
 
 from src.objects.pythagorean_support_machine_objects import (
-    MainMatrix,
-    Node,
-    PointStatus,
     PythagoreanSupportMachineInput,
 )
-from src.services.pythagorean_support_machine_model.utils import calculate_centroid
+from src.services.pythagorean_support_machine_model.clustering_state import (
+    ClusteringState,
+)
+from src.services.pythagorean_support_machine_model.distances_updater import (
+    DistancesUpdater,
+)
+from src.services.pythagorean_support_machine_model.probabilities_updater import (
+    ProbabilitiesUpdater,
+)
+from src.services.pythagorean_support_machine_model.tile_runner import TileRunner
+from src.services.pythagorean_support_machine_model.utils import (
+    calculate_centroids,
+    calculate_distances,
+)
 
 
 class FirstMatrixSetter:
@@ -15,28 +26,75 @@ class FirstMatrixSetter:
         self.input = input
         self.points = input.points
         self.n_groups = input.n_groups
+        self.rng = np.random.default_rng(input.seed)
 
-    def get_first_points_status(self) -> List[List[PointStatus]]:
-        nodes: List[List[PointStatus]] = [[] for _ in range(self.n_groups)]
-
-        for point in self.points:
-            raw_probs = [random.random() for _ in range(self.n_groups)]
-            total = sum(raw_probs)
+    def get_first_memberships(self, n_points: int) -> np.ndarray:
+        raw_probs = self.rng.random((n_points, self.n_groups))
+        return raw_probs / raw_probs.sum(axis=1, keepdims=True)
 
-            normalized_probs = [p / total for p in raw_probs]
+    def get_seed_centroids(
+        self, points: np.ndarray, tile_runner: TileRunner
+    ) -> np.ndarray:
+        # k-means++: each new seed is drawn with probability proportional to
+        # its squared distance from the nearest seed picked so far.
+        seeds = np.empty((self.n_groups, points.shape[1]))
+        min_squared = np.full(len(points), np.inf)
+        for group in range(self.n_groups):
+            total = min_squared.sum()
+            if group > 0 and total > 0:
+                idx = self.rng.choice(len(points), p=min_squared / total)
+            else:
+                idx = self.rng.integers(len(points))
+            seeds[group] = points[idx]
+            seed = seeds[group : group + 1]
+            tile_runner.map(
+                lambda tile: np.minimum(
+                    min_squared[tile],
+                    calculate_distances(points[tile], seed)[:, 0] ** 2,
+                    out=min_squared[tile],
+                ),
+                len(points),
+            )
+        return seeds
 
-            for i, prob in enumerate(normalized_probs):
-                nodes[i].append(
-                    PointStatus(probability=prob, point=point.model_dump(), distance=0)
-                )
+    def get_seed_points(self, points: np.ndarray) -> np.ndarray:
+        sample_size = self.input.init_sample_size
+        if (
+            self.input.initialization != "kmeans++_sampled"
+            or len(points) <= sample_size
+        ):
+            return points
+        return points[self.rng.choice(len(points), size=sample_size, replace=False)]
 
-        return nodes
+    def set_seeded_matrix(self, points: np.ndarray) -> ClusteringState:
+        with TileRunner(self.input.tile_size, self.input.n_threads) as tile_runner:
+            centroids = self.get_seed_centroids(
+                self.get_seed_points(points), tile_runner
+            )
+            state = ClusteringState(
+                points=points,
+                memberships=np.zeros((len(points), self.n_groups)),
+                centroids=centroids,
+                distances=np.zeros((len(points), self.n_groups)),
+            )
+            DistancesUpdater(state, tile_runner).update_distances()
+            ProbabilitiesUpdater(state, tile_runner).update_probabilities()
+        return state
 
-    def set_first_matrix(self) -> MainMatrix:
-        n_dimensions = len(self.points[0].coordinates)
-        point_status_list = self.get_first_points_status()
-        nodes = []
-        for points_status in point_status_list:
-            centroid = calculate_centroid(points_status, n_dimensions)
-            nodes.append(Node(points_status=points_status, centroid=centroid))
-        return MainMatrix(nodes=nodes)
+    def set_first_matrix(self, points: Optional[np.ndarray] = None) -> ClusteringState:
+        if points is None:
+            points = np.array(
+                [point.coordinates for point in self.points], dtype=float
+            ).reshape(len(self.points), -1)
+        if self.input.initialization != "random":
+            return self.set_seeded_matrix(points)
+        memberships = self.get_first_memberships(len(points))
+        centroids = calculate_centroids(
+            points, memberships, np.zeros((self.n_groups, points.shape[1]))
+        )
+        return ClusteringState(
+            points=points,
+            memberships=memberships,
+            centroids=centroids,
+            distances=np.zeros_like(memberships),
+        )
@@ -0,0 +1,185 @@
+import os
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+from src.objects.pythagorean_support_machine_objects import (
+    GroupsScore,
+    PythagoreanSupportMachineInput,
+    PythagoreanSupportMachineSettings,
+    PythagoreanSupportMachineSweepInput,
+    PythagoreanSupportMachineSweepOutput,
+    RestartsSummary,
+)
+from src.services.pythagorean_support_machine_model.pythagorean_support_machine_model import (
+    PythagoreanSupportMachineModel,
+)
+from src.services.pythagorean_support_machine_model.clustering_state import (
+    ClusteringState,
+)
+from src.services.pythagorean_support_machine_model.restart_pool import (
+    RestartPool,
+    RestartResult,
+)
+from src.services.pythagorean_support_machine_model.utils import (
+    calculate_partition_coefficient,
+    calculate_partition_entropy,
+    calculate_silhouette,
+    calculate_xie_beni,
+)
+
+# Whether a higher value of each criterion means a better partition.
+HIGHER_IS_BETTER = {
+    "xie_beni": False,
+    "partition_coefficient": True,
+    "partition_entropy": False,
+    "silhouette": True,
+}
+
+
+@dataclass
+class GroupsTask:
+    input: PythagoreanSupportMachineInput
+    sample_size: int
+    sample_seed: int
+
+
+@dataclass
+class GroupsFit:
+    score: GroupsScore
+    result: RestartResult
+    restarts: Optional[RestartsSummary]
+
+
+def score_groups(
+    task: GroupsTask, max_iterations: Optional[int], points: np.ndarray
+) -> GroupsFit:
+    model = PythagoreanSupportMachineModel(task.input, points)
+    restarts = model.fit_input(max_iterations)
+    state = model.state
+    # Every task draws the same sample, so silhouettes compare across k.
+    sample = np.arange(len(points))
+    if len(points) > task.sample_size:
+        rng = np.random.default_rng(task.sample_seed)
+        sample = rng.choice(len(points), size=task.sample_size, replace=False)
+    score = GroupsScore(
+        n_groups=state.n_groups,
+        objective=model.objective,
+        n_iterations=model.n_iterations,
+        converged=model.converged,
+        xie_beni=calculate_xie_beni(state, model.objective),
+        partition_coefficient=calculate_partition_coefficient(state.memberships),
+        partition_entropy=calculate_partition_entropy(state.memberships),
+        silhouette=calculate_silhouette(points[sample], model.get_labels()[sample]),
+    )
+    return GroupsFit(
+        score=score,
+        result=RestartResult(
+            memberships=state.memberships,
+            centroids=state.centroids,
+            distances=state.distances,
+            objective=model.objective,
+            n_iterations=model.n_iterations,
+            converged=model.converged,
+        ),
+        restarts=restarts,
+    )
+
+
+class GroupsSweep:
+    """
+    Picks n_groups by fitting every k in a range and scoring each partition
+    with cluster validity indices.
+
+    The fits run across the restart pool over one shared copy of the points.
+    Every k gets a seed spawned from the sweep's seed, and the fit of the
+    recommended k is returned as it was scored rather than fitted again.
+    """
+
+    def __init__(
+        self,
+        input: PythagoreanSupportMachineSweepInput,
+        points: Optional[np.ndarray] = None,
+    ):
+        self.input = input
+        if points is None:
+            points = np.array(
+                [point.coordinates for point in input.points], dtype=float
+            ).reshape(len(input.points), -1)
+        self.points = points
+        self.model: Optional[PythagoreanSupportMachineModel] = None
+        self.scores: List[GroupsScore] = []
+
+    def _get_tasks(self) -> List[GroupsTask]:
+        settings = self.input.model_dump(
+            include=set(PythagoreanSupportMachineSettings.model_fields)
+        )
+        n_groups_range = range(self.input.min_groups, self.input.max_groups + 1)
+        sample_seed, *seeds = [
+            int(child.generate_state(1)[0])
+            for child in np.random.SeedSequence(self.input.seed).spawn(
+                len(n_groups_range) + 1
+            )
+        ]
+        return [
+            GroupsTask(
+                input=PythagoreanSupportMachineInput(
+                    **{**settings, "seed": seed, "n_workers": 1},
+                    points=[],
+                    n_groups=n_groups,
+                ),
+                sample_size=self.input.silhouette_sample_size,
+                sample_seed=sample_seed,
+            )
+            for n_groups, seed in zip(n_groups_range, seeds)
+        ]
+
+    def _score_tasks(self, tasks: List[GroupsTask]) -> List[GroupsFit]:
+        n_workers = min(self.input.n_workers, os.cpu_count() or 1, len(tasks))
+        if n_workers == 1:
+            return [score_groups(task, None, self.points) for task in tasks]
+        restart_pool = RestartPool(self.points, n_workers)
+        try:
+            return restart_pool.run(score_groups, tasks, None)
+        finally:
+            restart_pool.close()
+
+    def _get_recommended(self) -> int:
+        criterion = self.input.criterion
+        sign = 1 if HIGHER_IS_BETTER[criterion] else -1
+        values = [
+            -np.inf if value is None else sign * value
+            for value in (getattr(score, criterion) for score in self.scores)
+        ]
+        return int(np.argmax(values))
+
+    def fit(self) -> Optional[RestartsSummary]:
+        tasks = self._get_tasks()
+        fits = self._score_tasks(tasks)
+        self.scores = [fit.score for fit in fits]
+        recommended = self._get_recommended()
+        best = fits[recommended]
+        input = tasks[recommended].input.model_copy(
+            update={"points": self.input.points, "n_workers": self.input.n_workers}
+        )
+        self.model = PythagoreanSupportMachineModel(
+            input,
+            state=ClusteringState(
+                points=self.points,
+                memberships=best.result.memberships,
+                centroids=best.result.centroids,
+                distances=best.result.distances,
+            ),
+        )
+        self.model.set_result(best.result)
+        return best.restarts
+
+    def run(self) -> PythagoreanSupportMachineSweepOutput:
+        restarts = self.fit()
+        return PythagoreanSupportMachineSweepOutput(
+            recommended_n_groups=self.model.state.n_groups,
+            criterion=self.input.criterion,
+            scores=self.scores,
+            model=self.model.get_output(restarts),
+        )
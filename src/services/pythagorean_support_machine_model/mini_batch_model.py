@@ -0,0 +1,129 @@
+from typing import AsyncIterable, AsyncIterator, List, Optional, Union
+
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+
+from src.objects.pythagorean_support_machine_objects import (
+    GroupAssignments,
+    Point,
+    PythagoreanSupportMachineInput,
+    PythagoreanSupportMachineStreamParams,
+    PythagoreanSupportMachineStreamResult,
+)
+from src.services.pythagorean_support_machine_model.clustering_state import (
+    ClusteringState,
+)
+from src.services.pythagorean_support_machine_model.distances_updater import (
+    DistancesUpdater,
+)
+from src.services.pythagorean_support_machine_model.first_matrix_setter import (
+    FirstMatrixSetter,
+)
+from src.services.pythagorean_support_machine_model.groups_selector import (
+    GroupsSelector,
+)
+from src.services.pythagorean_support_machine_model.probabilities_updater import (
+    ProbabilitiesUpdater,
+)
+
+
+class MiniBatchModel:
+    """
+    Fuzzy clustering over a stream of points, one batch at a time.
+
+    Centroids are the ratio of running sums of u^2 * x and u^2 over every
+    batch seen so far. With a learning rate the old sums decay by
+    (1 - learning_rate) before each batch is added, so recent batches weigh
+    more; without one the centroids are the exact fuzzy means of the stream.
+    Only the current batch's memberships are ever held.
+    """
+
+    def __init__(self, params: PythagoreanSupportMachineStreamParams):
+        self.params = params
+        self.centroids: Optional[np.ndarray] = None
+        self.weight_totals: Optional[np.ndarray] = None
+        self.weighted_sums: Optional[np.ndarray] = None
+        self.n_points = 0
+        self.n_batches = 0
+
+    def _get_initial_centroids(self, points: List[Point]) -> np.ndarray:
+        first_matrix_setter = FirstMatrixSetter(
+            PythagoreanSupportMachineInput(
+                points=points,
+                n_groups=self.params.n_groups,
+                initialization=self.params.initialization,
+                seed=self.params.seed,
+            )
+        )
+        centroids = first_matrix_setter.set_first_matrix().centroids
+        self.weight_totals = np.zeros(self.params.n_groups)
+        self.weighted_sums = np.zeros_like(centroids)
+        return centroids
+
+    def _get_state(self, points: List[Point]) -> ClusteringState:
+        # Every batch, the first one included, is labelled and folded into the
+        # sums with memberships measured against the centroids it arrives to.
+        if self.centroids is None:
+            self.centroids = self._get_initial_centroids(points)
+        coordinates = np.array([point.coordinates for point in points], dtype=float)
+        if coordinates.ndim != 2 or coordinates.shape[1] != self.centroids.shape[1]:
+            raise ValueError(
+                f"every point must have {self.centroids.shape[1]} coordinates"
+            )
+        state = ClusteringState(
+            points=coordinates,
+            memberships=np.zeros((len(points), self.params.n_groups)),
+            centroids=self.centroids,
+            distances=np.zeros((len(points), self.params.n_groups)),
+        )
+        DistancesUpdater(state).update_distances()
+        ProbabilitiesUpdater(state).update_probabilities()
+        return state
+
+    def _update_centroids(self, state: ClusteringState):
+        weights = state.memberships**2
+        decay = 1.0
+        if self.params.learning_rate is not None:
+            decay = 1 - self.params.learning_rate
+        self.weight_totals = decay * self.weight_totals + weights.sum(axis=0)
+        self.weighted_sums = decay * self.weighted_sums + weights.T @ state.points
+        totals = self.weight_totals[:, np.newaxis]
+        self.centroids = np.divide(
+            self.weighted_sums,
+            totals,
+            out=state.centroids.copy(),
+            where=totals > 0,
+        )
+
+    def partial_fit(self, points: List[Point]) -> GroupAssignments:
+        state = self._get_state(points)
+        self._update_centroids(state)
+        assignments = GroupAssignments(
+            offset=self.n_points,
+            labels=GroupsSelector(state, points).get_labels().tolist(),
+        )
+        self.n_points += len(points)
+        self.n_batches += 1
+        return assignments
+
+    def get_result(self) -> PythagoreanSupportMachineStreamResult:
+        centroids = [] if self.centroids is None else self.centroids.tolist()
+        return PythagoreanSupportMachineStreamResult(
+            centroids=[Point(coordinates=centroid) for centroid in centroids],
+            n_points=self.n_points,
+            n_batches=self.n_batches,
+            n_dimensions=len(centroids[0]) if centroids else 0,
+        )
+
+    async def stream(
+        self, lines: AsyncIterable[bytes]
+    ) -> AsyncIterator[Union[GroupAssignments, PythagoreanSupportMachineStreamResult]]:
+        batch: List[Point] = []
+        async for line in lines:
+            batch.append(Point.model_validate_json(line))
+            if len(batch) == self.params.batch_size:
+                yield await run_in_threadpool(self.partial_fit, batch)
+                batch = []
+        if batch:
+            yield await run_in_threadpool(self.partial_fit, batch)
+        yield self.get_result()
@@ -0,0 +1,64 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from src.objects.pythagorean_support_machine_objects import ClusterModelArtifact
+
+MODEL_DIR = os.environ.get("CLUSTER_MODEL_DIR", "cluster_models")
+MAX_LOADED_MODELS = 256
+MODEL_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+
+class ClusterModelStore:
+    """
+    Fitted cluster models saved as JSON artifacts under a directory.
+
+    Recently used artifacts stay in an in-process LRU, and anything else is
+    loaded from disk on first use, so saved models survive restarts.
+    """
+
+    def __init__(self, directory: str = MODEL_DIR, max_loaded: int = MAX_LOADED_MODELS):
+        self.directory = Path(directory)
+        self.max_loaded = max_loaded
+        self.loaded: "OrderedDict[str, ClusterModelArtifact]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_path(self, model_id: str) -> Path:
+        return self.directory / f"{model_id}.json"
+
+    def _remember(self, artifact: ClusterModelArtifact):
+        with self._lock:
+            self.loaded[artifact.model_id] = artifact
+            self.loaded.move_to_end(artifact.model_id)
+            while len(self.loaded) > self.max_loaded:
+                self.loaded.popitem(last=False)
+
+    def save(self, artifact: ClusterModelArtifact) -> str:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._get_path(artifact.model_id)
+        # Write then rename, so a reader never sees a half-written artifact.
+        temporary_path = path.with_suffix(".tmp")
+        temporary_path.write_text(artifact.model_dump_json())
+        os.replace(temporary_path, path)
+        self._remember(artifact)
+        return artifact.model_id
+
+    def get(self, model_id: str) -> Optional[ClusterModelArtifact]:
+        if not MODEL_ID_PATTERN.fullmatch(model_id):
+            return None
+        with self._lock:
+            if model_id in self.loaded:
+                self.loaded.move_to_end(model_id)
+                return self.loaded[model_id]
+        path = self._get_path(model_id)
+        if not path.is_file():
+            return None
+        artifact = ClusterModelArtifact.model_validate_json(path.read_text())
+        self._remember(artifact)
+        return artifact
+
+
+model_store = ClusterModelStore()
@@ -1,37 +1,31 @@
-from typing import List
+from typing import Optional
 
-from src.objects.pythagorean_support_machine_objects import MainMatrix, Node
+import numpy as np
 
+from src.services.pythagorean_support_machine_model.clustering_state import (
+    ClusteringState,
+)
+from src.services.pythagorean_support_machine_model.tile_runner import TileRunner
+from src.services.pythagorean_support_machine_model.utils import (
+    calculate_memberships,
+)
 
-class ProbabilitiesUpdater:
-    def __init__(self, matrix: MainMatrix):
-        self.matrix = matrix
-
-    def calculate_probability(
-        self, distance: float, all_distances: List[float]
-    ) -> float:
-        cum_sum = sum((distance / d) ** 2 for d in all_distances)
-        return cum_sum**-1
-
-    def get_all_point_distances(self, point_idx: int) -> List[float]:
-        return [node.points_status[point_idx].distance for node in self.matrix.nodes]
-
-    def get_distance_to_centroid(self, node: Node, point_idx: int) -> float:
-        return node.points_status[point_idx].distance
 
-    def update_probability_for_point(
-        self, node: Node, point_idx: int, all_distances: List[float]
+class ProbabilitiesUpdater:
+    def __init__(
+        self, state: ClusteringState, tile_runner: Optional[TileRunner] = None
     ):
-        distance = self.get_distance_to_centroid(node, point_idx)
-        new_prob = self.calculate_probability(distance, all_distances)
-        node.points_status[point_idx].probability = new_prob
-
-    def update_probabilities_for_point_across_nodes(self, point_idx: int):
-        all_distances = self.get_all_point_distances(point_idx)
-        for node in self.matrix.nodes:
-            self.update_probability_for_point(node, point_idx, all_distances)
-
-    def update_probabilities(self):
-        n_points = len(self.matrix.nodes[0].points_status)
-        for point_idx in range(n_points):
-            self.update_probabilities_for_point_across_nodes(point_idx)
+        self.state = state
+        self.tile_runner = tile_runner or TileRunner()
+
+    def update_probabilities(self) -> np.ndarray:
+        distances = self.state.distances
+        memberships = np.empty_like(distances)
+        self.tile_runner.map(
+            lambda tile: np.copyto(
+                memberships[tile], calculate_memberships(distances[tile])
+            ),
+            len(distances),
+        )
+        self.state.memberships = memberships
+        return self.state.memberships
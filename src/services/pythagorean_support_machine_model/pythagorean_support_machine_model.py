@@ -1,10 +1,26 @@
+import os
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+
 from src.objects.pythagorean_support_machine_objects import (
+    ClusterModelArtifact,
+    MainMatrix,
     PythagoreanSupportMachineInput,
     PythagoreanSupportMachineOutput,
+    RestartsSummary,
 )
 from src.services.pythagorean_support_machine_model.centroid_updater import (
     CentroidUpdater,
 )
+from src.services.pythagorean_support_machine_model.clustering_state import (
+    ClusteringState,
+)
+from src.services.pythagorean_support_machine_model.convergence_detector import (
+    ConvergenceDetector,
+)
 from src.services.pythagorean_support_machine_model.distances_updater import (
     DistancesUpdater,
 )
@@ -17,21 +33,177 @@ from src.services.pythagorean_support_machine_model.groups_selector import (
 from src.services.pythagorean_support_machine_model.probabilities_updater import (
     ProbabilitiesUpdater,
 )
+from src.services.pythagorean_support_machine_model.restart_pool import (
+    RestartPool,
+    RestartResult,
+)
+from src.services.pythagorean_support_machine_model.tile_runner import TileRunner
+from src.services.pythagorean_support_machine_model.utils import (
+    FUZZIFIER,
+    build_main_matrix,
+    calculate_adjusted_rand_index,
+    calculate_objective,
+)
+
+
+def run_restart(
+    input: PythagoreanSupportMachineInput,
+    max_iterations: Optional[int],
+    points: np.ndarray,
+) -> RestartResult:
+    model = PythagoreanSupportMachineModel(input, points)
+    state = model.fit(max_iterations)
+    return RestartResult(
+        memberships=state.memberships,
+        centroids=state.centroids,
+        distances=state.distances,
+        objective=model.objective,
+        n_iterations=model.n_iterations,
+        converged=model.converged,
+    )
 
 
 class PythagoreanSupportMachineModel:
-    def __init__(self, input: PythagoreanSupportMachineInput):
+    def __init__(
+        self,
+        input: PythagoreanSupportMachineInput,
+        points: Optional[np.ndarray] = None,
+        state: Optional[ClusteringState] = None,
+    ):
         self.input = input
-        first_matrix_setter = FirstMatrixSetter(input)
-        self.main_matrix = first_matrix_setter.set_first_matrix()
-
-    def run(self, max_iterations: int = 10) -> PythagoreanSupportMachineOutput:
-        distances_updater = DistancesUpdater(self.main_matrix)
-        probabilities_updater = ProbabilitiesUpdater(self.main_matrix)
-        centroid_updater = CentroidUpdater(self.main_matrix)
-        for i in range(max_iterations):
-            distances_updater.update_distances()
-            probabilities_updater.update_probabilities()
-            centroid_updater.update_centroids()
-        groups_selector = GroupsSelector(self.main_matrix)
-        return groups_selector.select_groups()
+        if state is None:
+            first_matrix_setter = FirstMatrixSetter(input)
+            state = first_matrix_setter.set_first_matrix(points)
+        self.state = state
+        self.n_iterations = 0
+        self.converged = False
+        self.objective = 0.0
+
+    def get_main_matrix(self) -> MainMatrix:
+        return build_main_matrix(self.state)
+
+    def get_tile_runner(self) -> TileRunner:
+        return TileRunner(self.input.tile_size, self.input.n_threads)
+
+    def get_labels(self) -> np.ndarray:
+        return np.argmax(self.state.memberships, axis=1)
+
+    def get_arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            "labels": self.get_labels(),
+            "memberships": self.state.memberships,
+            "centroids": self.state.centroids,
+            "objective": np.array(self.objective),
+            "n_iterations": np.array(self.n_iterations),
+            "converged": np.array(self.converged),
+        }
+
+    def get_artifact(self) -> ClusterModelArtifact:
+        return ClusterModelArtifact(
+            model_id=uuid.uuid4().hex,
+            centroids=self.state.centroids.tolist(),
+            fuzzifier=FUZZIFIER,
+            n_groups=self.state.n_groups,
+            n_dimensions=self.state.n_dimensions,
+            objective=self.objective,
+            n_iterations=self.n_iterations,
+            created_at=datetime.now(timezone.utc),
+        )
+
+    def fit(self, max_iterations: Optional[int] = None) -> ClusteringState:
+        max_iterations = max_iterations or self.input.max_iterations
+        convergence_detector = ConvergenceDetector(self.state, self.input.tolerance)
+        with self.get_tile_runner() as tile_runner:
+            distances_updater = DistancesUpdater(self.state, tile_runner)
+            probabilities_updater = ProbabilitiesUpdater(self.state, tile_runner)
+            centroid_updater = CentroidUpdater(self.state, tile_runner)
+            for i in range(max_iterations):
+                distances_updater.update_distances()
+                probabilities_updater.update_probabilities()
+                centroid_updater.update_centroids()
+                self.n_iterations += 1
+                if convergence_detector.should_stop():
+                    self.converged = True
+                    break
+        self.objective = calculate_objective(self.state)
+        return self.state
+
+    def _get_restart_inputs(self) -> List[PythagoreanSupportMachineInput]:
+        seed_sequence = np.random.SeedSequence(self.input.seed)
+        return [
+            self.input.model_copy(
+                update={"points": [], "seed": int(child.generate_state(1)[0])}
+            )
+            for child in seed_sequence.spawn(self.input.n_restarts)
+        ]
+
+    def _run_restarts(self, max_iterations: Optional[int]) -> List[RestartResult]:
+        inputs = self._get_restart_inputs()
+        n_workers = min(self.input.n_workers, os.cpu_count() or 1, len(inputs))
+        if n_workers == 1:
+            return [
+                run_restart(input, max_iterations, self.state.points)
+                for input in inputs
+            ]
+        restart_pool = RestartPool(self.state.points, n_workers)
+        try:
+            return restart_pool.run(run_restart, inputs, max_iterations)
+        finally:
+            restart_pool.close()
+
+    def set_result(self, result: RestartResult):
+        self.state = ClusteringState(
+            points=self.state.points,
+            memberships=result.memberships,
+            centroids=result.centroids,
+            distances=result.distances,
+        )
+        self.n_iterations = result.n_iterations
+        self.converged = result.converged
+        self.objective = result.objective
+
+    def fit_restarts(self, max_iterations: Optional[int] = None) -> RestartsSummary:
+        results = self._run_restarts(max_iterations)
+        objectives = [result.objective for result in results]
+        best_restart = int(np.argmin(objectives))
+        best = results[best_restart]
+        self.set_result(best)
+
+        best_labels = np.argmax(best.memberships, axis=1)
+        adjusted_rand_indices = [
+            calculate_adjusted_rand_index(
+                best_labels, np.argmax(result.memberships, axis=1)
+            )
+            for idx, result in enumerate(results)
+            if idx != best_restart
+        ]
+        return RestartsSummary(
+            best_restart=best_restart,
+            objectives=objectives,
+            objective_std=float(np.std(objectives)),
+            mean_adjusted_rand_index=float(np.mean(adjusted_rand_indices)),
+        )
+
+    def fit_input(
+        self, max_iterations: Optional[int] = None
+    ) -> Optional[RestartsSummary]:
+        if self.input.n_restarts > 1:
+            return self.fit_restarts(max_iterations)
+        self.fit(max_iterations)
+        return None
+
+    def get_output(
+        self, restarts: Optional[RestartsSummary] = None
+    ) -> PythagoreanSupportMachineOutput:
+        groups_selector = GroupsSelector(self.state, self.input.points)
+        output = groups_selector.select_groups()
+        output.n_iterations = self.n_iterations
+        output.objective = self.objective
+        output.converged = self.converged
+        output.restarts = restarts
+        return output
+
+    def run(
+        self, max_iterations: Optional[int] = None
+    ) -> PythagoreanSupportMachineOutput:
+        return self.get_output(self.fit_input(max_iterations))
@@ -0,0 +1,81 @@
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple, TypeVar
+
+import numpy as np
+
+from src.utils.process_pool import (
+    attach_shared_array,
+    process_pool,
+    release_shared,
+    share_array,
+)
+
+
+@dataclass
+class RestartResult:
+    memberships: np.ndarray
+    centroids: np.ndarray
+    distances: np.ndarray
+    objective: float
+    n_iterations: int
+    converged: bool
+
+
+TaskT = TypeVar("TaskT")
+ResultT = TypeVar("ResultT")
+
+RestartFunction = Callable[[TaskT, Optional[int], np.ndarray], ResultT]
+
+
+def _run_chunk(
+    run: RestartFunction,
+    tasks: List[TaskT],
+    max_iterations: Optional[int],
+    points_name: str,
+    shape: Tuple[int, int],
+) -> List[ResultT]:
+    points = attach_shared_array(points_name, shape, np.dtype(np.float64).str)
+    return [run(task, max_iterations, points) for task in tasks]
+
+
+class RestartPool:
+    """
+    Runs independent clusterings of the same points on the shared process
+    pool.
+
+    The points are copied once into shared memory that workers map read-only
+    and keep mapped between tasks, so a run only pickles its task settings
+    and its seed. Tasks go out in n_workers chunks, which bounds how much of
+    the pool one request takes.
+    """
+
+    def __init__(self, points: np.ndarray, n_workers: int):
+        self.points = np.ascontiguousarray(points, dtype=np.float64)
+        self.n_workers = n_workers
+        self._memory = share_array(self.points)
+
+    def run(
+        self,
+        run: RestartFunction,
+        tasks: List[TaskT],
+        max_iterations: Optional[int],
+    ) -> List[ResultT]:
+        n_chunks = min(self.n_workers, len(tasks))
+        # Striding keeps neighbouring tasks, which tend to cost alike, on
+        # different workers.
+        chunks = [tasks[offset::n_chunks] for offset in range(n_chunks)]
+        results = process_pool.map(
+            _run_chunk,
+            [run] * n_chunks,
+            chunks,
+            [max_iterations] * n_chunks,
+            [self._memory.name] * n_chunks,
+            [self.points.shape] * n_chunks,
+        )
+        ordered: List[ResultT] = [None] * len(tasks)
+        for offset, chunk_results in enumerate(results):
+            ordered[offset::n_chunks] = chunk_results
+        return ordered
+
+    def close(self):
+        release_shared(self._memory)
@@ -0,0 +1,50 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+TILE_SIZE = 4096
+
+
+class TileRunner:
+    """
+    Maps a kernel over row tiles of the points.
+
+    NumPy releases the GIL inside its array operations, so the tiles run in
+    parallel on a thread pool, and no kernel temporary grows past tile_size
+    rows. Results come back in tile order, so reductions over them do not
+    depend on the number of threads.
+    """
+
+    def __init__(self, tile_size: int = TILE_SIZE, n_threads: Optional[int] = 1):
+        self.tile_size = tile_size
+        # None asks for every core; more threads than cores only add overhead.
+        cpu_count = os.cpu_count() or 1
+        self.n_threads = min(n_threads or cpu_count, cpu_count)
+        self.executor: Optional[ThreadPoolExecutor] = None
+        if self.n_threads > 1:
+            self.executor = ThreadPoolExecutor(max_workers=self.n_threads)
+
+    def get_tiles(self, n_rows: int) -> List[slice]:
+        return [
+            slice(start, min(start + self.tile_size, n_rows))
+            for start in range(0, n_rows, self.tile_size)
+        ]
+
+    def map(self, kernel: Callable[[slice], T], n_rows: int) -> List[T]:
+        tiles = self.get_tiles(n_rows)
+        if self.executor is None or len(tiles) == 1:
+            return [kernel(tile) for tile in tiles]
+        return list(self.executor.map(kernel, tiles))
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __enter__(self) -> "TileRunner":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
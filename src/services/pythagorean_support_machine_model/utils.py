@@ -1,24 +1,170 @@
-from typing import List
+from typing import Optional, Tuple
 
-from src.objects.pythagorean_support_machine_objects import Point, PointStatus
+import numpy as np
 
+from src.objects.pythagorean_support_machine_objects import (
+    MainMatrix,
+    Node,
+    Point,
+    PointStatus,
+)
+from src.services.pythagorean_support_machine_model.clustering_state import (
+    ClusteringState,
+)
 
-def calculate_centroid_coordinate(
-    probabilities: List[PointStatus], dimension: int
+FUZZIFIER = 2.0
+
+
+def calculate_distances(
+    points: np.ndarray, centroids: np.ndarray, out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    # |x - c|^2 = |x|^2 - 2 x.c + |c|^2 makes the (n, k) work one matrix
+    # product. Both sides are shifted to the centroids' mean first, which
+    # keeps the cancellation small for data far from the origin.
+    shift = centroids.mean(axis=0)
+    points = points - shift
+    centroids = centroids - shift
+    squared = np.matmul(points, centroids.T, out=out)
+    squared *= -2.0
+    squared += np.einsum("ij,ij->i", points, points)[:, np.newaxis]
+    squared += np.einsum("ij,ij->i", centroids, centroids)
+    np.maximum(squared, 0.0, out=squared)
+    return np.sqrt(squared, out=squared)
+
+
+def calculate_memberships(
+    distances: np.ndarray, fuzzifier: float = FUZZIFIER
+) -> np.ndarray:
+    at_centroid = distances == 0
+    # 1 / sum_l (d_ij / d_il)^p is d_ij^-p normalised over the groups, with
+    # p = 2 / (m - 1) for fuzzifier m.
+    inverse_powers = np.divide(
+        1.0,
+        distances ** (2 / (fuzzifier - 1)),
+        out=np.zeros_like(distances),
+        where=~at_centroid,
+    )
+    totals = inverse_powers.sum(axis=1, keepdims=True)
+    memberships = np.divide(
+        inverse_powers, totals, out=np.zeros_like(distances), where=totals > 0
+    )
+    # A point sitting on a centroid belongs to it (shared evenly when it
+    # sits on several), which is the limit of the formula above.
+    on_centroid = at_centroid.any(axis=1)
+    if on_centroid.any():
+        hits = at_centroid[on_centroid]
+        memberships[on_centroid] = hits / hits.sum(axis=1, keepdims=True)
+    return memberships
+
+
+def calculate_centroid_sums(
+    points: np.ndarray, memberships: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    weights = memberships**2
+    return weights.T @ points, weights.sum(axis=0)
+
+
+def divide_centroid_sums(
+    weighted_sums: np.ndarray, totals: np.ndarray, centroids: np.ndarray
+) -> np.ndarray:
+    totals = totals[:, np.newaxis]
+    # A group nobody belongs to keeps its previous centroid.
+    return np.divide(weighted_sums, totals, out=centroids.copy(), where=totals > 0)
+
+
+def calculate_centroids(
+    points: np.ndarray, memberships: np.ndarray, centroids: np.ndarray
+) -> np.ndarray:
+    weighted_sums, totals = calculate_centroid_sums(points, memberships)
+    return divide_centroid_sums(weighted_sums, totals, centroids)
+
+
+def calculate_objective(state: ClusteringState) -> float:
+    return float(((state.memberships * state.distances) ** 2).sum())
+
+
+def calculate_partition_coefficient(memberships: np.ndarray) -> float:
+    return float((memberships**2).sum() / len(memberships))
+
+
+def calculate_partition_entropy(memberships: np.ndarray) -> float:
+    logs = np.log(np.where(memberships > 0, memberships, 1.0))
+    return float(-(memberships * logs).sum() / len(memberships))
+
+
+def calculate_xie_beni(state: ClusteringState, objective: float) -> Optional[float]:
+    # The fuzzy objective over n times the closest pair of centroids'
+    # squared separation; undefined when two centroids coincide.
+    separations = calculate_distances(state.centroids, state.centroids) ** 2
+    np.fill_diagonal(separations, np.inf)
+    min_separation = separations.min()
+    if min_separation == 0:
+        return None
+    return float(objective / (state.n_points * min_separation))
+
+
+def calculate_silhouette(points: np.ndarray, labels: np.ndarray) -> float:
+    groups, labels = np.unique(labels, return_inverse=True)
+    if len(groups) < 2:
+        return 0.0
+    one_hot = np.eye(len(groups))[labels]
+    counts = one_hot.sum(axis=0)
+    # mean_distances[i, g] is point i's mean distance to group g, leaving
+    # the point itself out of its own group.
+    sums = calculate_distances(points, points) @ one_hot
+    own_counts = counts[labels] - 1
+    rows = np.arange(len(points))
+    own = np.divide(
+        sums[rows, labels],
+        own_counts,
+        out=np.zeros(len(points)),
+        where=own_counts > 0,
+    )
+    sums[rows, labels] = np.inf
+    nearest = (sums / counts).min(axis=1)
+    widths = np.maximum(own, nearest)
+    silhouettes = np.divide(
+        nearest - own, widths, out=np.zeros(len(points)), where=widths > 0
+    )
+    # A point alone in its group scores zero.
+    silhouettes[own_counts == 0] = 0.0
+    return float(silhouettes.mean())
+
+
+def calculate_adjusted_rand_index(
+    labels: np.ndarray, other_labels: np.ndarray
 ) -> float:
-    coordinate_numerator = 0
-    coordinate_denominator = 0
-    for probability in probabilities:
-        coordinate_numerator += (
-            probability.point.coordinates[dimension] * (probability.probability) ** 2
-        )
-        coordinate_denominator += (probability.probability) ** 2
-    return coordinate_numerator / coordinate_denominator
-
-
-def calculate_centroid(probabilities: List[PointStatus], n_dimensions: int) -> Point:
-    coordinates = []
-    for i in range(n_dimensions):
-        coordinate = calculate_centroid_coordinate(probabilities, i)
-        coordinates.append(coordinate)
-    return Point(coordinates=coordinates)
+    _, labels = np.unique(labels, return_inverse=True)
+    _, other_labels = np.unique(other_labels, return_inverse=True)
+    contingency = np.zeros((labels.max() + 1, other_labels.max() + 1))
+    np.add.at(contingency, (labels, other_labels), 1)
+
+    def pairs(counts: np.ndarray) -> float:
+        return float((counts * (counts - 1) / 2).sum())
+
+    index = pairs(contingency)
+    rows = pairs(contingency.sum(axis=1))
+    columns = pairs(contingency.sum(axis=0))
+    n_pairs = pairs(np.array([len(labels)]))
+    expected = rows * columns / n_pairs if n_pairs > 0 else 0.0
+    maximum = (rows + columns) / 2
+    if maximum == expected:
+        return 1.0
+    return (index - expected) / (maximum - expected)
+
+
+def build_main_matrix(state: ClusteringState) -> MainMatrix:
+    points = [Point(coordinates=coordinates) for coordinates in state.points.tolist()]
+    nodes = []
+    for group in range(state.n_groups):
+        points_status = [
+            PointStatus(probability=probability, distance=distance, point=point)
+            for point, probability, distance in zip(
+                points,
+                state.memberships[:, group].tolist(),
+                state.distances[:, group].tolist(),
+            )
+        ]
+        centroid = Point(coordinates=state.centroids[group].tolist())
+        nodes.append(Node(points_status=points_status, centroid=centroid))
+    return MainMatrix(nodes=nodes)
@@ -0,0 +1,227 @@
+import io
+import json
+from typing import Callable, Dict, Literal, Optional, Type, TypeVar
+
+import numpy as np
+from fastapi import HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, ValidationError
+
+ArrayFormat = Literal["npy", "arrow", "msgpack"]
+
+ArrayBundle = Dict[str, np.ndarray]
+
+ParamsT = TypeVar("ParamsT", bound=BaseModel)
+
+ARRAY_MEDIA_TYPES: Dict[ArrayFormat, str] = {
+    "npy": "application/x-npy",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "msgpack": "application/msgpack",
+}
+
+# A .npy file holds a single array, so npy responses are .npz archives with
+# one .npy member per array.
+ARRAY_RESPONSE_MEDIA_TYPES: Dict[ArrayFormat, str] = {
+    **ARRAY_MEDIA_TYPES,
+    "npy": "application/x-npz",
+}
+
+MEDIA_TYPE_ALIASES: Dict[str, ArrayFormat] = {
+    "application/x-msgpack": "msgpack",
+    "application/vnd.apache.arrow.file": "arrow",
+    "application/x-npz": "npy",
+}
+
+
+class UnsupportedMediaType(Exception):
+    pass
+
+
+def get_array_format(media_type: Optional[str]) -> Optional[ArrayFormat]:
+    # Accepts a Content-Type or an Accept header; the first binary media type
+    # listed wins and anything else falls back to JSON.
+    for entry in (media_type or "").split(","):
+        essence = entry.split(";")[0].strip().lower()
+        for array_format, array_media_type in ARRAY_MEDIA_TYPES.items():
+            if essence == array_media_type:
+                return array_format
+        if essence in MEDIA_TYPE_ALIASES:
+            return MEDIA_TYPE_ALIASES[essence]
+    return None
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+    except ImportError:
+        raise UnsupportedMediaType("Arrow payloads need pyarrow to be installed")
+    return pyarrow
+
+
+def _import_msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        raise UnsupportedMediaType("msgpack payloads need msgpack to be installed")
+    return msgpack
+
+
+def decode_npy(body: bytes) -> np.ndarray:
+    # Also takes the .npz archives the npy responses are sent as, as long as
+    # they hold a points member or a single array.
+    try:
+        loaded = np.load(io.BytesIO(body), allow_pickle=False)
+    except EOFError as error:
+        raise ValueError("empty npy payload") from error
+    if isinstance(loaded, np.lib.npyio.NpzFile):
+        with loaded:
+            if "points" in loaded.files:
+                return loaded["points"]
+            if len(loaded.files) == 1:
+                return loaded[loaded.files[0]]
+        raise ValueError("npz payloads must hold one array or a points array")
+    if not isinstance(loaded, np.ndarray):
+        raise ValueError("npy payload must hold an array")
+    return loaded
+
+
+def decode_arrow(body: bytes) -> np.ndarray:
+    # Either one numeric column per dimension, or a single fixed size list
+    # column holding every point's coordinates.
+    pyarrow = _import_pyarrow()
+    table = pyarrow.ipc.open_stream(body).read_all()
+    columns = []
+    for column in table.columns:
+        if column.null_count:
+            raise ValueError("points must not contain nulls")
+        if pyarrow.types.is_fixed_size_list(column.type):
+            values = column.combine_chunks().flatten().to_numpy()
+            return values.reshape(len(column), column.type.list_size)
+        columns.append(column.to_numpy())
+    return np.column_stack(columns) if columns else np.empty((0, 0))
+
+
+def decode_msgpack(body: bytes) -> np.ndarray:
+    # A typed array: {"dtype": "<f8", "shape": [n, d], "data": <bytes>}.
+    msgpack = _import_msgpack()
+    payload = msgpack.unpackb(body, raw=False)
+    try:
+        dtype = np.dtype(payload["dtype"])
+        if dtype.kind not in "fiu":
+            raise ValueError(f"unsupported dtype {dtype}")
+        return np.frombuffer(payload["data"], dtype=dtype).reshape(payload["shape"])
+    except (KeyError, TypeError) as error:
+        raise ValueError("msgpack points must be a typed array map") from error
+
+
+DECODERS: Dict[ArrayFormat, Callable[[bytes], np.ndarray]] = {
+    "npy": decode_npy,
+    "arrow": decode_arrow,
+    "msgpack": decode_msgpack,
+}
+
+
+def decode_points(body: bytes, array_format: ArrayFormat) -> np.ndarray:
+    points = DECODERS[array_format](body)
+    if points.ndim != 2 or points.dtype.kind not in "fiu":
+        raise ValueError("points must be a two-dimensional numeric array")
+    points = np.ascontiguousarray(points, dtype=np.float64)
+    if not np.isfinite(points).all():
+        raise ValueError("points must be finite")
+    return points
+
+
+def encode_npy(bundle: ArrayBundle) -> bytes:
+    buffer = io.BytesIO()
+    np.savez(buffer, **bundle)
+    return buffer.getvalue()
+
+
+def encode_arrow(bundle: ArrayBundle) -> bytes:
+    # One row, with every array flattened into a list column and its shape
+    # kept in the field metadata.
+    pyarrow = _import_pyarrow()
+    fields = []
+    columns = []
+    for name, array in bundle.items():
+        values = pyarrow.array(np.ravel(array))
+        offsets = pyarrow.array([0, len(values)], type=pyarrow.int64())
+        column = pyarrow.LargeListArray.from_arrays(offsets, values)
+        metadata = {"shape": json.dumps(list(np.shape(array)))}
+        fields.append(pyarrow.field(name, column.type, metadata=metadata))
+        columns.append(column)
+    batch = pyarrow.RecordBatch.from_arrays(columns, schema=pyarrow.schema(fields))
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+def encode_msgpack(bundle: ArrayBundle) -> bytes:
+    msgpack = _import_msgpack()
+    payload = {}
+    for name, array in bundle.items():
+        array = np.ascontiguousarray(array)
+        payload[name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "data": array.tobytes(),
+        }
+    return msgpack.packb(payload, use_bin_type=True)
+
+
+ENCODERS: Dict[ArrayFormat, Callable[[ArrayBundle], bytes]] = {
+    "npy": encode_npy,
+    "arrow": encode_arrow,
+    "msgpack": encode_msgpack,
+}
+
+
+def encode_arrays(bundle: ArrayBundle, array_format: ArrayFormat) -> bytes:
+    return ENCODERS[array_format](bundle)
+
+
+def parse_params(params_model: Type[ParamsT], params: str) -> ParamsT:
+    # The body of an array endpoint carries the raw points, so its params,
+    # nested ones included, travel as JSON in the params query string.
+    try:
+        return params_model.model_validate_json(params)
+    except ValidationError as error:
+        raise RequestValidationError(error.errors())
+
+
+async def read_points(request: Request) -> np.ndarray:
+    array_format = get_array_format(request.headers.get("content-type"))
+    if array_format is None:
+        media_types = ", ".join(ARRAY_MEDIA_TYPES.values())
+        raise HTTPException(
+            status_code=415, detail=f"points must be sent as one of {media_types}"
+        )
+    try:
+        return decode_points(await request.body(), array_format)
+    except UnsupportedMediaType as error:
+        raise HTTPException(status_code=415, detail=str(error))
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+
+
+def build_array_response(
+    bundle: ArrayBundle,
+    accept: Optional[str],
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    array_format = get_array_format(accept)
+    if array_format is None:
+        content = {name: np.asarray(array).tolist() for name, array in bundle.items()}
+        return JSONResponse(content, headers=headers)
+    try:
+        content = encode_arrays(bundle, array_format)
+    except UnsupportedMediaType as error:
+        raise HTTPException(status_code=406, detail=str(error))
+    return Response(
+        content,
+        media_type=ARRAY_RESPONSE_MEDIA_TYPES[array_format],
+        headers=headers,
+    )
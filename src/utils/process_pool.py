@@ -0,0 +1,104 @@
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Iterable, List, Optional, Tuple, TypeVar
+
+import numpy as np
+
+# Shared segments a worker keeps mapped between tasks. A run shares at most
+# four, so this holds the current run of two requests at once.
+MAX_ATTACHED_SEGMENTS = 8
+
+ResultT = TypeVar("ResultT")
+
+_attached: "OrderedDict[str, Tuple[SharedMemory, np.ndarray]]" = OrderedDict()
+
+
+def attach_shared_array(name: str, shape: Tuple[int, ...], dtype: str) -> np.ndarray:
+    """
+    Maps a segment shared by the parent as a read-only array, reusing the
+    mapping for every later task that names the same segment.
+    """
+    if name in _attached:
+        _attached.move_to_end(name)
+        return _attached[name][1]
+    memory = SharedMemory(name=name)
+    array = np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+    array.flags.writeable = False
+    _attached[name] = (memory, array)
+    while len(_attached) > MAX_ATTACHED_SEGMENTS:
+        # Segments of finished runs are already unlinked by the parent, so
+        # closing the mapping is what gives their memory back.
+        old_memory, old_array = _attached.popitem(last=False)[1]
+        del old_array
+        try:
+            old_memory.close()
+        except BufferError:
+            pass
+    return array
+
+
+def share_array(array: np.ndarray) -> SharedMemory:
+    # Workers cache mappings by name, so a name is never handed out twice.
+    memory = SharedMemory(
+        name=f"mlapi_{uuid.uuid4().hex}", create=True, size=max(array.nbytes, 1)
+    )
+    np.ndarray(array.shape, dtype=array.dtype, buffer=memory.buf)[:] = array
+    return memory
+
+
+def release_shared(memory: SharedMemory):
+    memory.close()
+    memory.unlink()
+
+
+class ProcessPool:
+    """
+    Process-wide spawn pool that every request fanning work out submits to.
+
+    Workers start on first use and stay up until the app shuts down, so a
+    request no longer pays for spawning interpreters and importing NumPy.
+    The pool is sized to the CPU count; a request bounds its own share by
+    splitting its work into at most n_workers tasks.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=get_context("spawn")
+                )
+            return self._executor
+
+    def map(
+        self, function: Callable[..., ResultT], *arguments: Iterable
+    ) -> List[ResultT]:
+        executor = self._get_executor()
+        try:
+            return list(executor.map(function, *arguments))
+        except BrokenProcessPool:
+            # A dead worker breaks the whole executor, so the next request
+            # starts a fresh one.
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            raise
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+
+process_pool = ProcessPool()
@@ -0,0 +1,65 @@
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, Literal, Tuple
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from starlette.types import Receive, Scope, Send
+
+StreamFormat = Literal["ndjson", "sse"]
+
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+def format_ndjson(event: str, payload: BaseModel) -> str:
+    return f'{{"event": "{event}", "data": {payload.model_dump_json()}}}\n'
+
+
+def format_sse(event: str, payload: BaseModel) -> str:
+    return f"event: {event}\ndata: {payload.model_dump_json()}\n\n"
+
+
+def encode_stream(
+    events: Iterable[Tuple[str, BaseModel]], stream_format: StreamFormat
+) -> Iterator[str]:
+    formatter = format_sse if stream_format == "sse" else format_ndjson
+    for event, payload in events:
+        yield formatter(event, payload)
+
+
+async def encode_async_stream(
+    events: AsyncIterable[Tuple[str, BaseModel]], stream_format: StreamFormat
+) -> AsyncIterator[str]:
+    formatter = format_sse if stream_format == "sse" else format_ndjson
+    async for event, payload in events:
+        yield formatter(event, payload)
+
+
+async def read_ndjson_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    Streaming response whose body is produced while the request body is
+    still being read.
+
+    StreamingResponse may watch receive() for a disconnect while it streams,
+    which would swallow the request body chunks the generator is waiting on.
+    Here the generator is the only reader, and a client that goes away
+    surfaces as ClientDisconnect from request.stream().
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
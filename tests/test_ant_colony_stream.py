@@ -0,0 +1,65 @@
+import json
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.main import app
+
+N_POINTS = 10
+MAX_ITERATIONS = 5
+
+
+def make_body(**params) -> dict:
+    coordinates = np.random.default_rng(0).random((N_POINTS, 2))
+    return {
+        "points": [{"x": x, "y": y} for x, y in coordinates.tolist()],
+        "model_params": {"seed": 0},
+        "max_iterations": MAX_ITERATIONS,
+        **params,
+    }
+
+
+def parse_sse(text: str):
+    for block in text.strip().split("\n\n"):
+        event_line, data_line = block.split("\n")
+        yield event_line.removeprefix("event: "), json.loads(
+            data_line.removeprefix("data: ")
+        )
+
+
+def test_ndjson_stream_sends_progress_then_result():
+    response = TestClient(app).post(
+        "/v1/ant-colony-model/stream", json=make_body(response_format="compact")
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["event"] for line in lines] == ["progress"] * MAX_ITERATIONS + [
+        "result"
+    ]
+    progress = [line["data"] for line in lines[:-1]]
+    assert [update["iteration"] for update in progress] == list(range(MAX_ITERATIONS))
+    best = [update["best_distance"] for update in progress]
+    assert best == sorted(best, reverse=True)
+    assert all(update["trail"] is None for update in progress)
+    result = lines[-1]["data"]
+    assert result["last_trail"]["total_distance"] == pytest.approx(best[-1])
+    assert result["distances"] is None
+
+
+def test_sse_stream_carries_trails_when_asked():
+    response = TestClient(app).post(
+        "/v1/ant-colony-model/stream",
+        params={"format": "sse", "include_trails": True},
+        json=make_body(response_format="compact"),
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = list(parse_sse(response.text))
+    assert [event for event, _ in events][-1] == "result"
+    for event, data in events[:-1]:
+        assert event == "progress"
+        assert sorted(data["compact_trail"]["tour"]) == list(range(N_POINTS))
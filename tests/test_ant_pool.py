@@ -0,0 +1,49 @@
+import numpy as np
+
+from src.objects.ant_colony_objects import AntColonyRequest, PointRequest
+from src.params.ant_colony_params import AntColonyModelParams
+from src.services.ant_colony_model.ant_colony_model import AntColonyModel
+from src.services.ant_colony_model.ant_pool import AntPool
+from src.services.ant_colony_model.colony_state import ColonyState
+from src.services.ant_colony_model.trail_manager import TrailMatrixManager
+
+N_POINTS = 15
+
+
+def make_coordinates() -> np.ndarray:
+    return np.random.default_rng(0).random((N_POINTS, 2))
+
+
+def test_pool_tours_match_sequential_construction():
+    state = ColonyState(
+        [], AntColonyModelParams(seed=3), coordinates=make_coordinates()
+    )
+    with TrailMatrixManager(state) as manager:
+        manager.update_probabilities()
+        expected = manager.choose_trails(iteration=2)
+
+    ant_pool = AntPool(state)
+    # More chunks than workers still has to give the same tours in order.
+    ant_pool.n_workers = 3
+    try:
+        chosen_tours = ant_pool.choose_trails(2, np.arange(N_POINTS))
+    finally:
+        ant_pool.close()
+
+    np.testing.assert_array_equal(chosen_tours.tours, expected.tours)
+    np.testing.assert_allclose(chosen_tours.lengths, expected.lengths)
+
+
+def test_seeded_run_is_identical_with_and_without_workers():
+    points = [PointRequest(x=x, y=y) for x, y in make_coordinates().tolist()]
+    tours = []
+    for n_workers in (1, 2):
+        request = AntColonyRequest(
+            points=points,
+            model_params=AntColonyModelParams(seed=5, n_workers=n_workers),
+            max_iterations=4,
+            response_format="compact",
+        )
+        tours.append(AntColonyModel(request).run().last_trail.tour)
+
+    assert tours[0] == tours[1]
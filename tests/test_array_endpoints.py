@@ -0,0 +1,68 @@
+import io
+import json
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.main import app
+
+ARRAY_ENDPOINTS = [
+    ("/v1/ant-colony-model/arrays", {"max_iterations": 2}),
+    ("/v1/ant-colony-model/clustered/arrays", {"max_iterations": 2}),
+    ("/v1/pythagorean-support-machine-model/arrays", {"n_groups": 2}),
+    (
+        "/v1/pythagorean-support-machine-model/sweep/arrays",
+        {"min_groups": 2, "max_groups": 3},
+    ),
+]
+
+
+def post_points(url: str, params: str):
+    body = io.BytesIO()
+    np.save(body, np.random.default_rng(0).random((20, 2)))
+    return TestClient(app).post(
+        url,
+        params={"params": params},
+        content=body.getvalue(),
+        headers={"content-type": "application/x-npy"},
+    )
+
+
+@pytest.mark.parametrize("url, params", ARRAY_ENDPOINTS)
+def test_array_endpoints_take_json_params(url: str, params: dict):
+    response = post_points(url, json.dumps(params))
+
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("url", [url for url, _ in ARRAY_ENDPOINTS])
+@pytest.mark.parametrize("params", ["{oops", '{"max_iterations": 0, "n_groups": 0}'])
+def test_array_endpoints_reject_bad_params(url: str, params: str):
+    response = post_points(url, params)
+
+    assert response.status_code == 422
+
+
+def post_npz(**arrays):
+    body = io.BytesIO()
+    np.savez(body, **arrays)
+    return TestClient(app).post(
+        "/v1/ant-colony-model/arrays",
+        params={"params": json.dumps({"max_iterations": 2})},
+        content=body.getvalue(),
+        headers={"content-type": "application/x-npy"},
+    )
+
+
+def test_npz_points_are_accepted():
+    points = np.random.default_rng(0).random((20, 2))
+
+    assert post_npz(points=points).status_code == 200
+    assert post_npz(coordinates=points).status_code == 200
+
+
+def test_npz_with_several_arrays_is_rejected():
+    response = post_npz(tour=np.arange(3), total_distance=np.array(1.0))
+
+    assert response.status_code == 400
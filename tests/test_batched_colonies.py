@@ -0,0 +1,106 @@
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from src.main import app
+from src.objects.ant_colony_objects import (
+    AntColonyParams,
+    AntColonyRequest,
+    PointRequest,
+)
+from src.params.ant_colony_params import AntColonyModelParams
+from src.services.ant_colony_model import batched_colonies
+from src.services.ant_colony_model.ant_colony_model import AntColonyModel
+from src.services.ant_colony_model.batched_colonies import BatchedColonyRunner
+from src.services.ant_colony_model.colony_state import ColonyState
+
+N_POINTS = 15
+N_COLONIES = 3
+
+
+def make_points():
+    coordinates = np.random.default_rng(1).random((N_POINTS, 2))
+    return [PointRequest(x=x, y=y) for x, y in coordinates.tolist()]
+
+
+@pytest.mark.parametrize(
+    "model_params",
+    [
+        {"variant": "ant_system"},
+        {"variant": "max_min", "local_search": "iteration_best"},
+        {"variant": "colony_system"},
+        {"variant": "ant_system", "stagnation_patience": 2},
+    ],
+)
+@pytest.mark.parametrize("n_ants", [None, 6])
+def test_seeded_batch_matches_one_sequential_run_per_colony(model_params, n_ants):
+    request = AntColonyRequest(
+        points=make_points(),
+        model_params=AntColonyModelParams(seed=11, **model_params),
+        n_colonies=N_COLONIES,
+        n_ants=n_ants,
+        max_iterations=8,
+    )
+    batched = AntColonyModel(request)
+    response = batched.run()
+
+    for stats in response.colonies:
+        colony_request = request.model_copy(
+            update={
+                "n_colonies": 1,
+                "model_params": request.model_params.model_copy(
+                    update={"seed": stats.seed}
+                ),
+            }
+        )
+        sequential = AntColonyModel(colony_request)
+        list(sequential.iterate())
+
+        colony = stats.colony_idx
+        runner = batched.colony_runner
+        np.testing.assert_array_equal(
+            runner.best_tours[colony], sequential.state.best_tour
+        )
+        assert stats.best_distance == sequential.state.best_length
+        np.testing.assert_array_equal(
+            runner.get_colony_pheromones(colony), sequential.state.pheromones
+        )
+
+
+@pytest.mark.parametrize("variant", ["ant_system", "colony_system"])
+def test_deadline_cuts_construction(monkeypatch, variant: str):
+    # One ant per block, so an expired deadline stops after the first ant.
+    monkeypatch.setattr(batched_colonies, "MAX_BLOCK_ELEMENTS", 1)
+    state = ColonyState(make_points(), AntColonyModelParams(variant=variant, seed=0))
+    runner = BatchedColonyRunner(state, N_COLONIES)
+
+    iteration_bests = list(runner.iterate(5, deadline=time.monotonic() - 1))
+
+    assert len(iteration_bests) == 1
+    assert iteration_bests[0].n_tours == N_COLONIES
+
+
+@pytest.mark.parametrize(
+    "model_params", [{"n_candidates": 5}, {"n_workers": 2}], ids=str
+)
+def test_batched_colonies_reject_unsupported_params(model_params):
+    with pytest.raises(ValidationError):
+        AntColonyParams(n_colonies=2, model_params=AntColonyModelParams(**model_params))
+
+    points = [{"x": x, "y": y} for x, y in np.random.rand(5, 2).tolist()]
+    response = TestClient(app).post(
+        "/v1/ant-colony-model",
+        json={"points": points, "n_colonies": 2, "model_params": model_params},
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize(
+    "params", [{"n_colonies": 65}, {"n_ants": 10001}, {"max_iterations": 10001}]
+)
+def test_run_size_is_capped(params):
+    with pytest.raises(ValidationError):
+        AntColonyParams(**params)
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from src.objects.ant_colony_objects import AntColonyRequest
+from src.params.ant_colony_params import AntColonyModelParams
+from src.services.ant_colony_model.ant_colony_model import AntColonyModel
+from src.services.ant_colony_model.ant_pool import AntPool
+from src.services.ant_colony_model.colony_state import ColonyState
+from src.services.ant_colony_model.neighbour_index import NeighbourIndex
+from src.services.ant_colony_model.trail_manager import TrailMatrixManager
+from src.services.ant_colony_model.utils import calc_distance_matrix
+
+N_POINTS = 80
+N_CANDIDATES = 6
+
+
+def make_coordinates() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    # A dense blob next to sparse points, so grid cells are very uneven.
+    return np.vstack([rng.random((60, 2)) * 0.1, rng.random((20, 2)) * 10])
+
+
+def test_candidates_match_brute_force_neighbours():
+    coordinates = make_coordinates()
+    distances = calc_distance_matrix(coordinates)
+    np.fill_diagonal(distances, np.inf)
+    expected = np.argsort(distances, axis=1)[:, :N_CANDIDATES]
+
+    candidates = NeighbourIndex(coordinates, N_CANDIDATES).query()
+
+    for row, (found, brute) in enumerate(zip(candidates, expected)):
+        assert set(found.tolist()) == set(brute.tolist()), row
+
+
+@pytest.mark.parametrize("variant", ["ant_system", "max_min", "colony_system"])
+def test_candidate_tours_are_permutations(variant: str):
+    model_params = AntColonyModelParams(
+        variant=variant, seed=0, n_candidates=N_CANDIDATES
+    )
+    state = ColonyState([], model_params, coordinates=make_coordinates())
+    assert state.weights.shape == (N_POINTS, N_CANDIDATES)
+
+    with TrailMatrixManager(state) as manager:
+        for iteration in range(3):
+            manager.update_probabilities()
+            chosen_tours = manager.choose_trails(iteration)
+            for tour in chosen_tours.tours:
+                np.testing.assert_array_equal(np.sort(tour), np.arange(N_POINTS))
+            manager.update_pheromones(chosen_tours)
+
+
+def test_candidate_run_improves_on_first_iteration():
+    request = AntColonyRequest(
+        points=[],
+        model_params=AntColonyModelParams(seed=0, n_candidates=N_CANDIDATES),
+        max_iterations=5,
+        response_format="compact",
+        include_history=False,
+    )
+    model = AntColonyModel(request, coordinates=make_coordinates())
+    response = model.run()
+
+    tour = response.last_trail.tour
+    assert sorted(tour) == list(range(N_POINTS))
+    assert response.last_trail.total_distance <= response.first_trail.total_distance
+
+
+def test_pool_matches_sequential_with_candidates():
+    state = ColonyState(
+        [],
+        AntColonyModelParams(seed=3, n_candidates=N_CANDIDATES),
+        coordinates=make_coordinates(),
+    )
+    with TrailMatrixManager(state) as manager:
+        manager.update_probabilities()
+        expected = manager.choose_trails(iteration=1)
+
+    ant_pool = AntPool(state)
+    ant_pool.n_workers = 2
+    try:
+        chosen_tours = ant_pool.choose_trails(1, np.arange(N_POINTS))
+    finally:
+        ant_pool.close()
+
+    np.testing.assert_array_equal(chosen_tours.tours, expected.tours)
@@ -0,0 +1,96 @@
+import io
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.main import app
+from src.services.pythagorean_support_machine_model.cluster_predictor import (
+    ClusterPredictor,
+)
+from src.services.pythagorean_support_machine_model.model_store import model_store
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch) -> TestClient:
+    monkeypatch.setattr(model_store, "directory", tmp_path)
+    return TestClient(app)
+
+
+def fit_model(client: TestClient) -> str:
+    rng = np.random.default_rng(0)
+    points = [{"coordinates": row} for row in rng.random((30, 2)).tolist()]
+    response = client.post(
+        "/v1/pythagorean-support-machine-model",
+        json={"points": points, "n_groups": 2, "seed": 0, "persist": True},
+    )
+    return response.json()["model_id"]
+
+
+@pytest.mark.parametrize(
+    "coordinates",
+    [[[0.1, 0.2], [0.3]], [[0.1, 0.2, 0.3]]],
+)
+def test_predict_rejects_mismatched_points(client: TestClient, coordinates):
+    model_id = fit_model(client)
+
+    response = client.post(
+        f"/v1/pythagorean-support-machine-model/models/{model_id}/predict",
+        json={"points": [{"coordinates": row} for row in coordinates]},
+    )
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == "every point must have 2 coordinates"
+
+
+def test_predict_rejects_empty_points(client: TestClient):
+    model_id = fit_model(client)
+
+    response = client.post(
+        f"/v1/pythagorean-support-machine-model/models/{model_id}/predict",
+        json={"points": []},
+    )
+
+    assert response.status_code == 422
+
+
+def test_predict_keeps_other_errors(client: TestClient, monkeypatch):
+    model_id = fit_model(client)
+
+    def fail(self, points):
+        raise ValueError("centroids are not finite")
+
+    monkeypatch.setattr(ClusterPredictor, "predict", fail)
+    response = client.post(
+        f"/v1/pythagorean-support-machine-model/models/{model_id}/predict",
+        json={"points": [{"coordinates": [0.1, 0.2]}]},
+    )
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == "centroids are not finite"
+
+
+def test_predict_labels_points(client: TestClient):
+    model_id = fit_model(client)
+
+    response = client.post(
+        f"/v1/pythagorean-support-machine-model/models/{model_id}/predict",
+        json={"points": [{"coordinates": [0.1, 0.2]}, {"coordinates": [0.9, 0.8]}]},
+    )
+
+    assert response.status_code == 200
+    assert len(response.json()["labels"]) == 2
+
+
+def test_predict_arrays_rejects_mismatched_points(client: TestClient):
+    model_id = fit_model(client)
+    body = io.BytesIO()
+    np.save(body, np.zeros((2, 3)))
+
+    response = client.post(
+        f"/v1/pythagorean-support-machine-model/models/{model_id}/predict/arrays",
+        content=body.getvalue(),
+        headers={"content-type": "application/x-npy"},
+    )
+
+    assert response.status_code == 422
@@ -0,0 +1,46 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.objects.ant_colony_objects import ClusteredAntColonyRequest, PointRequest
+from src.params.ant_colony_params import AntColonyModelParams
+from src.services.ant_colony_model.clustered_ant_colony_model import (
+    ClusteredAntColonyModel,
+)
+
+N_POINTS = 120
+
+
+def make_request(n_workers: int) -> ClusteredAntColonyRequest:
+    coordinates = np.random.default_rng(0).random((N_POINTS, 2)) * 100
+    return ClusteredAntColonyRequest(
+        points=[PointRequest(x=x, y=y) for x, y in coordinates.tolist()],
+        model_params=AntColonyModelParams(seed=4, n_workers=n_workers),
+        max_cluster_size=30,
+        max_iterations=2,
+        n_ants=5,
+    )
+
+
+@pytest.mark.parametrize("n_workers", [1, 2])
+def test_clustered_tour_visits_every_point_once(monkeypatch, n_workers: int):
+    # Pretend there are two CPUs so the pooled path runs on any machine.
+    monkeypatch.setattr(os, "cpu_count", lambda: 2)
+
+    response = ClusteredAntColonyModel(make_request(n_workers)).run()
+
+    assert sorted(response.trail.tour) == list(range(N_POINTS))
+    assert sum(response.cluster_sizes) == N_POINTS
+    assert max(response.cluster_sizes) <= 30
+
+
+def test_pooled_clusters_match_in_process_clusters(monkeypatch):
+    monkeypatch.setattr(os, "cpu_count", lambda: 2)
+
+    tours = [
+        ClusteredAntColonyModel(make_request(n_workers)).run().trail.tour
+        for n_workers in (1, 2)
+    ]
+
+    assert tours[0] == tours[1]
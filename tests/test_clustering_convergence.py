@@ -0,0 +1,60 @@
+import numpy as np
+
+from src.objects.pythagorean_support_machine_objects import (
+    PythagoreanSupportMachineInput,
+)
+from src.services.pythagorean_support_machine_model.pythagorean_support_machine_model import (
+    PythagoreanSupportMachineModel,
+)
+from src.services.pythagorean_support_machine_model.utils import calculate_objective
+
+
+def make_points() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    centres = np.array([[0.0, 0.0], [4.0, 4.0], [0.0, 4.0]])
+    return np.vstack([rng.normal(centre, 1.0, (40, 2)) for centre in centres])
+
+
+def make_model(**settings) -> PythagoreanSupportMachineModel:
+    input = PythagoreanSupportMachineInput(
+        points=[], n_groups=3, initialization="random", seed=1, **settings
+    )
+    return PythagoreanSupportMachineModel(input, make_points())
+
+
+def test_fit_stops_once_changes_fall_below_tolerance():
+    model = make_model(tolerance=1e-4)
+    model.fit()
+
+    assert model.converged
+    assert 1 < model.n_iterations < 100
+    assert model.objective == calculate_objective(model.state)
+
+    # One iteration fewer leaves the fit short of the tolerance.
+    truncated = make_model(tolerance=1e-4)
+    truncated.fit(max_iterations=model.n_iterations - 1)
+    assert not truncated.converged
+
+
+def test_looser_tolerance_stops_sooner():
+    iterations = []
+    for tolerance in (1e-2, 1e-4, 1e-8):
+        model = make_model(tolerance=tolerance)
+        model.fit()
+        iterations.append(model.n_iterations)
+
+    assert iterations == sorted(iterations)
+    assert iterations[0] < iterations[-1]
+
+
+def test_objective_never_increases():
+    model = make_model(tolerance=1e-12)
+    objectives = []
+    for _ in range(15):
+        model.fit(max_iterations=1)
+        objectives.append(model.objective)
+
+    assert model.n_iterations == 15
+    assert all(
+        later <= earlier + 1e-9 for earlier, later in zip(objectives, objectives[1:])
+    )
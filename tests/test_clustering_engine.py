@@ -0,0 +1,74 @@
+import numpy as np
+
+from src.objects.pythagorean_support_machine_objects import (
+    PythagoreanSupportMachineInput,
+)
+from src.services.pythagorean_support_machine_model.pythagorean_support_machine_model import (
+    PythagoreanSupportMachineModel,
+)
+from src.services.pythagorean_support_machine_model.utils import (
+    calculate_memberships,
+)
+
+
+def make_points() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    centres = np.array([[0.0, 0.0], [6.0, 6.0], [0.0, 6.0]])
+    return np.vstack([rng.normal(centre, 0.8, (40, 2)) for centre in centres])
+
+
+def make_model(points: np.ndarray, **settings) -> PythagoreanSupportMachineModel:
+    input = PythagoreanSupportMachineInput(
+        points=[], n_groups=3, initialization="random", seed=7, **settings
+    )
+    return PythagoreanSupportMachineModel(input, points)
+
+
+def fit_loop(points: np.ndarray, centroids: np.ndarray, n_iterations: int):
+    # Point by point fuzzy c-means with m = 2, in the engine's update order.
+    centroids = centroids.copy()
+    n_groups = len(centroids)
+    for _ in range(n_iterations):
+        memberships = np.empty((len(points), n_groups))
+        for i, point in enumerate(points):
+            distances = [np.linalg.norm(point - centroid) for centroid in centroids]
+            for j in range(n_groups):
+                memberships[i, j] = 1 / sum(
+                    (distances[j] / distances[l]) ** 2 for l in range(n_groups)
+                )
+        for j in range(n_groups):
+            weights = memberships[:, j] ** 2
+            centroids[j] = (weights[:, np.newaxis] * points).sum(axis=0) / weights.sum()
+    return memberships, centroids
+
+
+def test_engine_matches_point_by_point_loop():
+    points = make_points()
+    model = make_model(points, tolerance=1e-12)
+    initial_centroids = model.state.centroids.copy()
+
+    state = model.fit(max_iterations=10)
+    memberships, centroids = fit_loop(points, initial_centroids, model.n_iterations)
+
+    np.testing.assert_allclose(state.memberships, memberships, atol=1e-9)
+    np.testing.assert_allclose(state.centroids, centroids, atol=1e-9)
+
+
+def test_seeded_fit_is_deterministic():
+    points = make_points()
+    first = make_model(points).fit()
+    second = make_model(points).fit()
+
+    np.testing.assert_array_equal(first.memberships, second.memberships)
+    np.testing.assert_array_equal(first.centroids, second.centroids)
+
+
+def test_point_on_a_centroid_belongs_to_it():
+    distances = np.array([[0.0, 2.0, 3.0], [0.0, 0.0, 1.0], [1.0, 2.0, 2.0]])
+
+    memberships = calculate_memberships(distances)
+
+    np.testing.assert_allclose(memberships[0], [1.0, 0.0, 0.0])
+    np.testing.assert_allclose(memberships[1], [0.5, 0.5, 0.0])
+    np.testing.assert_allclose(memberships.sum(axis=1), 1.0)
+    assert np.isfinite(memberships).all()
@@ -0,0 +1,92 @@
+import numpy as np
+
+from src.objects.ant_colony_objects import AntColonyRequest, PointRequest
+from src.params.ant_colony_params import AntColonyModelParams
+from src.services.ant_colony_model.ant_colony_model import AntColonyModel
+from src.services.ant_colony_model.colony_state import ColonyState
+from src.services.ant_colony_model.pheromone_updater import get_pheromone_bounds
+from src.services.ant_colony_model.trail_choser import TrailChooser
+from src.services.ant_colony_model.trail_manager import TrailMatrixManager
+
+N_POINTS = 12
+
+
+def make_points():
+    coordinates = np.random.default_rng(0).random((N_POINTS, 2))
+    return [PointRequest(x=x, y=y) for x, y in coordinates.tolist()]
+
+
+def make_request(max_iterations: int = 30, **model_params) -> AntColonyRequest:
+    return AntColonyRequest(
+        points=make_points(),
+        model_params=AntColonyModelParams(seed=0, **model_params),
+        max_iterations=max_iterations,
+        response_format="compact",
+        include_history=False,
+    )
+
+
+def test_colony_system_local_update_runs_during_construction():
+    state = ColonyState(
+        make_points(), AntColonyModelParams(variant="colony_system", seed=0)
+    )
+    state.pheromones *= 5
+    with TrailMatrixManager(state) as manager:
+        manager.update_probabilities()
+    before = state.pheromones.copy()
+    tau0 = state.initial_pheromone
+    rate = state.model_params.local_evaporation_rate
+
+    trail_chooser = TrailChooser(state, local_update=True)
+    tour = trail_chooser.choose_trail(0, np.random.default_rng(1))
+
+    from_idx, to_idx = tour[:-1], tour[1:]
+    expected = (1 - rate) * before[from_idx, to_idx] + rate * tau0
+    np.testing.assert_allclose(state.pheromones[from_idx, to_idx], expected)
+    np.testing.assert_allclose(state.pheromones[to_idx, from_idx], expected)
+    assert np.all(state.pheromones[from_idx, to_idx] < before[from_idx, to_idx])
+    # The next ant chooses with weights that already include the update.
+    np.testing.assert_allclose(
+        state.weights[from_idx, to_idx],
+        expected**state.model_params.alpha * state.heuristic[from_idx, to_idx],
+    )
+
+
+def test_max_min_pheromones_stay_within_bounds():
+    model = AntColonyModel(make_request(variant="max_min"))
+    model.run()
+
+    state = model.state
+    pheromone_min, pheromone_max = get_pheromone_bounds(
+        state.model_params, state.best_length, state.n_points
+    )
+    off_diagonal = ~np.eye(state.n_points, dtype=bool)
+    assert state.pheromones[off_diagonal].min() >= pheromone_min - 1e-12
+    assert state.pheromones[off_diagonal].max() <= pheromone_max + 1e-12
+
+
+def test_max_min_honours_explicit_bounds():
+    model = AntColonyModel(
+        make_request(variant="max_min", pheromone_min=0.5, pheromone_max=2.0)
+    )
+    model.run()
+
+    off_diagonal = ~np.eye(N_POINTS, dtype=bool)
+    assert model.state.pheromones[off_diagonal].min() >= 0.5
+    assert model.state.pheromones[off_diagonal].max() <= 2.0
+
+
+def test_stagnation_stops_the_run_early():
+    model = AntColonyModel(make_request(max_iterations=500, stagnation_patience=3))
+    lengths = [best.length for best in model.iterate()]
+
+    assert len(lengths) < 500
+    best_iteration = int(np.argmin(lengths))
+    assert len(lengths) - 1 - best_iteration == 3
+
+
+def test_entropy_threshold_stops_the_run_early():
+    model = AntColonyModel(make_request(max_iterations=500, entropy_threshold=0.9))
+    n_iterations = sum(1 for _ in model.iterate())
+
+    assert n_iterations < 500
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.main import app
+
+N_POINTS = 10
+
+
+def run(**params) -> dict:
+    coordinates = np.random.default_rng(0).random((N_POINTS, 2))
+    response = TestClient(app).post(
+        "/v1/ant-colony-model",
+        json={
+            "points": [{"x": x, "y": y} for x, y in coordinates.tolist()],
+            "model_params": {"seed": 0},
+            "max_iterations": 4,
+            **params,
+        },
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_compact_response_describes_the_verbose_tour():
+    verbose = run(response_format="verbose")
+    compact = run(response_format="compact")
+
+    segments = verbose["last_trail"]["segments"]
+    verbose_tour = [segments[0]["from_p"]["idx"]] + [
+        segment["to_p"]["idx"] for segment in segments
+    ]
+    # Verbose points are numbered from 1, compact tours index from 0.
+    assert [idx + 1 for idx in compact["last_trail"]["tour"]] == verbose_tour
+    assert compact["last_trail"]["total_distance"] == pytest.approx(
+        verbose["last_trail"]["total_distance"]
+    )
+    assert len(compact["points"]) == N_POINTS
+
+
+def test_compact_tour_length_matches_its_points():
+    compact = run(response_format="compact")
+
+    points = np.array(compact["points"])
+    tour = compact["last_trail"]["tour"]
+    assert sorted(tour) == list(range(N_POINTS))
+    steps = np.diff(points[tour], axis=0)
+    assert compact["last_trail"]["total_distance"] == pytest.approx(
+        np.sqrt((steps**2).sum(axis=1)).sum()
+    )
+
+
+def test_compact_history_is_one_distance_per_iteration():
+    with_history = run(response_format="compact")
+    without_history = run(response_format="compact", include_history=False)
+
+    assert len(with_history["distances"]) == with_history["n_iterations"]
+    assert min(with_history["distances"]) == pytest.approx(
+        with_history["last_trail"]["total_distance"]
+    )
+    assert without_history["distances"] is None
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from src.objects.pythagorean_support_machine_objects import (
+    PythagoreanSupportMachineInput,
+)
+from src.services.pythagorean_support_machine_model.first_matrix_setter import (
+    FirstMatrixSetter,
+)
+
+CENTRES = np.array([[0.0, 0.0], [100.0, 0.0], [0.0, 100.0], [100.0, 100.0]])
+
+
+def make_points() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return np.vstack([rng.normal(centre, 0.1, (25, 2)) for centre in CENTRES])
+
+
+def make_setter(**settings) -> FirstMatrixSetter:
+    settings = {"initialization": "kmeans++", "seed": 3, **settings}
+    return FirstMatrixSetter(
+        PythagoreanSupportMachineInput(points=[], n_groups=len(CENTRES), **settings)
+    )
+
+
+@pytest.mark.parametrize("initialization", ["kmeans++", "kmeans++_sampled"])
+def test_seeds_are_input_points_spread_over_the_blobs(initialization: str):
+    points = make_points()
+
+    state = make_setter(
+        initialization=initialization, init_sample_size=40
+    ).set_first_matrix(points)
+
+    for centroid in state.centroids:
+        assert (points == centroid).all(axis=1).any()
+    nearest_centres = np.argmin(
+        np.linalg.norm(state.centroids[:, np.newaxis] - CENTRES, axis=-1), axis=1
+    )
+    assert sorted(nearest_centres.tolist()) == list(range(len(CENTRES)))
+    np.testing.assert_allclose(state.memberships.sum(axis=1), 1.0)
+
+
+def test_seeding_is_deterministic_per_seed():
+    points = make_points()
+
+    first = make_setter(seed=5).set_first_matrix(points)
+    second = make_setter(seed=5).set_first_matrix(points)
+
+    np.testing.assert_array_equal(first.centroids, second.centroids)
+    np.testing.assert_array_equal(first.memberships, second.memberships)
+
+
+def test_identical_points_still_give_every_group_a_seed():
+    points = np.ones((10, 2))
+
+    state = make_setter().set_first_matrix(points)
+
+    np.testing.assert_array_equal(state.centroids, np.ones((len(CENTRES), 2)))
+    assert np.isfinite(state.memberships).all()
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from src.objects.pythagorean_support_machine_objects import (
+    Point,
+    PythagoreanSupportMachineSweepInput,
+)
+from src.services.pythagorean_support_machine_model.groups_sweep import GroupsSweep
+from src.services.pythagorean_support_machine_model.pythagorean_support_machine_model import (
+    PythagoreanSupportMachineModel,
+)
+
+CENTERS = np.array([[0.0, 0.0], [10.0, 10.0], [0.0, 10.0], [10.0, 0.0]])
+
+
+def make_input(**settings) -> PythagoreanSupportMachineSweepInput:
+    rng = np.random.default_rng(0)
+    coordinates = np.concatenate(
+        [center + rng.normal(scale=0.3, size=(40, 2)) for center in CENTERS]
+    )
+    return PythagoreanSupportMachineSweepInput(
+        points=[Point(coordinates=row) for row in coordinates.tolist()],
+        min_groups=2,
+        max_groups=7,
+        seed=0,
+        **settings,
+    )
+
+
+@pytest.mark.parametrize(
+    "criterion", ["xie_beni", "partition_coefficient", "silhouette"]
+)
+def test_sweep_recommends_true_groups(criterion: str):
+    output = GroupsSweep(make_input(criterion=criterion)).run()
+
+    assert output.recommended_n_groups == len(CENTERS)
+    assert len(output.scores) == 6
+
+
+def test_sweep_reuses_the_scored_fit(monkeypatch):
+    fit = PythagoreanSupportMachineModel.fit
+    calls = []
+
+    def counting_fit(self, max_iterations=None):
+        calls.append(self.input.n_groups)
+        return fit(self, max_iterations)
+
+    monkeypatch.setattr(PythagoreanSupportMachineModel, "fit", counting_fit)
+    sweep = GroupsSweep(make_input())
+    sweep.fit()
+
+    assert calls == list(range(2, 8))
+    recommended = [
+        score for score in sweep.scores if score.n_groups == sweep.model.state.n_groups
+    ]
+    assert sweep.model.objective == recommended[0].objective
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from src.params.ant_colony_params import AntColonyModelParams
+from src.services.ant_colony_model.colony_state import ColonyState
+from src.services.ant_colony_model.local_search import LocalSearch
+
+N_POINTS = 40
+
+
+def make_state(**model_params) -> ColonyState:
+    coordinates = np.random.default_rng(0).random((N_POINTS, 2))
+    return ColonyState([], AntColonyModelParams(**model_params), coordinates)
+
+
+@pytest.mark.parametrize("model_params", [{}, {"n_candidates": 5}], ids=str)
+def test_local_search_never_lengthens_a_tour(model_params):
+    state = make_state(**model_params)
+    local_search = LocalSearch(state)
+    rng = np.random.default_rng(1)
+
+    for _ in range(20):
+        tour = rng.permutation(N_POINTS)
+        improved = local_search.improve(tour.copy())
+
+        assert sorted(improved.tolist()) == list(range(N_POINTS))
+        assert state.tour_length(improved) <= state.tour_length(tour) + 1e-9
+
+
+def test_local_search_shortens_a_random_tour():
+    state = make_state()
+    tour = np.random.default_rng(2).permutation(N_POINTS)
+
+    improved = LocalSearch(state).improve(tour.copy())
+
+    assert state.tour_length(improved) < 0.7 * state.tour_length(tour)
+
+
+def test_local_search_uncrosses_a_two_opt_move():
+    # Cities on a line visited with one segment reversed: a single 2-opt
+    # move restores the straight path.
+    coordinates = np.column_stack([np.arange(8.0), np.zeros(8)])
+    state = ColonyState([], AntColonyModelParams(), coordinates)
+    tour = np.array([0, 1, 5, 4, 3, 2, 6, 7])
+
+    improved = LocalSearch(state).improve(tour)
+
+    assert state.tour_length(improved) == pytest.approx(7.0)
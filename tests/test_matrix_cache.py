@@ -0,0 +1,55 @@
+import numpy as np
+
+from src.params.ant_colony_params import AntColonyModelParams
+from src.services.ant_colony_model import colony_state
+from src.services.ant_colony_model.colony_state import ColonyState
+from src.services.ant_colony_model.matrix_cache import MatrixCache
+
+MATRIX_BYTES = 4 * 4 * 8
+
+
+def make_matrix(value: float) -> np.ndarray:
+    return np.full((4, 4), value)
+
+
+def test_least_recently_used_matrix_is_evicted():
+    cache = MatrixCache(max_bytes=2 * MATRIX_BYTES)
+    cache.get_or_compute("a", lambda: make_matrix(1.0))
+    cache.get_or_compute("b", lambda: make_matrix(2.0))
+    # Reading "a" makes "b" the least recently used entry.
+    cache.get_or_compute("a", lambda: make_matrix(-1.0))
+
+    cache.get_or_compute("c", lambda: make_matrix(3.0))
+
+    assert list(cache.entries) == ["a", "c"]
+    assert cache.n_bytes == 2 * MATRIX_BYTES
+    assert cache.get_or_compute("a", lambda: make_matrix(-1.0))[0, 0] == 1.0
+    stats = cache.get_stats()
+    assert (stats.hits, stats.misses, stats.n_entries) == (2, 3, 2)
+
+
+def test_matrix_larger_than_the_cache_is_not_kept():
+    cache = MatrixCache(max_bytes=MATRIX_BYTES - 1)
+
+    matrix = cache.get_or_compute("a", lambda: make_matrix(1.0))
+
+    assert matrix[0, 0] == 1.0
+    assert not matrix.flags.writeable
+    assert len(cache.entries) == 0
+    assert cache.n_bytes == 0
+
+
+def test_states_over_the_same_points_share_matrices(monkeypatch):
+    cache = MatrixCache()
+    monkeypatch.setattr(colony_state, "matrix_cache", cache)
+    coordinates = np.random.default_rng(0).random((10, 2))
+
+    first = ColonyState([], AntColonyModelParams(), coordinates.copy())
+    second = ColonyState([], AntColonyModelParams(), coordinates.copy())
+    other_beta = ColonyState([], AntColonyModelParams(beta=3.0), coordinates.copy())
+
+    assert second.distances is first.distances
+    assert second.heuristic is first.heuristic
+    assert other_beta.distances is first.distances
+    assert other_beta.heuristic is not first.heuristic
+    assert not first.distances.flags.writeable
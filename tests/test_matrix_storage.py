@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from src.objects.ant_colony_objects import AntColonyRequest
+from src.params.ant_colony_params import AntColonyModelParams
+from src.services.ant_colony_model.ant_colony_model import AntColonyModel
+from src.services.ant_colony_model.matrix_storage import CondensedMatrix, MatrixStorage
+from src.services.ant_colony_model.utils import calc_distance_matrix
+
+N_POINTS = 9
+
+
+def make_coordinates() -> np.ndarray:
+    return np.random.default_rng(0).random((N_POINTS, 2))
+
+
+def test_condensed_matrices_read_like_square_ones():
+    coordinates = make_coordinates()
+    dense = MatrixStorage(AntColonyModelParams())
+    condensed = MatrixStorage(AntColonyModelParams(condensed_matrices=True))
+
+    distances = condensed.calc_distances(coordinates)
+    heuristic = condensed.calc_heuristic(distances)
+
+    assert isinstance(distances, CondensedMatrix)
+    assert distances.nbytes == N_POINTS * (N_POINTS - 1) // 2 * 8
+    expected = dense.calc_distances(coordinates)
+    np.testing.assert_allclose(distances.to_square(), expected)
+    np.testing.assert_allclose(
+        heuristic.to_square(), dense.calc_heuristic(expected), rtol=1e-12
+    )
+    rows = np.array([[0, 3], [8, 8]])
+    cols = np.array([[5, 1], [2, 8]])
+    np.testing.assert_allclose(distances[rows, cols], expected[rows, cols])
+    np.testing.assert_allclose(distances[4], expected[4])
+    assert distances[6, 2] == expected[6, 2]
+    assert distances[3, 3] == 0.0
+
+
+def test_float32_storage_keeps_distances_close():
+    storage = MatrixStorage(AntColonyModelParams(matrix_dtype="float32"))
+
+    distances = storage.calc_distances(make_coordinates())
+
+    assert distances.dtype == np.float32
+    np.testing.assert_allclose(
+        distances, calc_distance_matrix(make_coordinates()), rtol=1e-6
+    )
+
+
+def test_large_arrays_are_memory_mapped():
+    storage = MatrixStorage(
+        AntColonyModelParams(memmap_threshold_bytes=N_POINTS * N_POINTS * 8 - 1)
+    )
+
+    distances = storage.calc_distances(make_coordinates())
+
+    assert isinstance(distances, np.memmap)
+    assert not isinstance(storage.allocate((N_POINTS,)), np.memmap)
+    np.testing.assert_allclose(distances, calc_distance_matrix(make_coordinates()))
+
+
+@pytest.mark.parametrize(
+    "model_params",
+    [
+        {"condensed_matrices": True},
+        {"memmap_threshold_bytes": 1},
+        {"matrix_dtype": "float32"},
+    ],
+    ids=str,
+)
+def test_storage_modes_give_the_dense_seeded_run(model_params):
+    tours = []
+    for params in ({}, model_params):
+        request = AntColonyRequest(
+            points=[],
+            model_params=AntColonyModelParams(seed=2, **params),
+            max_iterations=3,
+            response_format="compact",
+        )
+        # Skipping the cache makes each mode build its own matrices.
+        model = AntColonyModel(request, coordinates=make_coordinates(), use_cache=False)
+        tours.append(model.run().last_trail.tour)
+
+    assert sorted(tours[1]) == list(range(N_POINTS))
+    if "matrix_dtype" not in model_params:
+        assert tours[1] == tours[0]
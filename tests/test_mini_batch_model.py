@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from src.objects.pythagorean_support_machine_objects import (
+    Point,
+    PythagoreanSupportMachineInput,
+    PythagoreanSupportMachineStreamParams,
+)
+from src.services.pythagorean_support_machine_model.first_matrix_setter import (
+    FirstMatrixSetter,
+)
+from src.services.pythagorean_support_machine_model.mini_batch_model import (
+    MiniBatchModel,
+)
+from src.services.pythagorean_support_machine_model.utils import (
+    calculate_distances,
+    calculate_memberships,
+)
+
+
+def make_points() -> np.ndarray:
+    rng = np.random.default_rng(3)
+    centers = np.array([[0.0, 0.0], [10.0, 0.0], [0.0, 10.0]])
+    return np.concatenate([center + rng.normal(size=(40, 2)) for center in centers])
+
+
+def to_points(coordinates: np.ndarray):
+    return [Point(coordinates=row) for row in coordinates.tolist()]
+
+
+@pytest.mark.parametrize("initialization", ["random", "kmeans++"])
+def test_first_batch_uses_initial_centroids(initialization: str):
+    coordinates = make_points()
+    points = to_points(coordinates)
+    params = PythagoreanSupportMachineStreamParams(
+        n_groups=3, initialization=initialization, seed=5
+    )
+    initial_centroids = (
+        FirstMatrixSetter(
+            PythagoreanSupportMachineInput(
+                points=points, n_groups=3, initialization=initialization, seed=5
+            )
+        )
+        .set_first_matrix()
+        .centroids
+    )
+    distances = calculate_distances(coordinates, initial_centroids)
+    memberships = calculate_memberships(distances)
+    weights = memberships**2
+    expected_centroids = (weights.T @ coordinates) / weights.sum(axis=0)[:, None]
+
+    model = MiniBatchModel(params)
+    assignments = model.partial_fit(points)
+
+    np.testing.assert_array_equal(assignments.labels, np.argmax(memberships, axis=1))
+    np.testing.assert_allclose(model.centroids, expected_centroids, rtol=1e-12)
+
+
+@pytest.mark.parametrize("initialization", ["random", "kmeans++"])
+def test_stream_moves_centroids_away_from_mean(initialization: str):
+    coordinates = make_points()
+    params = PythagoreanSupportMachineStreamParams(
+        n_groups=3, initialization=initialization, seed=5
+    )
+    model = MiniBatchModel(params)
+    for _ in range(20):
+        model.partial_fit(to_points(coordinates))
+
+    spread = np.linalg.norm(model.centroids - coordinates.mean(axis=0), axis=1)
+    assert spread.min() > 1.0
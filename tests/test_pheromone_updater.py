@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+
+from src.params.ant_colony_params import AntColonyModelParams
+from src.services.ant_colony_model.batched_colonies import BatchedColonyRunner
+from src.services.ant_colony_model.colony_state import AntTours, ColonyState
+from src.services.ant_colony_model.pheromone_updater import PheromoneUpdater
+
+N_POINTS = 12
+N_ANTS = 5
+
+
+def make_state(variant: str) -> ColonyState:
+    rng = np.random.default_rng(0)
+    state = ColonyState(
+        [],
+        AntColonyModelParams(variant=variant, seed=0),
+        coordinates=rng.random((N_POINTS, 2)),
+    )
+    pheromones = rng.random((N_POINTS, N_POINTS))
+    pheromones = pheromones + pheromones.T
+    np.fill_diagonal(pheromones, 0.0)
+    state.pheromones[:] = pheromones
+    return state
+
+
+def make_tours(state: ColonyState) -> AntTours:
+    rng = np.random.default_rng(1)
+    tours = np.array([rng.permutation(N_POINTS) for _ in range(N_ANTS)])
+    return AntTours(tours=tours, lengths=state.tour_lengths(tours))
+
+
+def deposit_loop(pheromones: np.ndarray, tour: np.ndarray, amount: float):
+    for from_idx, to_idx in zip(tour[:-1], tour[1:]):
+        pheromones[from_idx, to_idx] += amount
+        pheromones[to_idx, from_idx] += amount
+
+
+def test_ant_system_deposit_matches_loop():
+    state = make_state("ant_system")
+    chosen_tours = make_tours(state)
+    expected = state.pheromones * (1 - state.model_params.evaporation_rate)
+    for tour, length in zip(chosen_tours.tours, chosen_tours.lengths):
+        deposit_loop(expected, tour, 1 / length)
+
+    PheromoneUpdater(state).update_pheromones(chosen_tours)
+
+    np.testing.assert_allclose(state.pheromones, expected, rtol=1e-12)
+
+
+def test_max_min_deposit_matches_loop():
+    state = make_state("max_min")
+    chosen_tours = make_tours(state)
+    state.record_best(chosen_tours)
+    rho = state.model_params.evaporation_rate
+    best = int(np.argmin(chosen_tours.lengths))
+    expected = state.pheromones * (1 - rho)
+    deposit_loop(expected, chosen_tours.tours[best], 1 / chosen_tours.lengths[best])
+    pheromone_max = 1 / (rho * state.best_length)
+    pheromone_min = pheromone_max / (2 * N_POINTS)
+    expected = np.clip(expected, pheromone_min, pheromone_max)
+    np.fill_diagonal(expected, 0.0)
+
+    PheromoneUpdater(state).update_pheromones(chosen_tours)
+
+    np.testing.assert_allclose(state.pheromones, expected, rtol=1e-12)
+
+
+def test_colony_system_deposit_matches_loop():
+    state = make_state("colony_system")
+    chosen_tours = make_tours(state)
+    state.record_best(chosen_tours)
+    rho = state.model_params.evaporation_rate
+    expected = state.pheromones.copy()
+    tour = state.best_tour
+    for from_idx, to_idx in zip(tour[:-1], tour[1:]):
+        for a, b in ((from_idx, to_idx), (to_idx, from_idx)):
+            expected[a, b] = (1 - rho) * expected[a, b] + rho / state.best_length
+
+    PheromoneUpdater(state).update_pheromones(chosen_tours)
+
+    np.testing.assert_allclose(state.pheromones, expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize("variant", ["ant_system", "max_min", "colony_system"])
+def test_pheromones_stay_symmetric(variant: str):
+    state = make_state(variant)
+    chosen_tours = make_tours(state)
+    state.record_best(chosen_tours)
+
+    PheromoneUpdater(state).update_pheromones(chosen_tours)
+
+    np.testing.assert_allclose(state.pheromones, state.pheromones.T)
+
+
+@pytest.mark.parametrize("variant", ["ant_system", "max_min", "colony_system"])
+def test_batched_update_matches_sequential(variant: str):
+    state = make_state(variant)
+    runner = BatchedColonyRunner(state, n_colonies=2)
+    rng = np.random.default_rng(2)
+    tours = np.array(
+        [[rng.permutation(N_POINTS) for _ in range(N_ANTS)] for _ in range(2)]
+    )
+    lengths = state.tour_lengths(tours.reshape(-1, N_POINTS)).reshape(2, N_ANTS)
+    runner._record_iteration(0, tours, lengths)
+    runner._update_pheromones(tours, lengths)
+
+    for colony in range(2):
+        colony_state = make_state(variant)
+        chosen_tours = AntTours(tours=tours[colony], lengths=lengths[colony])
+        colony_state.record_best(chosen_tours)
+        PheromoneUpdater(colony_state).update_pheromones(chosen_tours)
+        np.testing.assert_allclose(
+            runner.pheromones[colony], colony_state.pheromones, rtol=1e-12
+        )
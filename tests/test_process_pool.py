@@ -0,0 +1,67 @@
+from collections import OrderedDict
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from src.main import app
+from src.utils import process_pool as process_pool_module
+from src.utils.process_pool import (
+    ProcessPool,
+    attach_shared_array,
+    release_shared,
+    share_array,
+)
+
+
+def test_pool_starts_lazily_and_restarts_after_shutdown():
+    pool = ProcessPool(max_workers=1)
+    assert pool._executor is None
+
+    assert pool.map(abs, [-1, -2]) == [1, 2]
+    executor = pool._executor
+    assert pool.map(abs, [-3]) == [3]
+    assert pool._executor is executor
+
+    pool.shutdown()
+    assert pool._executor is None
+    assert pool.map(abs, [-4]) == [4]
+    pool.shutdown()
+
+
+def test_app_shutdown_stops_the_shared_pool(monkeypatch):
+    pool = ProcessPool(max_workers=1)
+    monkeypatch.setattr("src.main.process_pool", pool)
+    pool.map(abs, [-1])
+
+    with TestClient(app):
+        pass
+
+    assert pool._executor is None
+
+
+def test_attached_segments_are_reused_and_bounded(monkeypatch):
+    monkeypatch.setattr(process_pool_module, "MAX_ATTACHED_SEGMENTS", 2)
+    monkeypatch.setattr(process_pool_module, "_attached", OrderedDict())
+    arrays = [np.full((2, 3), float(value)) for value in range(3)]
+    memories = [share_array(array) for array in arrays]
+    try:
+        first = attach_shared_array(memories[0].name, (2, 3), "<f8")
+        assert attach_shared_array(memories[0].name, (2, 3), "<f8") is first
+        np.testing.assert_array_equal(first, arrays[0])
+        del first
+
+        for memory, array in zip(memories[1:], arrays[1:]):
+            np.testing.assert_array_equal(
+                attach_shared_array(memory.name, (2, 3), "<f8"), array
+            )
+
+        assert list(process_pool_module._attached) == [
+            memory.name for memory in memories[1:]
+        ]
+    finally:
+        for name in list(process_pool_module._attached):
+            memory, array = process_pool_module._attached.pop(name)
+            del array
+            memory.close()
+        for memory in memories:
+            release_shared(memory)
@@ -0,0 +1,60 @@
+import os
+from typing import Tuple
+
+import numpy as np
+import pytest
+
+from src.objects.pythagorean_support_machine_objects import (
+    PythagoreanSupportMachineInput,
+    RestartsSummary,
+)
+from src.services.pythagorean_support_machine_model.pythagorean_support_machine_model import (
+    PythagoreanSupportMachineModel,
+)
+
+
+def make_points() -> np.ndarray:
+    rng = np.random.default_rng(1)
+    centres = np.array([[0.0, 0.0], [3.0, 3.0], [0.0, 3.0], [3.0, 0.0]])
+    return np.vstack([rng.normal(centre, 1.0, (30, 2)) for centre in centres])
+
+
+def fit_restarts(
+    n_workers: int,
+) -> Tuple[PythagoreanSupportMachineModel, RestartsSummary]:
+    input = PythagoreanSupportMachineInput(
+        points=[],
+        n_groups=4,
+        initialization="random",
+        seed=3,
+        n_restarts=5,
+        n_workers=n_workers,
+        max_iterations=20,
+    )
+    model = PythagoreanSupportMachineModel(input, make_points())
+    return model, model.fit_restarts()
+
+
+@pytest.mark.parametrize("n_workers", [1, 2])
+def test_restarts_keep_the_lowest_objective(monkeypatch, n_workers: int):
+    # Pretend there are two CPUs so the pooled path runs on any machine.
+    monkeypatch.setattr(os, "cpu_count", lambda: 2)
+
+    model, restarts = fit_restarts(n_workers)
+    objectives = restarts.objectives
+
+    assert len(set(objectives)) > 1
+    assert restarts.best_restart == int(np.argmin(objectives))
+    assert model.objective == min(objectives)
+
+
+def test_seeded_restarts_are_deterministic(monkeypatch):
+    monkeypatch.setattr(os, "cpu_count", lambda: 2)
+
+    (first, first_restarts), *others = [
+        fit_restarts(n_workers) for n_workers in (1, 1, 2)
+    ]
+
+    for model, restarts in others:
+        assert restarts == first_restarts
+        np.testing.assert_array_equal(model.state.centroids, first.state.centroids)
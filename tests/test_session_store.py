@@ -0,0 +1,141 @@
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.main import app
+from src.objects.ant_colony_objects import (
+    AntColonySessionCreateRequest,
+    AntColonySessionOptimizeRequest,
+    PointRequest,
+)
+from src.params.ant_colony_params import AntColonyModelParams
+from src.services.ant_colony_model.colony_state import ColonyState
+from src.services.ant_colony_model.session_store import (
+    SessionStore,
+    SessionStoreFull,
+    session_store,
+)
+from src.services.ant_colony_model.tour_repairer import TourRepairer
+from src.services.ant_colony_model.utils import calc_distance_matrix
+
+
+def make_points(n_points: int, seed: int = 0):
+    coordinates = np.random.default_rng(seed).random((n_points, 2))
+    return [PointRequest(x=x, y=y) for x, y in coordinates.tolist()]
+
+
+def make_request(n_points: int = 10, **fields) -> AntColonySessionCreateRequest:
+    return AntColonySessionCreateRequest(
+        points=make_points(n_points),
+        model_params=AntColonyModelParams(seed=0),
+        **fields,
+    )
+
+
+def test_sessions_expire_after_their_ttl():
+    store = SessionStore()
+    session = store.create(make_request(ttl_seconds=0.05))
+
+    assert store.get(session.session_id) is session
+    time.sleep(0.1)
+    assert store.get(session.session_id) is None
+    assert store.sessions == {}
+
+
+def test_store_refuses_sessions_past_its_count():
+    store = SessionStore(max_sessions=2)
+    store.create(make_request(ttl_seconds=0.05))
+    store.create(make_request())
+
+    with pytest.raises(SessionStoreFull):
+        store.create(make_request())
+    time.sleep(0.1)
+    store.create(make_request())
+    assert len(store.sessions) == 2
+
+
+def test_store_refuses_inserts_past_its_byte_budget():
+    store = SessionStore()
+    session = store.create(make_request(n_points=10))
+    store.max_bytes = session.get_n_bytes(12)
+
+    store.reserve_points(session, 2)
+    with pytest.raises(SessionStoreFull):
+        store.reserve_points(session, 3)
+    with pytest.raises(SessionStoreFull):
+        store.create(make_request(n_points=10))
+
+
+def test_full_store_answers_503(monkeypatch):
+    monkeypatch.setattr(session_store, "max_sessions", 0)
+    points = [{"x": 0.0, "y": 0.0}, {"x": 1.0, "y": 1.0}]
+
+    response = TestClient(app).post("/v1/ant-colony-sessions", json={"points": points})
+
+    assert response.status_code == 503
+
+
+def assert_valid_best_tour(session):
+    state = session.state
+    np.testing.assert_array_equal(np.sort(state.best_tour), np.arange(state.n_points))
+    assert state.best_length == pytest.approx(state.tour_length(state.best_tour))
+
+
+def test_add_and_remove_repair_the_best_tour():
+    session = SessionStore().create(make_request(n_points=12))
+    session.optimize(AntColonySessionOptimizeRequest(max_iterations=3))
+
+    session.add_points(make_points(4, seed=1))
+    assert session.state.n_points == 16
+    assert_valid_best_tour(session)
+
+    removed = session.state.best_tour[[0, 5, -1]].tolist()
+    kept_coordinates = np.delete(session.state.coordinates, removed, axis=0)
+    session.remove_points(removed)
+    assert session.state.n_points == 13
+    np.testing.assert_array_equal(session.state.coordinates, kept_coordinates)
+    assert_valid_best_tour(session)
+
+
+def test_cheapest_insertion_picks_the_cheapest_position():
+    state = ColonyState(make_points(9), AntColonyModelParams(seed=0))
+    tour = np.array([3, 0, 7, 1, 5, 2, 8, 4], dtype=np.intp)
+    city = 6
+
+    repaired = TourRepairer(state).insert_cheapest(tour, city)
+
+    lengths = [
+        state.tour_length(np.insert(tour, position, city))
+        for position in range(len(tour) + 1)
+    ]
+    assert state.tour_length(repaired) == pytest.approx(min(lengths))
+    np.testing.assert_array_equal(np.sort(repaired), np.arange(9))
+
+
+@pytest.mark.parametrize("condensed_matrices", [False, True])
+def test_added_points_only_extend_the_matrices(condensed_matrices: bool):
+    model_params = AntColonyModelParams(
+        seed=0, beta=2.0, condensed_matrices=condensed_matrices
+    )
+    state = ColonyState(make_points(8), model_params)
+    pheromones = np.random.default_rng(2).random((8, 8))
+    state.pheromones[:] = pheromones + pheromones.T
+    np.fill_diagonal(state.pheromones, 0.0)
+    old_pheromones = state.pheromones.copy()
+
+    state.add_points(make_points(3, seed=1))
+
+    distances = calc_distance_matrix(state.coordinates)
+    rows, cols = np.indices((11, 11))
+    np.testing.assert_allclose(state.distances[rows, cols], distances, atol=1e-12)
+    off_diagonal = ~np.eye(11, dtype=bool)
+    np.testing.assert_allclose(
+        state.heuristic[rows, cols][off_diagonal],
+        np.maximum(distances, 1e-12)[off_diagonal] ** -2.0,
+        rtol=1e-12,
+    )
+    np.testing.assert_array_equal(state.pheromones[:8, :8], old_pheromones)
+    np.testing.assert_allclose(state.pheromones, state.pheromones.T)
+    assert np.all(state.pheromones[off_diagonal] > 0)
@@ -0,0 +1,65 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from src.objects.pythagorean_support_machine_objects import (
+    PythagoreanSupportMachineInput,
+)
+from src.services.pythagorean_support_machine_model.pythagorean_support_machine_model import (
+    PythagoreanSupportMachineModel,
+)
+from src.services.pythagorean_support_machine_model.tile_runner import TileRunner
+
+
+@pytest.fixture
+def four_cpus(monkeypatch):
+    monkeypatch.setattr(os, "cpu_count", lambda: 4)
+
+
+def test_tiles_cover_every_row_once():
+    tiles = TileRunner(tile_size=4).get_tiles(10)
+
+    assert tiles == [slice(0, 4), slice(4, 8), slice(8, 10)]
+    assert TileRunner(tile_size=4).get_tiles(0) == []
+
+
+def test_threaded_results_come_back_in_tile_order(four_cpus):
+    def kernel(tile: slice) -> int:
+        # Earlier tiles finish last.
+        time.sleep(0.01 * (10 - tile.start))
+        return tile.start
+
+    with TileRunner(tile_size=1, n_threads=4) as tile_runner:
+        assert tile_runner.executor is not None
+        assert tile_runner.map(kernel, 10) == list(range(10))
+    assert tile_runner.executor is None
+
+
+@pytest.mark.parametrize("n_threads, expected", [(1, 1), (2, 2), (64, 4), (None, 4)])
+def test_thread_count_is_capped_by_the_cpu_count(four_cpus, n_threads, expected):
+    with TileRunner(n_threads=n_threads) as tile_runner:
+        assert tile_runner.n_threads == expected
+
+
+def fit(tile_size: int, n_threads: int) -> PythagoreanSupportMachineModel:
+    points = np.random.default_rng(0).random((250, 3))
+    input = PythagoreanSupportMachineInput(
+        points=[], n_groups=4, seed=2, tile_size=tile_size, n_threads=n_threads
+    )
+    model = PythagoreanSupportMachineModel(input, points)
+    model.fit()
+    return model
+
+
+def test_fit_does_not_depend_on_threads_or_tiles(four_cpus):
+    single = fit(tile_size=32, n_threads=1)
+    threaded = fit(tile_size=32, n_threads=4)
+    one_tile = fit(tile_size=4096, n_threads=1)
+
+    np.testing.assert_array_equal(threaded.state.centroids, single.state.centroids)
+    np.testing.assert_array_equal(threaded.state.memberships, single.state.memberships)
+    assert threaded.n_iterations == single.n_iterations
+    np.testing.assert_allclose(one_tile.state.centroids, single.state.centroids)
+    assert one_tile.objective == pytest.approx(single.objective)
@@ -0,0 +1,52 @@
+import itertools
+import time
+
+import numpy as np
+import pytest
+
+from src.objects.ant_colony_objects import AntColonyRequest, PointRequest
+from src.params.ant_colony_params import AntColonyModelParams
+from src.services.ant_colony_model.ant_colony_model import AntColonyModel
+
+N_POINTS = 12
+
+
+def make_request(**params) -> AntColonyRequest:
+    coordinates = np.random.default_rng(0).random((N_POINTS, 2))
+    return AntColonyRequest(
+        points=[PointRequest(x=x, y=y) for x, y in coordinates.tolist()],
+        model_params=AntColonyModelParams(seed=0),
+        max_iterations=20,
+        response_format="compact",
+        **params,
+    )
+
+
+@pytest.fixture
+def slow_clock(monkeypatch):
+    # Every reading is a second after the previous one.
+    clock = itertools.count()
+    monkeypatch.setattr(time, "monotonic", lambda: float(next(clock)))
+
+
+def test_budget_stops_the_run_and_returns_the_best_so_far(slow_clock):
+    response = AntColonyModel(make_request(time_budget_ms=2500)).run()
+
+    assert response.n_iterations < 20
+    assert response.n_tours_evaluated < response.n_iterations * N_POINTS
+    assert sorted(response.last_trail.tour) == list(range(N_POINTS))
+
+
+def test_expired_budget_still_builds_one_tour(slow_clock):
+    response = AntColonyModel(make_request(time_budget_ms=1)).run()
+
+    assert response.n_iterations == 1
+    assert response.n_tours_evaluated == 1
+    assert sorted(response.last_trail.tour) == list(range(N_POINTS))
+
+
+def test_without_a_budget_every_iteration_runs(slow_clock):
+    response = AntColonyModel(make_request()).run()
+
+    assert response.n_iterations == 20
+    assert response.n_tours_evaluated == 20 * N_POINTS
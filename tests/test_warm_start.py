@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.main import app
+from src.services.ant_colony_model.warm_start import decode_snapshot, encode_snapshot
+
+N_POINTS = 6
+
+
+def make_snapshot() -> dict:
+    rng = np.random.default_rng(0)
+    pheromones = rng.random((N_POINTS, N_POINTS)).astype(np.float32)
+    return encode_snapshot(rng.random((N_POINTS, 2)), pheromones).model_dump()
+
+
+def test_snapshot_round_trip():
+    rng = np.random.default_rng(0)
+    coordinates = rng.random((N_POINTS, 2))
+    pheromones = rng.random((N_POINTS, N_POINTS)).astype(np.float32)
+    pheromones = pheromones + pheromones.T
+    np.fill_diagonal(pheromones, 0.0)
+
+    decoded_coordinates, decoded_pheromones = decode_snapshot(
+        encode_snapshot(coordinates, pheromones)
+    )
+
+    np.testing.assert_array_equal(decoded_coordinates, coordinates)
+    np.testing.assert_array_equal(decoded_pheromones, pheromones)
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"pheromones": "not base64!"},
+        {"points": "AAAA"},
+        {"n_points": N_POINTS + 1},
+        {"n_points": -1},
+    ],
+)
+def test_malformed_snapshot_is_rejected(changes: dict):
+    snapshot = {**make_snapshot(), **changes}
+    points = [{"x": float(idx), "y": 0.0} for idx in range(N_POINTS)]
+
+    response = TestClient(app).post(
+        "/v1/ant-colony-model",
+        json={"points": points, "pheromone_snapshot": snapshot},
+    )
+
+    assert response.status_code == 422